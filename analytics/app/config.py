@@ -1,6 +1,7 @@
 import logging
 import sys
 from functools import lru_cache
+from typing import Literal
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -12,6 +13,26 @@ class Settings(BaseSettings):
     ANALYTICS_DATABASE_URL: str
     DATABASE_URL: str | None = None
 
+    # Connection pool of the database engine. Each pod may open up to
+    # DB_POOL_SIZE + DB_MAX_OVERFLOW connections, so size these against
+    # Postgres max_connections divided by the pod count.
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800  # -1 never recycles
+    DB_POOL_PRE_PING: bool = True
+    # Set when the database URL points at PgBouncer in transaction pooling
+    # mode; disables asyncpg's server-side prepared statement cache
+    DB_PGBOUNCER_MODE: bool = False
+
+    # Comma-separated read replica URLs for analytics reads. A failing
+    # replica is skipped for DB_REPLICA_RETRY_SECONDS. Links clicked through
+    # this pod within DB_REPLICA_LAG_GUARD_SECONDS, and links a replica has
+    # no analytics for yet, are read from the primary.
+    ANALYTICS_DATABASE_REPLICA_URLS: str = ""
+    DB_REPLICA_RETRY_SECONDS: float = 30.0
+    DB_REPLICA_LAG_GUARD_SECONDS: float = 5.0
+
     SERVICE_PORT: int = 8000
 
     ANALYTICS_SERVICE_GRPC: str = "analytics:50051"
@@ -19,6 +40,13 @@ class Settings(BaseSettings):
     ENVIRONMENT: str = "development"
 
     GRPC_PORT: int = 50051
+    # "asyncio" serves RPCs on an event loop with the asyncpg driver, so an
+    # RPC waiting on the database holds no thread. "threads" is the previous
+    # thread-pool server. Past GRPC_MAX_CONCURRENT_RPCS in flight, new RPCs
+    # fail with RESOURCE_EXHAUSTED; RPCs beyond the connection pool size
+    # wait for a connection.
+    GRPC_SERVER_MODE: Literal["asyncio", "threads"] = "asyncio"
+    GRPC_MAX_CONCURRENT_RPCS: int = 100
 
     model_config = SettingsConfigDict(
         case_sensitive=True,
@@ -28,6 +56,14 @@ class Settings(BaseSettings):
         if self.DATABASE_URL is None:
             self.DATABASE_URL = self.ANALYTICS_DATABASE_URL
 
+    @property
+    def replica_urls(self) -> list[str]:
+        return [
+            url.strip()
+            for url in self.ANALYTICS_DATABASE_REPLICA_URLS.split(",")
+            if url.strip()
+        ]
+
     def configure_logging(self):
         numeric_level = getattr(logging, self.LOG_LEVEL.upper(), logging.INFO)
 
@@ -2,7 +2,11 @@
 GRPC_THREAD_POOL_WORKERS = 10
 GRPC_DEFAULT_PORT = 50051
 
-# Database Retry Configuration
-MAX_RETRY_ATTEMPTS = 3
-RETRY_BASE_DELAY_SECONDS = 1.0
-RETRY_BACKOFF_MULTIPLIER = 2.0
+# Database retries: decorrelated jitter between the base and max delay, with
+# at most RETRY_BUDGET_RATIO of calls retried once the saved-up
+# RETRY_BUDGET_CAPACITY retries are spent
+RETRY_MAX_ATTEMPTS = 3
+RETRY_BASE_DELAY_SECONDS = 0.05
+RETRY_MAX_DELAY_SECONDS = 1.0
+RETRY_BUDGET_RATIO = 0.1
+RETRY_BUDGET_CAPACITY = 10.0
@@ -48,7 +48,7 @@ class Analytics(Base):
     __tablename__ = "analytics"
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    short_link = Column(String(8), index=True, nullable=False)
+    short_link = Column(String(8), index=True, unique=True, nullable=False)
     updated_at = Column(DateTime, index=True, default=datetime.now)
     clicks = relationship("Click", cascade="all, delete-orphan")
 
@@ -73,3 +73,23 @@ class Analytics(Base):
             f"short_link={self.short_link}, "
             f"updated_at={self.updated_at})"
         )
+
+
+class ClickCounter(Base):
+    """
+    Clicks of one short link from one country, kept up to date on ingest so
+    counts are read without touching the clicks table
+    """
+
+    __tablename__ = "click_counters"
+
+    analytics_id = Column(Integer, ForeignKey("analytics.id"), primary_key=True)
+    country = Column(String, primary_key=True)
+    clicks = Column(Integer, nullable=False)
+    last_click_at = Column(DateTime, nullable=False)
+
+    def __repr__(self):
+        return (
+            f"ClickCounter(analytics_id={self.analytics_id}, "
+            f"country={self.country}, clicks={self.clicks})"
+        )
@@ -0,0 +1,40 @@
+"""
+Prebuilt Core statements for the hot lookups.
+
+They are built once at import and select table columns rather than ORM
+attributes, so executing one skips statement construction, the ORM compile
+plugin and entity hydration. Values are bound per call and rows come back
+as plain tuples.
+"""
+
+from sqlalchemy import bindparam, select
+
+from app.db.objects import Analytics, Click, ClickCounter
+
+analytics = Analytics.__table__
+clicks = Click.__table__
+click_counters = ClickCounter.__table__
+
+SELECT_ANALYTICS_BY_SHORT_LINK = (
+    select(analytics.c.id, analytics.c.updated_at)
+    .where(analytics.c.short_link == bindparam("short_link"))
+    .order_by(analytics.c.id)
+    .limit(1)
+)
+
+SELECT_CLICKS = (
+    select(clicks.c.ip, clicks.c.city, clicks.c.country, clicks.c.created_at)
+    .where(clicks.c.analytics_id == bindparam("analytics_id"))
+    .order_by(clicks.c.id)
+)
+
+# One row per country the link was clicked from, however many clicks
+SELECT_CLICK_COUNTERS = (
+    select(
+        click_counters.c.country,
+        click_counters.c.clicks,
+        click_counters.c.last_click_at,
+    )
+    .select_from(analytics.join(click_counters))
+    .where(analytics.c.short_link == bindparam("short_link"))
+)
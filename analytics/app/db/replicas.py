@@ -0,0 +1,98 @@
+import itertools
+import logging
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Generic, TypeVar
+
+from app.metrics import metrics
+
+log = logging.getLogger(__name__)
+
+F = TypeVar("F")
+
+
+class RecentWrites:
+    """
+    Keys written through this process within the last lag_guard seconds.
+    Reads of these go to the primary, since replicas may not have replayed
+    the write yet.
+    """
+
+    def __init__(self, lag_guard_seconds: float):
+        self.lag_guard_seconds = lag_guard_seconds
+        self._expiries: OrderedDict[str, float] = OrderedDict()
+        self._lock = Lock()
+
+    def add(self, key: str) -> None:
+        if self.lag_guard_seconds <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._expiries[key] = now + self.lag_guard_seconds
+            self._expiries.move_to_end(key)
+            # Entries expire in insertion order, so expired ones sit in front
+            while self._expiries:
+                oldest, expiry = next(iter(self._expiries.items()))
+                if expiry > now:
+                    break
+                del self._expiries[oldest]
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            expiry = self._expiries.get(key)
+        return expiry is not None and expiry > time.monotonic()
+
+
+class ReplicaSet(Generic[F]):
+    """
+    Session factories for read replicas, handed out round-robin. A replica
+    whose query fails is skipped for retry_after_seconds, so traffic moves to
+    the healthy ones and returns once the replica has had time to recover.
+    choose() returns None when reads should go to the primary instead.
+    """
+
+    def __init__(
+        self,
+        factories: list[F],
+        retry_after_seconds: float,
+        recent_writes: RecentWrites,
+    ):
+        self._factories = factories
+        self._down_until = [0.0] * len(factories)
+        self._turns = itertools.count()
+        self._lock = Lock()
+        self.retry_after_seconds = retry_after_seconds
+        self.recent_writes = recent_writes
+
+    def __len__(self) -> int:
+        return len(self._factories)
+
+    def choose(self, key: str | None = None) -> tuple[int, F] | None:
+        if not self._factories:
+            return None
+        if key is not None and key in self.recent_writes:
+            metrics.increment("db.replica.lag_guarded")
+            return None
+
+        now = time.monotonic()
+        with self._lock:
+            for _ in range(len(self._factories)):
+                index = next(self._turns) % len(self._factories)
+                if self._down_until[index] <= now:
+                    return index, self._factories[index]
+        metrics.increment("db.replica.all_down")
+        return None
+
+    def mark_failed(self, index: int, error: Exception) -> None:
+        log.warning(
+            f"Read replica {index} failed, using others for "
+            f"{self.retry_after_seconds}s: {error}"
+        )
+        metrics.increment("db.replica.failures")
+        with self._lock:
+            self._down_until[index] = time.monotonic() + self.retry_after_seconds
+
+    def note_write(self, key: str) -> None:
+        if self._factories:
+            self.recent_writes.add(key)
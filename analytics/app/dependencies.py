@@ -1,7 +1,7 @@
 from fastapi import Depends
 from sqlalchemy.orm import Session
 
-from app.db.session import SessionLocal
+from app.db.session import ReadReplicas, SessionLocal
 from app.repository import AnalyticsRepository, SqlAlchemyAnalyticsRepository
 from app.service import AnalyticsService
 
@@ -15,7 +15,7 @@ def get_session():
 
 
 def get_repository(session: Session = Depends(get_session)) -> AnalyticsRepository:
-    return SqlAlchemyAnalyticsRepository(session)
+    return SqlAlchemyAnalyticsRepository(session, replicas=ReadReplicas)
 
 
 def get_analytics_service(
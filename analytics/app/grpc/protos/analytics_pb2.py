@@ -23,21 +23,26 @@ _runtime_version.ValidateProtobufRuntimeVersion(
 _sym_db = _symbol_database.Default()
 
 
+from google.protobuf import timestamp_pb2 as google_dot_protobuf_dot_timestamp__pb2
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0f\x61nalytics.proto\x12\tanalytics\"7\n\nClickModel\x12\n\n\x02ip\x18\x01 \x01(\t\x12\x0c\n\x04\x63ity\x18\x02 \x01(\t\x12\x0f\n\x07\x63ountry\x18\x03 \x01(\t\"N\n\x12RecordClickRequest\x12\x12\n\nshort_link\x18\x01 \x01(\t\x12$\n\x05\x63lick\x18\x02 \x01(\x0b\x32\x15.analytics.ClickModel\"&\n\x13RecordClickResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x32`\n\x10\x41nalyticsService\x12L\n\x0bRecordClick\x12\x1d.analytics.RecordClickRequest\x1a\x1e.analytics.RecordClickResponseb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0f\x61nalytics.proto\x12\tanalytics\x1a\x1fgoogle/protobuf/timestamp.proto\"g\n\nClickModel\x12\n\n\x02ip\x18\x01 \x01(\t\x12\x0c\n\x04\x63ity\x18\x02 \x01(\t\x12\x0f\n\x07\x63ountry\x18\x03 \x01(\t\x12.\n\ncreated_at\x18\x04 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\"N\n\x12RecordClickRequest\x12\x12\n\nshort_link\x18\x01 \x01(\t\x12$\n\x05\x63lick\x18\x02 \x01(\x0b\x32\x15.analytics.ClickModel\"&\n\x13RecordClickResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\"D\n\x13RecordClicksRequest\x12-\n\x06\x63licks\x18\x01 \x03(\x0b\x32\x1d.analytics.RecordClickRequest\"(\n\x14RecordClicksResponse\x12\x10\n\x08recorded\x18\x01 \x01(\x05\x32\xb1\x01\n\x10\x41nalyticsService\x12L\n\x0bRecordClick\x12\x1d.analytics.RecordClickRequest\x1a\x1e.analytics.RecordClickResponse\x12O\n\x0cRecordClicks\x12\x1e.analytics.RecordClicksRequest\x1a\x1f.analytics.RecordClicksResponseb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
 _builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'analytics_pb2', _globals)
 if not _descriptor._USE_C_DESCRIPTORS:
   DESCRIPTOR._loaded_options = None
-  _globals['_CLICKMODEL']._serialized_start=30
-  _globals['_CLICKMODEL']._serialized_end=85
-  _globals['_RECORDCLICKREQUEST']._serialized_start=87
-  _globals['_RECORDCLICKREQUEST']._serialized_end=165
-  _globals['_RECORDCLICKRESPONSE']._serialized_start=167
-  _globals['_RECORDCLICKRESPONSE']._serialized_end=205
-  _globals['_ANALYTICSSERVICE']._serialized_start=207
-  _globals['_ANALYTICSSERVICE']._serialized_end=303
+  _globals['_CLICKMODEL']._serialized_start=63
+  _globals['_CLICKMODEL']._serialized_end=166
+  _globals['_RECORDCLICKREQUEST']._serialized_start=168
+  _globals['_RECORDCLICKREQUEST']._serialized_end=246
+  _globals['_RECORDCLICKRESPONSE']._serialized_start=248
+  _globals['_RECORDCLICKRESPONSE']._serialized_end=286
+  _globals['_RECORDCLICKSREQUEST']._serialized_start=288
+  _globals['_RECORDCLICKSREQUEST']._serialized_end=356
+  _globals['_RECORDCLICKSRESPONSE']._serialized_start=358
+  _globals['_RECORDCLICKSRESPONSE']._serialized_end=398
+  _globals['_ANALYTICSSERVICE']._serialized_start=401
+  _globals['_ANALYTICSSERVICE']._serialized_end=578
 # @@protoc_insertion_point(module_scope)
@@ -1,37 +1,96 @@
 import logging
-from collections.abc import Callable
+from collections.abc import Callable, Iterator
 from concurrent import futures
+from contextlib import contextmanager
+from datetime import UTC, datetime
 
 import grpc
 from grpc_reflection.v1alpha import reflection
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 import app.grpc.protos.analytics_pb2 as analytics_pb2
 from app.constants import GRPC_DEFAULT_PORT, GRPC_THREAD_POOL_WORKERS
+from app.db.replicas import ReplicaSet
 from app.grpc.protos.analytics_pb2_grpc import (
     AnalyticsServiceServicer,
     add_AnalyticsServiceServicer_to_server,
 )
 from app.models import ClickModel
-from app.repository import AnalyticsRepository, SqlAlchemyAnalyticsRepository
+from app.repository import (
+    AnalyticsRepository,
+    AsyncAnalyticsRepository,
+    AsyncSqlAlchemyAnalyticsRepository,
+    SqlAlchemyAnalyticsRepository,
+)
 
 logger = logging.getLogger(__name__)
 
 
 class AnalyticsService(AnalyticsServiceServicer):
-    def __init__(self, repository_factory: Callable):
-        self.repository: AnalyticsRepository = repository_factory()
+    """
+    Servicer for the thread-pool server. RPCs run on several threads at once
+    and a Session is not thread-safe, so each RPC gets a repository, and with
+    it a pooled session, of its own.
+    """
+
+    def __init__(self, repository_factory: Callable[[], AnalyticsRepository]):
+        self.repository_factory = repository_factory
+
+    @contextmanager
+    def _repository(self) -> Iterator[AnalyticsRepository]:
+        repository = self.repository_factory()
+        try:
+            yield repository
+        finally:
+            repository.close()
 
     def RecordClick(self, request, context):
         try:
             logger.info(f"Recording click for short link {request.short_link}")
 
-            click_model = ClickModel(
-                ip=request.click.ip,
-                city=request.click.city,
-                country=request.click.country,
-            )
+            with self._repository() as repository:
+                repository.record_click(_click_model(request), request.short_link)
 
-            self.repository.record_click(click_model, request.short_link)
+            return analytics_pb2.RecordClickResponse(success=True)
+        except Exception as e:
+            logger.exception(f"Error recording click: {e!s}")
+            context.set_code(grpc.StatusCode.INTERNAL)
+            context.set_details(f"Error recording click: {e!s}")
+            return analytics_pb2.RecordClickResponse(success=False)
+
+    def RecordClicks(self, request, context):
+        try:
+            with self._repository() as repository:
+                recorded = repository.record_clicks(
+                    [
+                        (click.short_link, _click_model(click))
+                        for click in request.clicks
+                    ]
+                )
+            return analytics_pb2.RecordClicksResponse(recorded=recorded)
+        except Exception as e:
+            logger.exception(f"Error recording {len(request.clicks)} clicks: {e!s}")
+            context.set_code(grpc.StatusCode.INTERNAL)
+            context.set_details(f"Error recording clicks: {e!s}")
+            return analytics_pb2.RecordClicksResponse(recorded=0)
+
+
+class AsyncAnalyticsService(AnalyticsServiceServicer):
+    """
+    AnalyticsService for the grpc.aio server. An RPC waiting on the database
+    yields the event loop instead of holding one of a few worker threads.
+    """
+
+    def __init__(self, repository: AsyncAnalyticsRepository):
+        self.repository = repository
+
+    async def RecordClick(self, request, context):
+        try:
+            logger.info(f"Recording click for short link {request.short_link}")
+
+            await self.repository.record_click(
+                _click_model(request), request.short_link
+            )
 
             return analytics_pb2.RecordClickResponse(success=True)
         except Exception as e:
@@ -40,28 +99,102 @@ class AnalyticsService(AnalyticsServiceServicer):
             context.set_details(f"Error recording click: {e!s}")
             return analytics_pb2.RecordClickResponse(success=False)
 
+    async def RecordClicks(self, request, context):
+        try:
+            recorded = await self.repository.record_clicks(
+                [(click.short_link, _click_model(click)) for click in request.clicks]
+            )
+            return analytics_pb2.RecordClicksResponse(recorded=recorded)
+        except Exception as e:
+            logger.exception(f"Error recording {len(request.clicks)} clicks: {e!s}")
+            context.set_code(grpc.StatusCode.INTERNAL)
+            context.set_details(f"Error recording clicks: {e!s}")
+            return analytics_pb2.RecordClicksResponse(recorded=0)
+
+
+def _click_model(request) -> ClickModel:
+    click = request.click
+    created_at = datetime.now()
+    if click.HasField("created_at"):
+        # Naive local time, like the timestamps taken on the server
+        created_at = click.created_at.ToDatetime(tzinfo=UTC).astimezone()
+        created_at = created_at.replace(tzinfo=None)
+    return ClickModel(
+        ip=click.ip,
+        city=click.city,
+        country=click.country,
+        created_at=created_at,
+    )
+
 
-def serve(session_factory: Callable, port: int = GRPC_DEFAULT_PORT):
+def create_server(
+    session_factory: Callable,
+    max_concurrent_rpcs: int | None = None,
+    replicas: ReplicaSet | None = None,
+) -> grpc.Server:
+    """The thread-pool server, with no port bound yet"""
     server = grpc.server(
-        futures.ThreadPoolExecutor(max_workers=GRPC_THREAD_POOL_WORKERS)
+        futures.ThreadPoolExecutor(max_workers=GRPC_THREAD_POOL_WORKERS),
+        maximum_concurrent_rpcs=max_concurrent_rpcs,
     )
 
-    def get_repository():
-        session = session_factory()
-        return SqlAlchemyAnalyticsRepository(session)
+    def get_repository() -> AnalyticsRepository:
+        return SqlAlchemyAnalyticsRepository(session_factory(), replicas=replicas)
 
     add_AnalyticsServiceServicer_to_server(
         AnalyticsService(get_repository),
         server,
     )
+    _enable_reflection(server)
+    return server
 
+
+def create_async_server(
+    session_factory: async_sessionmaker[AsyncSession],
+    max_concurrent_rpcs: int | None = None,
+    replicas: ReplicaSet | None = None,
+) -> grpc.aio.Server:
+    """The grpc.aio server, with no port bound yet"""
+    server = grpc.aio.server(maximum_concurrent_rpcs=max_concurrent_rpcs)
+    add_AnalyticsServiceServicer_to_server(
+        AsyncAnalyticsService(
+            AsyncSqlAlchemyAnalyticsRepository(session_factory, replicas=replicas)
+        ),
+        server,
+    )
+    _enable_reflection(server)
+    return server
+
+
+def _enable_reflection(server: grpc.Server | grpc.aio.Server) -> None:
     SERVICE_NAMES = (
         analytics_pb2.DESCRIPTOR.services_by_name["AnalyticsService"].full_name,
         reflection.SERVICE_NAME,
     )
     reflection.enable_server_reflection(SERVICE_NAMES, server)
 
+
+def serve(
+    session_factory: Callable,
+    port: int = GRPC_DEFAULT_PORT,
+    max_concurrent_rpcs: int | None = None,
+    replicas: ReplicaSet | None = None,
+):
+    server = create_server(session_factory, max_concurrent_rpcs, replicas)
     server.add_insecure_port(f"[::]:{port}")
     server.start()
     logger.info(f"Analytics gRPC server started on port {port}")
     server.wait_for_termination()
+
+
+async def serve_async(
+    session_factory: async_sessionmaker[AsyncSession],
+    port: int = GRPC_DEFAULT_PORT,
+    max_concurrent_rpcs: int | None = None,
+    replicas: ReplicaSet | None = None,
+):
+    server = create_async_server(session_factory, max_concurrent_rpcs, replicas)
+    server.add_insecure_port(f"[::]:{port}")
+    await server.start()
+    logger.info(f"Analytics gRPC server started on port {port} (asyncio)")
+    await server.wait_for_termination()
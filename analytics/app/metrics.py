@@ -0,0 +1,58 @@
+import logging
+from collections import defaultdict
+from collections.abc import Callable
+from threading import Lock
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class MetricsRegistry:
+    """
+    Process-local counters and gauges exposed through the /metrics endpoint.
+    Collectors are callables sampled on every snapshot, for values that are
+    owned by other objects (e.g. connection pool occupancy).
+    """
+
+    def __init__(self):
+        self._counters: dict[str, float] = defaultdict(float)
+        self._collectors: dict[str, Callable[[], dict[str, Any]]] = {}
+        self._lock = Lock()
+
+    def increment(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self._counters[name] += value
+
+    def get(self, name: str) -> float:
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def register_collector(
+        self, name: str, collector: Callable[[], dict[str, Any]]
+    ) -> None:
+        with self._lock:
+            self._collectors[name] = collector
+
+    def unregister_collector(self, name: str) -> None:
+        with self._lock:
+            self._collectors.pop(name, None)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            collectors = dict(self._collectors)
+
+        result: dict[str, Any] = {"counters": counters}
+        for name, collector in collectors.items():
+            try:
+                result[name] = collector()
+            except Exception as e:
+                logger.warning(f"Error collecting metrics for {name}: {e}")
+        return result
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+
+
+metrics = MetricsRegistry()
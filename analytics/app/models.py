@@ -24,10 +24,23 @@ class AnalyticsModel(BaseModel):
     )
 
 
+class ClickCountsModel(BaseModel):
+    short_link: str = Field(..., title="short_link", description="The shortened URL")
+    total: int = Field(..., title="total", description="Number of clicks")
+    last_click_at: datetime = Field(
+        ..., title="last_click_at", description="When the last click occurred"
+    )
+    countries: dict[str, int] = Field(
+        default_factory=dict,
+        title="countries",
+        description="Number of clicks per country",
+    )
+
+
 class ResponseModel(BaseModel):
     success: bool = Field(
         default=True, title="success", description="Whether the request was successful"
     )
-    data: AnalyticsModel | list[AnalyticsModel] | None = Field(
+    data: AnalyticsModel | list[AnalyticsModel] | ClickCountsModel | None = Field(
         default=None, title="data", description="The data returned by the request"
     )
@@ -1,34 +1,70 @@
 import logging
-import time
 from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable
 from datetime import datetime
+from typing import Any, TypeVar
 
-from sqlalchemy.exc import DatabaseError, OperationalError
+from sqlalchemy import case, insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import DatabaseError, InterfaceError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 
-from app.constants import (
-    MAX_RETRY_ATTEMPTS,
-    RETRY_BACKOFF_MULTIPLIER,
-    RETRY_BASE_DELAY_SECONDS,
+from app.db.objects import Analytics, Click, ClickCounter
+from app.db.queries import (
+    SELECT_ANALYTICS_BY_SHORT_LINK,
+    SELECT_CLICK_COUNTERS,
+    SELECT_CLICKS,
 )
-from app.db.objects import Analytics, Click
-from app.models import AnalyticsModel, ClickModel
+from app.db.replicas import ReplicaSet
+from app.metrics import metrics
+from app.models import AnalyticsModel, ClickCountsModel, ClickModel
+from app.retry import db_retry
+
+T = TypeVar("T")
 
 logger = logging.getLogger(__name__)
 
 
 class AnalyticsRepository(ABC):
     @abstractmethod
-    def record_click(
-        self,
-        click: ClickModel,
-        short_link: str,
-    ) -> AnalyticsModel:
+    def record_click(self, click: ClickModel, short_link: str) -> None:
+        """
+        Record one click of the link. Nothing is returned; read the
+        analytics back with get_analytics_by_short_link when needed.
+        """
         raise NotImplementedError
 
     @abstractmethod
     def get_analytics_by_short_link(self, short_link: str) -> AnalyticsModel | None:
         raise NotImplementedError
 
+    @abstractmethod
+    def get_click_counts(self, short_link: str) -> ClickCountsModel | None:
+        raise NotImplementedError
+
+    def record_clicks(self, clicks: list[tuple[str, ClickModel]]) -> int:
+        """Record a batch of (short_link, click) pairs, returning the count"""
+        for short_link, click in clicks:
+            self.record_click(click, short_link)
+        return len(clicks)
+
+    def close(self) -> None:  # noqa: B027
+        """Release what the repository holds once its unit of work is done"""
+
+
+class AsyncAnalyticsRepository(ABC):
+    """Write side used by the asyncio gRPC server"""
+
+    @abstractmethod
+    async def record_clicks(self, clicks: list[tuple[str, ClickModel]]) -> int:
+        raise NotImplementedError
+
+    async def record_click(self, click: ClickModel, short_link: str) -> None:
+        """Record one click of the link, returning nothing like the sync side"""
+        await self.record_clicks([(short_link, click)])
+
 
 class InMemoryAnalyticsRepository(AnalyticsRepository):
     _instance = None
@@ -39,125 +75,317 @@ class InMemoryAnalyticsRepository(AnalyticsRepository):
             cls._instance = super().__new__(cls)
         return cls._instance
 
-    def record_click(
-        self,
-        click: ClickModel,
-        short_link: str,
-    ) -> AnalyticsModel:
+    def record_click(self, click: ClickModel, short_link: str) -> None:
         existing_analytics = self.get_analytics_by_short_link(short_link)
         if not existing_analytics:
-            analytics = AnalyticsModel(
+            self._analytics[short_link] = AnalyticsModel(
                 short_link=short_link,
                 updated_at=datetime.now(),
                 clicks=[click],
             )
-            self._analytics[short_link] = analytics
-            return analytics
+            return
 
         existing_analytics.clicks.append(click)
         existing_analytics.updated_at = datetime.now()
-        return existing_analytics
 
     def get_analytics_by_short_link(self, short_link: str) -> AnalyticsModel | None:
         return self._analytics.get(short_link)
 
+    def get_click_counts(self, short_link: str) -> ClickCountsModel | None:
+        analytics = self._analytics.get(short_link)
+        if analytics is None or not analytics.clicks:
+            return None
+        countries: dict[str, int] = {}
+        for click in analytics.clicks:
+            countries[click.country] = countries.get(click.country, 0) + 1
+        return ClickCountsModel(
+            short_link=short_link,
+            total=len(analytics.clicks),
+            last_click_at=max(click.created_at for click in analytics.clicks),
+            countries=countries,
+        )
+
 
 class SqlAlchemyAnalyticsRepository(AnalyticsRepository):
-    def __init__(self, db_session):
+    def __init__(
+        self,
+        db_session: Session,
+        replicas: ReplicaSet[sessionmaker[Session]] | None = None,
+    ):
         self.session = db_session
+        self._replicas = replicas
 
-    def record_click(self, click: ClickModel, short_link: str) -> AnalyticsModel:
-        db_analytics = (
-            self.session.query(Analytics)
-            .filter(Analytics.short_link == short_link)
-            .first()
-        )
+    def close(self) -> None:
+        # Returns the connection to the pool, ending any open transaction
+        self.session.close()
 
-        if not db_analytics:
-            db_analytics = Analytics(short_link=short_link, clicks=[])
-            self.session.add(db_analytics)
+    def record_click(self, click: ClickModel, short_link: str) -> None:
+        # The click history is not reloaded, that would read every click
+        now = datetime.now()
+        analytics_ids = self._write(
+            lambda: self._insert_clicks([(short_link, click)], now), "record click"
+        )
+        self._note_writes(analytics_ids)
 
-        db_click = Click.from_model(click)
-        db_analytics.clicks.append(db_click)
-        db_analytics.updated_at = datetime.now()
+    def record_clicks(self, clicks: list[tuple[str, ClickModel]]) -> int:
+        if not clicks:
+            return 0
+        now = datetime.now()
+        analytics_ids = self._write(
+            lambda: self._insert_clicks(clicks, now), "record clicks"
+        )
+        self._note_writes(analytics_ids)
+        return len(clicks)
 
-        self._save()
+    def _insert_clicks(
+        self, clicks: list[tuple[str, ClickModel]], now: datetime
+    ) -> dict[str, int]:
+        """
+        Upsert the analytics rows of every short link in the batch with one
+        statement, insert all the clicks with one multi-row insert, then add
+        them to the click counters with one more upsert. The existing clicks
+        are never loaded. Returns the analytics id per link.
+        """
+        dialect_name = self.session.get_bind().dialect.name
+        upsert = _upsert_analytics(dialect_name, clicks, now)
+        analytics_ids = dict(self.session.execute(upsert).tuples().all())
+        self.session.execute(insert(Click), _click_rows(clicks, analytics_ids))
+        self.session.execute(_upsert_counters(dialect_name, clicks, analytics_ids))
+        return analytics_ids
 
-        return db_analytics.to_model()  # type: ignore[no-any-return]
+    def _note_writes(self, short_links: Iterable[str]) -> None:
+        if self._replicas:
+            for short_link in short_links:
+                self._replicas.note_write(short_link)
 
     def get_analytics_by_short_link(self, short_link: str) -> AnalyticsModel | None:
-        return self._execute_with_retry(  # type: ignore
+        return self._execute_with_retry(
             lambda: self._get_analytics_impl(short_link), "get analytics"
         )
 
+    def get_click_counts(self, short_link: str) -> ClickCountsModel | None:
+        return self._execute_with_retry(
+            lambda: self._read(short_link, self._load_click_counts), "get click counts"
+        )
+
     def _get_analytics_impl(self, short_link: str) -> AnalyticsModel | None:
-        db_analytics = (
-            self.session.query(Analytics)
-            .filter(Analytics.short_link == short_link)
-            .first()
+        return self._read(short_link, self._load_analytics)
+
+    def _read(
+        self, short_link: str, load: Callable[[Session, str], T | None]
+    ) -> T | None:
+        """Load from a replica when one may be used, otherwise the primary"""
+        choice = self._replicas.choose(short_link) if self._replicas else None
+        if choice is not None:
+            index, replica_session_factory = choice
+            try:
+                with replica_session_factory() as session:
+                    result = load(session, short_link)
+            except (OperationalError, InterfaceError) as e:
+                assert self._replicas is not None
+                self._replicas.mark_failed(index, e)
+            else:
+                if result is not None:
+                    metrics.increment("db.replica.reads")
+                    return result
+                # The replica may not have replayed the first click yet
+                metrics.increment("db.replica.miss_fallbacks")
+        return load(self.session, short_link)
+
+    @staticmethod
+    def _load_click_counts(
+        session: Session, short_link: str
+    ) -> ClickCountsModel | None:
+        rows = session.execute(SELECT_CLICK_COUNTERS, {"short_link": short_link}).all()
+        if not rows:
+            return None
+        return ClickCountsModel(
+            short_link=short_link,
+            total=sum(row.clicks for row in rows),
+            last_click_at=max(row.last_click_at for row in rows),
+            countries={row.country: row.clicks for row in rows},
         )
 
-        if not db_analytics:
+    @staticmethod
+    def _load_analytics(session: Session, short_link: str) -> AnalyticsModel | None:
+        row = session.execute(
+            SELECT_ANALYTICS_BY_SHORT_LINK, {"short_link": short_link}
+        ).first()
+        if row is None:
             return None
 
-        return db_analytics.to_model()  # type: ignore[no-any-return]
+        return AnalyticsModel(
+            short_link=short_link,
+            updated_at=row.updated_at,
+            clicks=SqlAlchemyAnalyticsRepository._load_clicks(session, row.id),
+        )
 
-    def _save(self) -> None:
-        """Save changes with retry logic for transient failures"""
-        for attempt in range(MAX_RETRY_ATTEMPTS):
+    @staticmethod
+    def _load_clicks(session: Session, analytics_id: int) -> list[ClickModel]:
+        rows = session.execute(SELECT_CLICKS, {"analytics_id": analytics_id})
+        return [
+            ClickModel(
+                ip=row.ip, city=row.city, country=row.country, created_at=row.created_at
+            )
+            for row in rows
+        ]
+
+    def _write(self, func: Callable[[], T], operation_name: str) -> T:
+        """
+        Run func and commit as one unit. A transient failure rolls the whole
+        unit back and runs it again, since a commit retried after a rollback
+        would have nothing left to write.
+        """
+
+        def unit() -> T:
             try:
-                self.session.commit()
-                return
-            except OperationalError as e:
-                self.session.rollback()
-                if attempt < MAX_RETRY_ATTEMPTS - 1:
-                    # Exponential backoff
-                    delay = RETRY_BASE_DELAY_SECONDS * (
-                        RETRY_BACKOFF_MULTIPLIER**attempt
-                    )
-                    logger.warning(
-                        f"Database connection error (attempt "
-                        f"{attempt + 1}/{MAX_RETRY_ATTEMPTS}): {e}. "
-                        f"Retrying in {delay}s..."
-                    )
-                    time.sleep(delay)
-                else:
-                    logger.error(
-                        f"Failed to save after {MAX_RETRY_ATTEMPTS} attempts: {e}"
-                    )
-                    raise
-            except DatabaseError as e:
-                self.session.rollback()
-                logger.error(f"Database error: {e}")
-                raise
-            except Exception as e:
+                result = func()
+            except Exception:
                 self.session.rollback()
-                logger.exception(f"Unexpected error saving to database: {e}")
                 raise
+            self._save()
+            return result
 
-    def _execute_with_retry(self, func, operation_name: str):
-        for attempt in range(MAX_RETRY_ATTEMPTS):
-            try:
-                return func()
-            except OperationalError as e:
-                if attempt < MAX_RETRY_ATTEMPTS - 1:
-                    delay = RETRY_BASE_DELAY_SECONDS * (
-                        RETRY_BACKOFF_MULTIPLIER**attempt
-                    )
-                    logger.warning(
-                        f"Database error during {operation_name} (attempt "
-                        f"{attempt + 1}/{MAX_RETRY_ATTEMPTS}): {e}. "
-                        f"Retrying in {delay}s..."
-                    )
-                    time.sleep(delay)
-                    # Rollback to clear any failed transaction state
-                    self.session.rollback()
-                else:
-                    logger.error(
-                        f"Failed to {operation_name} after "
-                        f"{MAX_RETRY_ATTEMPTS} attempts: {e}"
-                    )
-                    raise
-            except Exception as e:
-                logger.error(f"Unexpected error during {operation_name}: {e}")
-                raise
+        return self._execute_with_retry(unit, operation_name)
+
+    def _save(self) -> None:
+        """Commit, rolling back on any failure"""
+        try:
+            self.session.commit()
+        except OperationalError:
+            self.session.rollback()
+            raise
+        except DatabaseError as e:
+            self.session.rollback()
+            logger.error(f"Database error: {e}")
+            raise
+        except Exception as e:
+            self.session.rollback()
+            logger.exception(f"Unexpected error saving to database: {e}")
+            raise
+
+    def _execute_with_retry(self, func: Callable[[], T], operation_name: str) -> T:
+        return db_retry.call(func, operation_name, on_retry=self.session.rollback)
+
+
+class AsyncSqlAlchemyAnalyticsRepository(AsyncAnalyticsRepository):
+    """
+    Writes clicks with the same statements as SqlAlchemyAnalyticsRepository,
+    each batch on a session of its own. `replicas` is the pod's replica set,
+    told about every write so reads through the HTTP API keep to the primary
+    until the replicas have caught up.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        replicas: ReplicaSet[sessionmaker[Session]] | None = None,
+    ):
+        self.session_factory = session_factory
+        self._replicas = replicas
+
+    async def record_clicks(self, clicks: list[tuple[str, ClickModel]]) -> int:
+        if not clicks:
+            return 0
+        now = datetime.now()
+        analytics_ids = await db_retry.call_async(
+            lambda: self._insert_clicks(clicks, now), "record clicks"
+        )
+        if self._replicas:
+            for short_link in analytics_ids:
+                self._replicas.note_write(short_link)
+        return len(clicks)
+
+    async def _insert_clicks(
+        self, clicks: list[tuple[str, ClickModel]], now: datetime
+    ) -> dict[str, int]:
+        # A retry gets a fresh session, the failed transaction rolled back
+        async with self.session_factory() as session, session.begin():
+            dialect_name = session.get_bind().dialect.name
+            result = await session.execute(_upsert_analytics(dialect_name, clicks, now))
+            analytics_ids = dict(result.tuples().all())
+            await session.execute(insert(Click), _click_rows(clicks, analytics_ids))
+            await session.execute(_upsert_counters(dialect_name, clicks, analytics_ids))
+        return analytics_ids
+
+
+def _upsert_analytics(
+    dialect_name: str, clicks: list[tuple[str, ClickModel]], now: datetime
+) -> Any:
+    """
+    INSERT .. ON CONFLICT DO UPDATE of the analytics row of every short link
+    in the batch, returning (short_link, id) pairs. Both PostgreSQL and
+    SQLite support it.
+    """
+    dialect_insert = pg_insert if dialect_name == "postgresql" else sqlite_insert
+    # Sorted, so concurrent batches lock the rows in the same order
+    short_links = sorted({short_link for short_link, _ in clicks})
+    upsert = dialect_insert(Analytics).values(
+        [{"short_link": short_link, "updated_at": now} for short_link in short_links]
+    )
+    return upsert.on_conflict_do_update(
+        index_elements=[Analytics.short_link],
+        set_={"updated_at": upsert.excluded.updated_at},
+    ).returning(Analytics.short_link, Analytics.id)
+
+
+def _upsert_counters(
+    dialect_name: str,
+    clicks: list[tuple[str, ClickModel]],
+    analytics_ids: dict[str, int],
+) -> Any:
+    """
+    Add the batch to the click counters: one INSERT .. ON CONFLICT DO UPDATE
+    row per short link and country, carrying its click count and latest
+    click. Clicks may arrive out of order, so last_click_at only moves
+    forward.
+    """
+    counts: dict[tuple[int, str], tuple[int, datetime]] = {}
+    for short_link, click in clicks:
+        key = (analytics_ids[short_link], click.country)
+        count, last_click_at = counts.get(key, (0, click.created_at))
+        counts[key] = (count + 1, max(last_click_at, click.created_at))
+
+    dialect_insert = pg_insert if dialect_name == "postgresql" else sqlite_insert
+    # Sorted, so concurrent batches lock the rows in the same order
+    upsert = dialect_insert(ClickCounter).values(
+        [
+            {
+                "analytics_id": analytics_id,
+                "country": country,
+                "clicks": count,
+                "last_click_at": last_click_at,
+            }
+            for (analytics_id, country), (count, last_click_at) in sorted(
+                counts.items()
+            )
+        ]
+    )
+    return upsert.on_conflict_do_update(
+        index_elements=[ClickCounter.analytics_id, ClickCounter.country],
+        set_={
+            "clicks": ClickCounter.clicks + upsert.excluded.clicks,
+            "last_click_at": case(
+                (
+                    upsert.excluded.last_click_at > ClickCounter.last_click_at,
+                    upsert.excluded.last_click_at,
+                ),
+                else_=ClickCounter.last_click_at,
+            ),
+        },
+    )
+
+
+def _click_rows(
+    clicks: list[tuple[str, ClickModel]], analytics_ids: dict[str, int]
+) -> list[dict[str, Any]]:
+    return [
+        {
+            "analytics_id": analytics_ids[short_link],
+            "ip": click.ip,
+            "city": click.city,
+            "country": click.country,
+            "created_at": click.created_at,
+        }
+        for short_link, click in clicks
+    ]
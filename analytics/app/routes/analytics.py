@@ -20,3 +20,19 @@ def get_analytics(
         )
 
     return ResponseModel(data=analytics)
+
+
+@router.get("/{short_link}/counts", response_model=ResponseModel)
+def get_click_counts(
+    short_link: str = Path(..., min_length=8, max_length=8),
+    service: AnalyticsService = Depends(get_analytics_service),
+) -> ResponseModel:
+    """Click totals from the pre-aggregated counters, without loading clicks"""
+    counts = service.retrieve_click_counts(short_link)
+    if not counts:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No analytics entry for short link",
+        )
+
+    return ResponseModel(data=counts)
@@ -1,4 +1,4 @@
-from app.models import AnalyticsModel
+from app.models import AnalyticsModel, ClickCountsModel
 from app.repository import AnalyticsRepository
 
 
@@ -8,3 +8,6 @@ class AnalyticsService:
 
     def retrieve_analytics(self, short_link: str) -> AnalyticsModel | None:
         return self.repository.get_analytics_by_short_link(short_link)
+
+    def retrieve_click_counts(self, short_link: str) -> ClickCountsModel | None:
+        return self.repository.get_click_counts(short_link)
@@ -0,0 +1,179 @@
+"""
+Sustained throughput and latency of the two gRPC server modes.
+
+    python -m benchmarks.grpc_server --seconds 10 --concurrency 64
+
+Each mode is served from a child process against the same database, while
+--concurrency callers send RecordClick (or RecordClicks with --batch) back
+to back for --seconds. By default a temporary SQLite file is used, which
+serializes writes; pass --url and --async-url naming a scratch PostgreSQL
+database for numbers that resemble production.
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import socket
+import statistics
+import tempfile
+import time
+from dataclasses import dataclass, field
+from multiprocessing.synchronize import Event
+from pathlib import Path
+
+import grpc
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.grpc.protos.analytics_pb2 as analytics_pb2
+from app.db.objects import Base
+from app.grpc.protos.analytics_pb2_grpc import AnalyticsServiceStub
+from app.grpc.server import create_async_server, create_server
+
+MODES = ("threads", "asyncio")
+
+
+@dataclass
+class Result:
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+
+
+def run_server(
+    mode: str, url: str, async_url: str, port: int, max_rpcs: int, ready: Event
+) -> None:
+    if mode == "threads":
+        server = create_server(sessionmaker(bind=create_engine(url)), max_rpcs)
+        server.add_insecure_port(f"127.0.0.1:{port}")
+        server.start()
+        ready.set()
+        server.wait_for_termination()
+        return
+
+    async def serve() -> None:
+        engine = create_async_engine(async_url)
+        aio_server = create_async_server(
+            async_sessionmaker(bind=engine, expire_on_commit=False), max_rpcs
+        )
+        aio_server.add_insecure_port(f"127.0.0.1:{port}")
+        await aio_server.start()
+        ready.set()
+        await aio_server.wait_for_termination()
+
+    asyncio.run(serve())
+
+
+async def drive(port: int, args: argparse.Namespace) -> Result:
+    result = Result()
+    clicks = [
+        analytics_pb2.RecordClickRequest(  # type: ignore
+            short_link=f"b{i % 1000:07d}",
+            click=analytics_pb2.ClickModel(  # type: ignore
+                ip="10.0.0.1", city="Lagos", country="NG"
+            ),
+        )
+        for i in range(args.batch)
+    ]
+    batch = analytics_pb2.RecordClicksRequest(clicks=clicks)  # type: ignore
+
+    async with grpc.aio.insecure_channel(f"127.0.0.1:{port}") as channel:
+        stub = AnalyticsServiceStub(channel)
+
+        async def call() -> None:
+            if args.batch == 1:
+                await stub.RecordClick(clicks[0], timeout=30)
+            else:
+                await stub.RecordClicks(batch, timeout=30)
+
+        async def worker(deadline: float) -> None:
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    await call()
+                except grpc.aio.AioRpcError:
+                    result.errors += 1
+                else:
+                    result.latencies.append(time.perf_counter() - started)
+
+        # Warm up connections and caches before measuring
+        await asyncio.gather(*(worker(time.perf_counter() + 1) for _ in range(4)))
+        result.latencies.clear()
+        result.errors = 0
+        deadline = time.perf_counter() + args.seconds
+        await asyncio.gather(*(worker(deadline) for _ in range(args.concurrency)))
+    return result
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port: int = sock.getsockname()[1]
+        return port
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.grpc_server",
+        description="Compare the thread-pool and asyncio gRPC servers",
+    )
+    parser.add_argument("--url", help="Database for the thread-pool server")
+    parser.add_argument("--async-url", help="The same database, asyncio driver")
+    parser.add_argument("--mode", choices=MODES, action="append")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--batch", type=int, default=1, help="Clicks per call")
+    parser.add_argument("--max-concurrent-rpcs", type=int, default=100)
+    args = parser.parse_args(argv)
+    if (args.url is None) != (args.async_url is None):
+        parser.error("--url and --async-url name the same database, give both")
+
+    with tempfile.TemporaryDirectory() as scratch:
+        if args.url is None:
+            path = Path(scratch) / "analytics.db"
+            args.url = f"sqlite:///{path}"
+            args.async_url = f"sqlite+aiosqlite:///{path}"
+        engine = create_engine(args.url)
+        Base.metadata.create_all(engine)
+        engine.dispose()
+
+        for mode in args.mode or MODES:
+            port = free_port()
+            ready = multiprocessing.Event()
+            server = multiprocessing.Process(
+                target=run_server,
+                args=(
+                    mode,
+                    args.url,
+                    args.async_url,
+                    port,
+                    args.max_concurrent_rpcs,
+                    ready,
+                ),
+                daemon=True,
+            )
+            server.start()
+            try:
+                if not ready.wait(30):
+                    raise RuntimeError(f"{mode} server did not start")
+                result = asyncio.run(drive(port, args))
+            finally:
+                server.terminate()
+                server.join()
+
+            latencies = result.latencies
+            p50, p99 = (
+                statistics.quantiles(latencies, n=100)[49::49]
+                if len(latencies) > 1
+                else (0.0, 0.0)
+            )
+            print(
+                f"{mode:<8} {len(latencies) / args.seconds:8.0f} calls/s"
+                f"  p50 {p50 * 1000:7.1f} ms  p99 {p99 * 1000:7.1f} ms"
+                f"  errors {result.errors}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
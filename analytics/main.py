@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from http import HTTPMethod as Method
 from threading import Thread
@@ -7,7 +8,7 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import Settings, get_settings
 from app.exceptions import catch_all_exception_handler, internal_server_error_handler
-from app.grpc.server import serve
+from app.grpc.server import serve, serve_async
 from app.routes.analytics import router as urls_router
 from app.routes.health import router as health_router
 
@@ -42,11 +43,19 @@ class AppFactory:
     def start_grpc_server():
         config = AppFactory._get_config()
         grpc_port = config.GRPC_PORT
+        max_concurrent_rpcs = config.GRPC_MAX_CONCURRENT_RPCS
         try:
-            from app.db.session import SessionLocal
-
-            grpc_server = serve(SessionLocal, grpc_port)
-            grpc_server.wait_for_termination()
+            from app.db.session import AsyncSessionLocal, ReadReplicas, SessionLocal
+
+            if config.GRPC_SERVER_MODE == "asyncio":
+                # The server gets an event loop of its own in this thread
+                asyncio.run(
+                    serve_async(
+                        AsyncSessionLocal, grpc_port, max_concurrent_rpcs, ReadReplicas
+                    )
+                )
+            else:
+                serve(SessionLocal, grpc_port, max_concurrent_rpcs, ReadReplicas)
         except Exception as e:
             logger.error(f"Error starting gRPC server: {e!s}")
 
@@ -0,0 +1,63 @@
+"""Make analytics.short_link unique
+
+Revision ID: 4f7a2c9e1b63
+Revises: 27d0f89911af
+Create Date: 2026-10-17 16:42:10.318702
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f7a2c9e1b63'
+down_revision: Union[str, None] = '27d0f89911af'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    _merge_duplicates()
+    op.drop_index('ix_analytics_short_link', table_name='analytics')
+    op.create_index('ix_analytics_short_link', 'analytics', ['short_link'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_analytics_short_link', table_name='analytics')
+    op.create_index('ix_analytics_short_link', 'analytics', ['short_link'], unique=False)
+
+
+def _merge_duplicates() -> None:
+    """
+    Concurrent first clicks could each create an analytics row for the same
+    short link. Keep the oldest row per link, move the clicks of the others
+    onto it and carry over the latest updated_at.
+    """
+    connection = op.get_bind()
+    connection.execute(sa.text(
+        "UPDATE clicks SET analytics_id = ("
+        "  SELECT MIN(keeper.id) FROM analytics keeper"
+        "  JOIN analytics duplicate ON duplicate.short_link = keeper.short_link"
+        "  WHERE duplicate.id = clicks.analytics_id"
+        ") WHERE analytics_id IN ("
+        "  SELECT duplicate.id FROM analytics duplicate"
+        "  JOIN analytics keeper ON keeper.short_link = duplicate.short_link"
+        "  WHERE keeper.id < duplicate.id"
+        ")"
+    ))
+    connection.execute(sa.text(
+        "UPDATE analytics SET updated_at = ("
+        "  SELECT MAX(other.updated_at) FROM analytics other"
+        "  WHERE other.short_link = analytics.short_link"
+        ") WHERE id IN ("
+        "  SELECT MIN(id) FROM analytics GROUP BY short_link HAVING COUNT(*) > 1"
+        ")"
+    ))
+    connection.execute(sa.text(
+        "DELETE FROM analytics WHERE EXISTS ("
+        "  SELECT 1 FROM analytics keeper"
+        "  WHERE keeper.short_link = analytics.short_link AND keeper.id < analytics.id"
+        ")"
+    ))
@@ -0,0 +1,39 @@
+"""Create click_counters table
+
+Revision ID: 9b1e5d3c7a42
+Revises: 4f7a2c9e1b63
+Create Date: 2026-10-17 19:08:44.527193
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b1e5d3c7a42'
+down_revision: Union[str, None] = '4f7a2c9e1b63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('click_counters',
+    sa.Column('analytics_id', sa.Integer(), nullable=False),
+    sa.Column('country', sa.String(), nullable=False),
+    sa.Column('clicks', sa.Integer(), nullable=False),
+    sa.Column('last_click_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['analytics_id'], ['analytics.id'], ),
+    sa.PrimaryKeyConstraint('analytics_id', 'country')
+    )
+    # Counters for the clicks recorded so far
+    op.execute(
+        "INSERT INTO click_counters (analytics_id, country, clicks, last_click_at)"
+        " SELECT analytics_id, COALESCE(country, ''), COUNT(*), MAX(created_at)"
+        " FROM clicks GROUP BY analytics_id, COALESCE(country, '')"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('click_counters')
@@ -1,8 +1,11 @@
 from datetime import UTC, datetime
 
 import pytest
+import pytest_asyncio
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 
 from app.db.objects import Base
 from app.models import ClickModel
@@ -32,6 +35,18 @@ def db_session(in_memory_db):
         session.close()
 
 
+@pytest_asyncio.fixture
+async def async_session_factory():
+    """Create an in-memory aiosqlite database shared by all async sessions"""
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    yield async_sessionmaker(bind=engine, expire_on_commit=False)
+
+    await engine.dispose()
+
+
 @pytest.fixture
 def repository(db_session):
     return SqlAlchemyAnalyticsRepository(db_session)
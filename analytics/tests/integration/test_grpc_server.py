@@ -0,0 +1,154 @@
+from concurrent import futures
+from datetime import UTC, datetime
+from unittest.mock import AsyncMock, Mock
+
+import grpc
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+import app.grpc.protos.analytics_pb2 as analytics_pb2
+from app.db.objects import Base, Click
+from app.grpc.protos.analytics_pb2_grpc import AnalyticsServiceStub
+from app.grpc.server import (
+    AnalyticsService,
+    AsyncAnalyticsService,
+    create_async_server,
+    create_server,
+)
+from app.repository import AsyncSqlAlchemyAnalyticsRepository
+
+
+def _request(short_link: str, ip: str, created_at: datetime | None = None):
+    click = analytics_pb2.ClickModel(ip=ip, city="Lagos", country="NG")  # type: ignore
+    if created_at is not None:
+        click.created_at.FromDatetime(created_at.astimezone())
+    return analytics_pb2.RecordClickRequest(  # type: ignore
+        short_link=short_link, click=click
+    )
+
+
+def test_should_record_batch_of_clicks_with_client_timestamps(
+    repository, sample_short_links
+):
+    servicer = AnalyticsService(lambda: repository)
+    # Naive local time, as the repository stores it
+    clicked_at = datetime(2026, 1, 2, 3, 4, 5, tzinfo=UTC).astimezone()
+    clicked_at = clicked_at.replace(tzinfo=None)
+    request = analytics_pb2.RecordClicksRequest(
+        clicks=[
+            _request(sample_short_links[0], "10.0.0.1", clicked_at),
+            _request(sample_short_links[0], "10.0.0.2", clicked_at),
+            _request(sample_short_links[1], "10.0.0.3"),
+        ]
+    )
+
+    response = servicer.RecordClicks(request, Mock())
+
+    assert response.recorded == 3
+    first = repository.get_analytics_by_short_link(sample_short_links[0])
+    assert [click.ip for click in first.clicks] == ["10.0.0.1", "10.0.0.2"]
+    assert {click.created_at for click in first.clicks} == {clicked_at}
+    second = repository.get_analytics_by_short_link(sample_short_links[1])
+    assert len(second.clicks) == 1
+
+
+def test_should_report_internal_error_when_batch_fails(sample_short_links):
+    repository = Mock()
+    repository.record_clicks.side_effect = RuntimeError("database down")
+    context = Mock()
+    servicer = AnalyticsService(lambda: repository)
+
+    response = servicer.RecordClicks(
+        analytics_pb2.RecordClicksRequest(
+            clicks=[_request(sample_short_links[0], "10.0.0.1")]
+        ),
+        context,
+    )
+
+    assert response.recorded == 0
+    context.set_code.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_should_serve_batches_from_asyncio_server(
+    async_session_factory, sample_short_links
+):
+    server = create_async_server(async_session_factory)
+    port = server.add_insecure_port("127.0.0.1:0")
+    await server.start()
+    try:
+        async with grpc.aio.insecure_channel(f"127.0.0.1:{port}") as channel:
+            stub = AnalyticsServiceStub(channel)
+            batch = await stub.RecordClicks(
+                analytics_pb2.RecordClicksRequest(  # type: ignore
+                    clicks=[
+                        _request(sample_short_links[0], "10.0.0.1"),
+                        _request(sample_short_links[1], "10.0.0.2"),
+                    ]
+                )
+            )
+            single = await stub.RecordClick(_request(sample_short_links[0], "10.0.0.3"))
+    finally:
+        await server.stop(None)
+
+    assert batch.recorded == 2
+    assert single.success
+    async with async_session_factory() as session:
+        assert await session.scalar(select(func.count(Click.id))) == 3
+
+
+@pytest.mark.asyncio
+async def test_should_report_internal_error_when_async_batch_fails(
+    async_session_factory, sample_short_links
+):
+    repository = AsyncSqlAlchemyAnalyticsRepository(async_session_factory)
+    repository.record_clicks = AsyncMock(  # type: ignore[method-assign]
+        side_effect=RuntimeError("database down")
+    )
+    context = Mock()
+    servicer = AsyncAnalyticsService(repository)
+
+    response = await servicer.RecordClicks(
+        analytics_pb2.RecordClicksRequest(
+            clicks=[_request(sample_short_links[0], "10.0.0.1")]
+        ),
+        context,
+    )
+
+    assert response.recorded == 0
+    context.set_code.assert_called_once_with(grpc.StatusCode.INTERNAL)
+
+
+def test_should_record_every_click_sent_in_parallel(tmp_path, sample_short_links):
+    # A file database, so each worker thread gets a pooled connection
+    engine = create_engine(f"sqlite:///{tmp_path / 'analytics.db'}")
+    Base.metadata.create_all(engine)
+    server = create_server(sessionmaker(bind=engine))
+    port = server.add_insecure_port("127.0.0.1:0")
+    server.start()
+    calls = 200
+    try:
+        with grpc.insecure_channel(f"127.0.0.1:{port}") as channel:
+            stub = AnalyticsServiceStub(channel)
+            with futures.ThreadPoolExecutor(max_workers=20) as callers:
+                responses = list(
+                    callers.map(
+                        lambda i: stub.RecordClick(
+                            _request(
+                                sample_short_links[i % len(sample_short_links)],
+                                f"10.0.{i // 256}.{i % 256}",
+                            ),
+                            timeout=30,
+                        ),
+                        range(calls),
+                    )
+                )
+    finally:
+        server.stop(None)
+
+    assert all(response.success for response in responses)
+    with sessionmaker(bind=engine)() as session:
+        assert session.scalar(select(func.count(Click.id))) == calls
+        assert session.scalar(select(func.count(func.distinct(Click.ip)))) == calls
+    engine.dispose()
@@ -1,6 +1,18 @@
 from datetime import UTC, datetime
+from unittest.mock import patch
 
+import pytest
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.exc import DatabaseError
+from sqlalchemy.orm import sessionmaker
+
+from app.db.objects import Analytics, Base, Click, ClickCounter
+from app.db.replicas import RecentWrites, ReplicaSet
 from app.models import ClickModel
+from app.repository import (
+    AsyncSqlAlchemyAnalyticsRepository,
+    SqlAlchemyAnalyticsRepository,
+)
 
 
 def test_should_record_click_when_no_existing_analytics(
@@ -9,7 +21,8 @@ def test_should_record_click_when_no_existing_analytics(
     click = sample_clicks[0]
     short_link = sample_short_links[0]
 
-    result = repository.record_click(click, short_link)
+    assert repository.record_click(click, short_link) is None
+    result = repository.get_analytics_by_short_link(short_link)
 
     assert result is not None
     assert result.short_link == short_link
@@ -27,7 +40,8 @@ def test_should_add_click_to_existing_analytics(
     short_link = sample_short_links[0]
 
     repository.record_click(click1, short_link)
-    result = repository.record_click(click2, short_link)
+    repository.record_click(click2, short_link)
+    result = repository.get_analytics_by_short_link(short_link)
 
     assert result is not None
     assert result.short_link == short_link
@@ -65,11 +79,11 @@ def test_should_update_timestamp_when_recording_click(
     click2 = sample_clicks[1]
     short_link = sample_short_links[0]
 
-    first_result = repository.record_click(click1, short_link)
-    first_timestamp = first_result.updated_at
+    repository.record_click(click1, short_link)
+    first_timestamp = repository.get_analytics_by_short_link(short_link).updated_at
 
-    second_result = repository.record_click(click2, short_link)
-    second_timestamp = second_result.updated_at
+    repository.record_click(click2, short_link)
+    second_timestamp = repository.get_analytics_by_short_link(short_link).updated_at
 
     assert second_timestamp >= first_timestamp
 
@@ -114,7 +128,9 @@ def test_should_persist_clicks_across_sessions(
     Session = sessionmaker(bind=new_session)
     new_session_instance = Session()
 
-    from app.repository import SqlAlchemyAnalyticsRepository
+    from app.repository import (
+        SqlAlchemyAnalyticsRepository,
+    )
 
     new_repository = SqlAlchemyAnalyticsRepository(new_session_instance)
 
@@ -145,7 +161,8 @@ def test_should_handle_duplicate_ips_for_same_short_link(
     short_link = sample_short_links[0]
 
     repository.record_click(click1, short_link)
-    result = repository.record_click(click2, short_link)
+    repository.record_click(click2, short_link)
+    result = repository.get_analytics_by_short_link(short_link)
 
     assert result is not None
     assert len(result.clicks) == 2
@@ -190,3 +207,180 @@ def test_should_handle_large_number_of_clicks(repository, sample_short_links):
 
     unique_ips = {click.ip for click in result.clicks}
     assert len(unique_ips) == 50
+
+
+def test_should_record_batch_of_clicks_across_links(
+    repository, sample_clicks, sample_short_links
+):
+    repository.record_click(sample_clicks[0], sample_short_links[0])
+    batch = [
+        (sample_short_links[0], sample_clicks[1]),
+        (sample_short_links[1], sample_clicks[2]),
+        (sample_short_links[0], sample_clicks[2]),
+    ]
+
+    recorded = repository.record_clicks(batch)
+
+    assert recorded == 3
+    first = repository.get_analytics_by_short_link(sample_short_links[0])
+    assert [click.ip for click in first.clicks] == [
+        sample_clicks[0].ip,
+        sample_clicks[1].ip,
+        sample_clicks[2].ip,
+    ]
+    second = repository.get_analytics_by_short_link(sample_short_links[1])
+    assert len(second.clicks) == 1
+    assert repository.record_clicks([]) == 0
+
+
+def test_should_record_batch_in_one_transaction(
+    repository, db_session, sample_clicks, sample_short_links
+):
+    batch = [(sample_short_links[0], sample_clicks[0])]
+    statements = []
+    event.listen(
+        db_session.get_bind(),
+        "before_cursor_execute",
+        lambda *args: statements.append(args[2]),
+    )
+    with patch.object(db_session, "commit", wraps=db_session.commit) as commit:
+        repository.record_clicks(batch * 100)
+
+    assert commit.call_count == 1
+    # Analytics upsert, clicks insert, counters upsert
+    assert len([sql for sql in statements if sql.startswith("INSERT")]) == 3
+
+
+def test_should_not_read_click_history_when_recording_click(
+    repository, db_session, sample_clicks, sample_short_links
+):
+    short_link = sample_short_links[0]
+    repository.record_clicks([(short_link, click) for click in sample_clicks])
+    statements = []
+    event.listen(
+        db_session.get_bind(),
+        "before_cursor_execute",
+        lambda *args: statements.append(args[2]),
+    )
+
+    repository.record_click(sample_clicks[0], short_link)
+
+    assert not [
+        sql for sql in statements if sql.startswith("SELECT") and "clicks" in sql
+    ]
+
+
+def test_should_leave_no_analytics_row_when_click_insert_fails(
+    repository, db_session, sample_clicks, sample_short_links
+):
+    batch = [(sample_short_links[0], sample_clicks[0])]
+    original_execute = db_session.execute
+
+    def fail_on_clicks(statement, *args, **kwargs):
+        if str(statement).startswith("INSERT INTO clicks"):
+            raise DatabaseError("INSERT", {}, Exception("disk full"))
+        return original_execute(statement, *args, **kwargs)
+
+    with (
+        patch.object(db_session, "execute", side_effect=fail_on_clicks),
+        pytest.raises(DatabaseError),
+    ):
+        repository.record_clicks(batch)
+
+    assert repository.get_analytics_by_short_link(sample_short_links[0]) is None
+
+
+def test_should_fall_back_to_primary_when_replica_misses_or_fails(
+    db_session, sample_clicks, tmp_path
+):
+    replica_engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(replica_engine)
+    broken_engine = create_engine(f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+    replicas = ReplicaSet(
+        [sessionmaker(bind=replica_engine), sessionmaker(bind=broken_engine)],
+        30.0,
+        RecentWrites(0.0),
+    )
+    repository = SqlAlchemyAnalyticsRepository(db_session, replicas=replicas)
+    repository.record_click(sample_clicks[0], "abc12345")
+
+    try:
+        # Empty replica, then broken replica: both end up on the primary
+        for _ in range(2):
+            result = repository.get_analytics_by_short_link("abc12345")
+            assert result is not None
+            assert len(result.clicks) == 1
+        assert {replicas.choose()[0] for _ in range(3)} == {0}
+    finally:
+        replica_engine.dispose()
+        broken_engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_should_record_batches_with_async_repository(
+    async_session_factory, sample_clicks, sample_short_links
+):
+    replicas = ReplicaSet([sessionmaker()], 30.0, RecentWrites(5.0))
+    repository = AsyncSqlAlchemyAnalyticsRepository(
+        async_session_factory, replicas=replicas
+    )
+    first, second = sample_short_links[:2]
+
+    await repository.record_clicks(
+        [(first, sample_clicks[0]), (second, sample_clicks[1])]
+    )
+    await repository.record_click(sample_clicks[2], first)
+
+    async with async_session_factory() as session:
+        analytics = await session.scalar(select(func.count()).select_from(Analytics))
+        clicks = await session.execute(
+            select(Analytics.short_link, func.count(Click.id))
+            .join(Click)
+            .group_by(Analytics.short_link)
+        )
+    assert analytics == 2
+    assert dict(clicks.tuples().all()) == {first: 2, second: 1}
+    assert first in replicas.recent_writes
+
+
+def _click(ip: str, country: str, month: int, day: int) -> ClickModel:
+    # Naive local time, as the repository stores it
+    created_at = datetime(2026, month, day, tzinfo=UTC).astimezone()
+    return ClickModel(
+        ip=ip, city="", country=country, created_at=created_at.replace(tzinfo=None)
+    )
+
+
+def test_should_keep_click_counters_in_step_with_clicks(repository, sample_short_links):
+    short_link = sample_short_links[0]
+    latest = _click("1", "US", 3, 2)
+    repository.record_clicks(
+        [(short_link, latest), (short_link, _click("2", "NG", 3, 1))]
+    )
+    # A click buffered for longer arrives after a later one
+    repository.record_click(_click("3", "US", 2, 1), short_link)
+
+    counts = repository.get_click_counts(short_link)
+
+    assert counts is not None
+    assert counts.total == 3
+    assert counts.countries == {"US": 2, "NG": 1}
+    assert counts.last_click_at == latest.created_at
+    assert repository.get_click_counts(sample_short_links[1]) is None
+
+
+@pytest.mark.asyncio
+async def test_should_update_click_counters_from_async_repository(
+    async_session_factory, sample_clicks, sample_short_links
+):
+    repository = AsyncSqlAlchemyAnalyticsRepository(async_session_factory)
+    short_link = sample_short_links[0]
+
+    await repository.record_clicks([(short_link, click) for click in sample_clicks])
+    await repository.record_click(sample_clicks[0], short_link)
+
+    async with async_session_factory() as session:
+        counters = await session.execute(
+            select(ClickCounter.country, ClickCounter.clicks)
+        )
+    assert dict(counters.tuples().all()) == {"US": 3, "UK": 1}
@@ -0,0 +1,95 @@
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app.metrics import metrics
+from app.retry import RetryBudget, RetryPolicy
+
+
+def _transient_error() -> OperationalError:
+    return OperationalError("SELECT 1", {}, Exception("connection reset"))
+
+
+def _policy(name: str, budget: RetryBudget | None = None) -> RetryPolicy:
+    return RetryPolicy(
+        name,
+        budget or RetryBudget(ratio=0.1, capacity=10),
+        max_attempts=3,
+        base_delay=0.01,
+        max_delay=0.05,
+    )
+
+
+def test_should_retry_transient_errors_and_roll_back_between_attempts():
+    func = Mock(side_effect=[_transient_error(), _transient_error(), "ok"])
+    on_retry = Mock()
+
+    with patch("app.retry.time.sleep") as sleep:
+        result = _policy("test_retry").call(func, "load", on_retry=on_retry)
+
+    assert result == "ok"
+    assert on_retry.call_count == 2
+    assert all(0.01 <= call.args[0] <= 0.05 for call in sleep.call_args_list)
+
+
+def test_should_give_up_after_max_attempts():
+    error = _transient_error()
+    gave_up = metrics.get("retry.test_give_up.gave_up")
+
+    with patch("app.retry.time.sleep"), pytest.raises(OperationalError) as raised:
+        _policy("test_give_up").call(Mock(side_effect=error), "load")
+
+    assert raised.value is error
+    assert metrics.get("retry.test_give_up.gave_up") == gave_up + 1
+
+
+def test_should_not_retry_other_errors():
+    func = Mock(side_effect=ValueError("bad input"))
+
+    with pytest.raises(ValueError):
+        _policy("test_other").call(func, "load")
+
+    assert func.call_count == 1
+
+
+def test_should_stop_retrying_once_budget_is_spent():
+    budget = RetryBudget(ratio=0.5, capacity=1)
+    policy = _policy("test_budget", budget)
+    failing = Mock(side_effect=_transient_error())
+
+    with patch("app.retry.time.sleep"):
+        with pytest.raises(OperationalError):
+            policy.call(failing, "load")
+        calls_with_budget = failing.call_count
+        with pytest.raises(OperationalError):
+            policy.call(failing, "load")
+
+    # The one saved token buys a single retry; half a token buys none
+    assert calls_with_budget == 2
+    assert failing.call_count == 2 + 1
+    assert metrics.get("retry.test_budget.budget_exhausted") >= 1
+
+
+def test_should_cap_budget_at_capacity():
+    budget = RetryBudget(ratio=1.0, capacity=2)
+
+    for _ in range(10):
+        budget.deposit()
+
+    assert budget.tokens == 2
+
+
+@pytest.mark.asyncio
+async def test_should_sleep_without_blocking_on_async_path():
+    func = AsyncMock(side_effect=[_transient_error(), "ok"])
+
+    with (
+        patch("app.retry.asyncio.sleep", new=AsyncMock()) as sleep,
+        patch("app.retry.time.sleep") as blocking_sleep,
+    ):
+        result = await _policy("test_async").call_async(func, "load")
+
+    assert result == "ok"
+    sleep.assert_awaited_once()
+    blocking_sleep.assert_not_called()
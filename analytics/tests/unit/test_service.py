@@ -3,7 +3,7 @@ from unittest.mock import Mock
 
 import pytest
 
-from app.models import AnalyticsModel
+from app.models import AnalyticsModel, ClickCountsModel
 from app.service import AnalyticsService
 
 
@@ -91,3 +91,21 @@ def test_should_pass_through_repository_result_unchanged(
     assert result.short_link == expected_analytics.short_link
     assert result.clicks == expected_analytics.clicks
     assert result.updated_at == expected_analytics.updated_at
+
+
+def test_should_retrieve_click_counts_from_repository(sample_short_links):
+    mock_repository = Mock()
+    expected_counts = ClickCountsModel(
+        short_link=sample_short_links[0],
+        total=2,
+        last_click_at=datetime.now(UTC),
+        countries={"US": 2},
+    )
+    mock_repository.get_click_counts.return_value = expected_counts
+
+    service = AnalyticsService(mock_repository)
+
+    result = service.retrieve_click_counts(sample_short_links[0])
+
+    assert result == expected_counts
+    mock_repository.get_click_counts.assert_called_once_with(sample_short_links[0])
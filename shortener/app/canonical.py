@@ -0,0 +1,65 @@
+import hashlib
+import re
+from urllib.parse import urlsplit, urlunsplit
+
+from pydantic import HttpUrl, TypeAdapter
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+_PERCENT_ESCAPE = re.compile(r"%[0-9a-fA-F]{2}")
+
+_HTTP_URL: TypeAdapter[HttpUrl] = TypeAdapter(HttpUrl)
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Normalise the parts of a URL that never change where it points: scheme
+    and host case, default ports, an empty path and the case of percent
+    escapes. Query strings and fragments are kept as they are, since servers
+    and pages may give their order or content meaning.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+
+    netloc = (parts.hostname or "").lower()
+    if parts.port is not None and parts.port != DEFAULT_PORTS.get(scheme):
+        netloc = f"{netloc}:{parts.port}"
+    if parts.username is not None:
+        userinfo = parts.username
+        if parts.password is not None:
+            userinfo = f"{userinfo}:{parts.password}"
+        netloc = f"{userinfo}@{netloc}"
+
+    path = _uppercase_escapes(parts.path) or "/"
+    query = _uppercase_escapes(parts.query)
+    fragment = _uppercase_escapes(parts.fragment)
+
+    return urlunsplit((scheme, netloc, path, query, fragment))
+
+
+def url_hash(url: str) -> str:
+    """Fixed-width key for the canonical form of a URL, used for dedupe"""
+    return hashlib.sha256(canonicalize_url(url).encode("utf-8")).hexdigest()
+
+
+def link_host(url: str) -> str | None:
+    """Host of a URL as stored for search, see normalize_host"""
+    hostname = urlsplit(url.strip()).hostname
+    return normalize_host(hostname) if hostname else None
+
+
+def normalize_host(host: str) -> str:
+    """
+    A bare domain in the form hosts are stored in: IDNA-encoded the way
+    HttpUrl encodes links, lowercased and without a trailing dot. Raises
+    ValueError for a name that is not a valid host.
+    """
+    host = host.strip()
+    if not host.isascii():
+        # HttpUrl follows UTS #46, which differs from Python's idna codec
+        host = _HTTP_URL.validate_python(f"http://{host}/").host or host
+    return host.lower().rstrip(".")
+
+
+def _uppercase_escapes(value: str) -> str:
+    return _PERCENT_ESCAPE.sub(lambda match: match.group(0).upper(), value)
@@ -0,0 +1,179 @@
+import base64
+import hashlib
+import itertools
+import logging
+from abc import ABC, abstractmethod
+from threading import Lock
+from typing import ClassVar, Optional
+
+import redis
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.config import get_settings
+from app.constants import SHORT_CODE_BLOCK_SIZE, SHORT_URL_LENGTH
+from app.db.objects import ShortCodeBlock
+
+log = logging.getLogger(__name__)
+
+# Every base64url character carries 6 bits, so 8 characters hold 48 bits
+CODE_BITS = SHORT_URL_LENGTH * 6
+
+# Outside the url:* namespace so RedisCache.clear() never resets it
+REDIS_BLOCK_KEY = "short_code:block"
+
+
+class FeistelPermutation:
+    """
+    Keyed bijection on [0, 2**bits). Sequential IDs come out spread over the
+    whole code space, so codes cannot be enumerated without the key, while
+    distinct IDs can never map to the same code.
+    """
+
+    ROUNDS = 4
+
+    def __init__(self, key: bytes, bits: int = CODE_BITS):
+        if bits % 2:
+            raise ValueError("Feistel permutation needs an even number of bits")
+        self.bits = bits
+        self._half_bits = bits // 2
+        self._half_mask = (1 << self._half_bits) - 1
+        self._key = hashlib.sha256(key).digest()
+
+    def permute(self, value: int) -> int:
+        left, right = value >> self._half_bits, value & self._half_mask
+        for round_number in range(self.ROUNDS):
+            left, right = right, left ^ self._round(round_number, right)
+        return (left << self._half_bits) | right
+
+    def invert(self, value: int) -> int:
+        left, right = value >> self._half_bits, value & self._half_mask
+        for round_number in reversed(range(self.ROUNDS)):
+            left, right = right ^ self._round(round_number, left), left
+        return (left << self._half_bits) | right
+
+    def _round(self, round_number: int, half: int) -> int:
+        digest = hashlib.blake2b(
+            half.to_bytes(8, "big"),
+            key=self._key,
+            digest_size=8,
+            person=round_number.to_bytes(16, "big"),
+        ).digest()
+        return int.from_bytes(digest, "big") & self._half_mask
+
+
+def encode_code(value: int) -> str:
+    """Render a CODE_BITS integer as a fixed-width base64url short code"""
+    return base64.urlsafe_b64encode(value.to_bytes(CODE_BITS // 8, "big")).decode()
+
+
+class IdBlockAllocator(ABC):
+    @abstractmethod
+    def next_block(self) -> int:
+        """Return a block number that is never handed out again"""
+        raise NotImplementedError
+
+
+class DatabaseIdBlockAllocator(IdBlockAllocator):
+    """Leases blocks from the auto-incremented short_code_blocks table"""
+
+    def __init__(self, session_factory: sessionmaker[Session]):
+        self.session_factory = session_factory
+
+    def next_block(self) -> int:
+        with self.session_factory() as session:
+            block = ShortCodeBlock()
+            session.add(block)
+            session.commit()
+            return int(block.id)  # type: ignore[arg-type]
+
+
+class RedisIdBlockAllocator(IdBlockAllocator):
+    def __init__(self, client: redis.Redis):
+        self._client = client
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisIdBlockAllocator":
+        return cls(redis.Redis.from_url(url))
+
+    def next_block(self) -> int:
+        return int(self._client.incr(REDIS_BLOCK_KEY))  # type: ignore[arg-type]
+
+
+class InMemoryIdBlockAllocator(IdBlockAllocator):
+    """Process-local blocks, for tests and single-process setups"""
+
+    def __init__(self) -> None:
+        self._blocks = itertools.count(1)
+        self._lock = Lock()
+
+    def next_block(self) -> int:
+        with self._lock:
+            return next(self._blocks)
+
+
+class ShortCodeGenerator:
+    """
+    Hands out codes for IDs from a leased block, leasing the next block from
+    the shared allocator once the current one runs out. Codes from different
+    pods never collide, so no read is needed before inserting one.
+    """
+
+    _instance: ClassVar[Optional["ShortCodeGenerator"]] = None
+    _lock: ClassVar[Lock] = Lock()
+
+    @classmethod
+    def get_instance(
+        cls, session_factory: sessionmaker[Session]
+    ) -> "ShortCodeGenerator":
+        if not cls._instance:
+            with cls._lock:
+                if not cls._instance:
+                    settings = get_settings()
+                    if not settings.SHORT_CODE_SECRET:
+                        raise ValueError(
+                            "SHORT_CODE_SECRET must be set when "
+                            "SHORT_CODE_STRATEGY is 'sequence'"
+                        )
+                    allocator: IdBlockAllocator
+                    if settings.SHORT_CODE_ID_SOURCE == "redis":
+                        allocator = RedisIdBlockAllocator.from_url(settings.REDIS_URL)
+                    else:
+                        allocator = DatabaseIdBlockAllocator(session_factory)
+                    cls._instance = cls(
+                        allocator, settings.SHORT_CODE_SECRET.encode("utf-8")
+                    )
+        return cls._instance
+
+    def __init__(
+        self,
+        allocator: IdBlockAllocator,
+        secret: bytes,
+        block_size: int = SHORT_CODE_BLOCK_SIZE,
+    ):
+        self.block_size = block_size
+        self._allocator = allocator
+        self._permutation = FeistelPermutation(secret)
+        self._next_id = 0
+        self._end_id = 0
+        self._mutex = Lock()
+
+    def next_code(self) -> str:
+        return self.next_codes(1)[0]
+
+    def next_codes(self, count: int) -> list[str]:
+        values = []
+        with self._mutex:
+            for _ in range(count):
+                if self._next_id >= self._end_id:
+                    self._lease_block()
+                values.append(self._next_id)
+                self._next_id += 1
+        return [encode_code(self._permutation.permute(value)) for value in values]
+
+    def _lease_block(self) -> None:
+        block = self._allocator.next_block()
+        start = block * self.block_size
+        if start + self.block_size > 1 << CODE_BITS:
+            raise ValueError("Short code space exhausted")
+        log.info(f"Leased short code block {block}")
+        self._next_id, self._end_id = start, start + self.block_size
@@ -1,6 +1,7 @@
 import logging
 import sys
 from functools import lru_cache
+from typing import Literal
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -11,25 +12,92 @@ class Settings(BaseSettings):
 
     DATABASE_URL: str
 
+    # Per-engine connection pool. Each pod may open up to
+    # DB_POOL_SIZE + DB_MAX_OVERFLOW connections per engine, so size these
+    # against Postgres max_connections divided by the pod count.
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800  # -1 never recycles
+    DB_POOL_PRE_PING: bool = True
+    # Set when DATABASE_URL points at PgBouncer in transaction pooling mode;
+    # disables asyncpg's server-side prepared statement cache
+    DB_PGBOUNCER_MODE: bool = False
+
+    # Comma-separated read replica URLs for lookups and listings. A failing
+    # replica is skipped for DB_REPLICA_RETRY_SECONDS. Codes created through
+    # this pod within DB_REPLICA_LAG_GUARD_SECONDS, and codes a replica does
+    # not know yet, are read from the primary.
+    DATABASE_REPLICA_URLS: str = ""
+    DB_REPLICA_RETRY_SECONDS: float = 30.0
+    DB_REPLICA_LAG_GUARD_SECONDS: float = 5.0
+
     SERVICE_PORT: int = 8000
 
     ANALYTICS_SERVICE_GRPC: str = "analytics:50051"
+    # Clicks are buffered and sent with RecordClicks, one call per
+    # ANALYTICS_BATCH_SIZE clicks or per ANALYTICS_FLUSH_INTERVAL_MS. While
+    # the service is unreachable at most ANALYTICS_BUFFER_MAX_CLICKS are
+    # kept. Disable to send one RecordClick per redirect.
+    ANALYTICS_BATCHING_ENABLED: bool = True
+    ANALYTICS_BATCH_SIZE: int = 500
+    ANALYTICS_FLUSH_INTERVAL_MS: int = 200
+    ANALYTICS_BUFFER_MAX_CLICKS: int = 50000
 
     ENVIRONMENT: str = "development"
 
+    # "random" hashes a salted URL and checks the code is free before use.
+    # "sequence" permutes IDs leased in blocks from SHORT_CODE_ID_SOURCE, so
+    # codes never collide. SHORT_CODE_SECRET keys the permutation; every pod
+    # must share it and it must never change.
+    SHORT_CODE_STRATEGY: Literal["random", "sequence"] = "random"
+    SHORT_CODE_ID_SOURCE: Literal["database", "redis"] = "database"
+    SHORT_CODE_SECRET: str = ""
+
     CACHE_ENABLED: bool = True
     CACHE_MAX_SIZE: int = 1000
     CACHE_TTL_SECONDS: int = 300  # 5 minutes
 
+    # Probabilistic early refresh (XFetch) of Redis entries on the redirect
+    # path. Higher beta refreshes earlier; 1.0 is the usual choice.
+    CACHE_EARLY_REFRESH_ENABLED: bool = True
+    CACHE_EARLY_REFRESH_BETA: float = 1.0
+
+    # In-process tier in front of Redis, sized by CACHE_MAX_SIZE. Its TTL
+    # bounds how long a pod may serve a link deleted through another pod.
+    LOCAL_CACHE_ENABLED: bool = True
+    LOCAL_CACHE_TTL_SECONDS: int = 30
+
+    # Tombstones for unknown short codes. The Redis TTL doubles as the budget
+    # window, so at most NEGATIVE_CACHE_MAX_ENTRIES tombstones live at once.
+    NEGATIVE_CACHE_ENABLED: bool = True
+    NEGATIVE_CACHE_TTL_SECONDS: int = 30
+    NEGATIVE_CACHE_LOCAL_TTL_SECONDS: int = 5
+    NEGATIVE_CACHE_MAX_ENTRIES: int = 10000
+
+    # Concurrent misses for a code always share one database load per pod.
+    # The Redis lock extends this across pods: a pod that loses the race polls
+    # the cache for up to SINGLE_FLIGHT_LOCK_WAIT_MS before querying itself.
+    SINGLE_FLIGHT_DISTRIBUTED: bool = False
+    SINGLE_FLIGHT_LOCK_TTL_MS: int = 2000
+    SINGLE_FLIGHT_LOCK_WAIT_MS: int = 100
+
     REDIS_URL: str = "redis://redis:6379/0"
     REDIS_CONNECTION_POOL_SIZE: int = 10
     REDIS_SOCKET_CONNECT_TIMEOUT: int = 5
     REDIS_SOCKET_TIMEOUT: int = 5
+    REDIS_POOL_TIMEOUT: float = 1.0  # max wait for a free pooled connection
 
     model_config = SettingsConfigDict(
         case_sensitive=True,
     )
 
+    @property
+    def replica_urls(self) -> list[str]:
+        return [
+            url.strip() for url in self.DATABASE_REPLICA_URLS.split(",") if url.strip()
+        ]
+
     def configure_logging(self):
         numeric_level = getattr(logging, self.LOG_LEVEL.upper(), logging.INFO)
 
@@ -1,6 +1,19 @@
 # URL Generation
 NANOSECONDS_MULTIPLIER = 1_000_000
 SHORT_URL_LENGTH = 8
+# IDs leased per block by the sequence code generator. Block numbers are
+# multiplied by this, so it must not change once codes have been issued.
+SHORT_CODE_BLOCK_SIZE = 1000
+# Max URLs accepted by one bulk shorten request; keeps the multi-row insert
+# well under database bind parameter limits
+BULK_SHORTEN_MAX_URLS = 1000
+# Page size limits for listing URLs
+LIST_PAGE_SIZE = 100
+LIST_PAGE_MAX_SIZE = 1000
+# Rows fetched per round trip by the streaming export cursor
+EXPORT_BATCH_SIZE = 1000
+# Rows the bulk importer reads, validates and loads per transaction
+IMPORT_CHUNK_SIZE = 5000
 
 # Rate Limiting
 CLEANUP_MAX_AGE_SECONDS = 3600
@@ -17,8 +30,24 @@ TRUSTED_PROXY_NETWORKS = [
 # Cache Configuration
 CACHE_TTL_SECONDS = 300  # 5 minutes
 
+# Max seconds a coalesced lookup waits on another caller's database load
+# before running the query itself
+SINGLE_FLIGHT_WAIT_TIMEOUT_SECONDS = 5.0
+
+# Database retries: decorrelated jitter between the base and max delay, with
+# at most RETRY_BUDGET_RATIO of calls retried once the saved-up
+# RETRY_BUDGET_CAPACITY retries are spent
+RETRY_MAX_ATTEMPTS = 3
+RETRY_BASE_DELAY_SECONDS = 0.05
+RETRY_MAX_DELAY_SECONDS = 1.0
+RETRY_BUDGET_RATIO = 0.1
+RETRY_BUDGET_CAPACITY = 10.0
+
 # gRPC Client Timeouts and Retries
 GRPC_TIMEOUT_SECONDS = 5.0
 GRPC_MAX_RETRIES = 3
 GRPC_RETRY_DELAY_SECONDS = 1.0
 GRPC_BACKOFF_MULTIPLIER = 2.0
+
+# Seconds to wait for in-flight analytics calls during shutdown
+ANALYTICS_DRAIN_TIMEOUT_SECONDS = 2.0
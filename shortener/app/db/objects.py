@@ -1,9 +1,10 @@
 from datetime import UTC, datetime
 
 from pydantic import HttpUrl
-from sqlalchemy import Column, DateTime, Integer, String, Text
+from sqlalchemy import Column, DateTime, Index, Integer, String, Text
 from sqlalchemy.orm import DeclarativeBase
 
+from app.canonical import link_host, url_hash
 from app.models import UrlModel
 
 
@@ -13,11 +14,20 @@ class Base(DeclarativeBase):
 
 class Url(Base):
     __tablename__ = "urls"
+    # Serve keyset pagination on (created_at, id), optionally within a host
+    __table_args__ = (
+        Index("ix_urls_created_at_id", "created_at", "id"),
+        Index("ix_urls_host_created_at_id", "host", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     link = Column(Text, nullable=False)
     short_link = Column(String(8), unique=True, index=True, nullable=False)
+    # sha256 of the canonical link; NULL for duplicates created before dedupe
+    url_hash = Column(String(64), unique=True, index=True, nullable=True)
     created_at = Column(DateTime, nullable=False, default=lambda: datetime.now(UTC))
+    # Lowercased hostname of link, for searching by domain
+    host = Column(String(255), nullable=True)
 
     def to_model(self) -> UrlModel:
         return UrlModel(  # type: ignore
@@ -29,9 +39,20 @@ class Url(Base):
     @classmethod
     def from_model(cls, model: UrlModel) -> "Url":
         return cls(
-            link=model.link,
+            link=str(model.link),
             short_link=model.short_link,
+            url_hash=url_hash(str(model.link)),
+            host=link_host(str(model.link)),
         )
 
     def __repr__(self):
         return f"Url(id={self.id}, link={self.link}, short_link={self.short_link}, created_at={self.created_at})"
+
+
+class ShortCodeBlock(Base):
+    """One row per block of IDs leased by a sequence code generator"""
+
+    __tablename__ = "short_code_blocks"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    allocated_at = Column(DateTime, nullable=False, default=lambda: datetime.now(UTC))
@@ -0,0 +1,113 @@
+import time
+import uuid
+from collections.abc import Callable
+from typing import Any
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import (
+    AsyncAdaptedQueuePool,
+    ConnectionPoolEntry,
+    Pool,
+    QueuePool,
+)
+
+from app.config import Settings
+from app.metrics import metrics
+
+
+class _CheckoutTimer:
+    """
+    Times each checkout, which is how long a request waited for a pooled
+    connection. The pool's logging name keys the metrics; SQLAlchemy keeps it
+    when the pool is recreated.
+    """
+
+    _orig_logging_name: str | None
+
+    def _metric_name(self) -> str:
+        return f"db.{self._orig_logging_name or 'default'}"
+
+    def _timed_checkout(
+        self, checkout: Callable[[], ConnectionPoolEntry]
+    ) -> ConnectionPoolEntry:
+        name = self._metric_name()
+        started = time.perf_counter()
+        try:
+            return checkout()
+        except PoolTimeoutError:
+            metrics.increment(f"{name}.checkout_timeouts")
+            raise
+        finally:
+            metrics.increment(f"{name}.checkouts")
+            metrics.increment(
+                f"{name}.checkout_wait_seconds", time.perf_counter() - started
+            )
+
+
+class InstrumentedQueuePool(_CheckoutTimer, QueuePool):
+    def _do_get(self) -> ConnectionPoolEntry:
+        return self._timed_checkout(super()._do_get)
+
+
+class InstrumentedAsyncQueuePool(_CheckoutTimer, AsyncAdaptedQueuePool):
+    def _do_get(self) -> ConnectionPoolEntry:
+        return self._timed_checkout(super()._do_get)
+
+
+def pool_stats(pool: Pool) -> dict[str, Any]:
+    if not isinstance(pool, QueuePool):
+        return {}
+    name = f"db.{pool._orig_logging_name or 'default'}"
+    checkouts = metrics.get(f"{name}.checkouts")
+    wait_seconds = metrics.get(f"{name}.checkout_wait_seconds")
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "checkouts": checkouts,
+        "checkout_timeouts": metrics.get(f"{name}.checkout_timeouts"),
+        "mean_checkout_wait_ms": (
+            wait_seconds / checkouts * 1000 if checkouts else 0.0
+        ),
+    }
+
+
+def engine_options(
+    settings: Settings, url: str, name: str, is_async: bool = False
+) -> dict[str, Any]:
+    """
+    Keyword arguments for create_engine / create_async_engine built from the
+    DB_* settings. Each pod holds up to DB_POOL_SIZE + DB_MAX_OVERFLOW
+    connections per engine, so size them against max_connections divided
+    by the number of pods.
+    """
+    parsed = make_url(url)
+    options: dict[str, Any] = {
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_logging_name": name,
+    }
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (
+        None,
+        "",
+        ":memory:",
+    ):
+        # In-memory SQLite keeps one connection per thread; there is no queue
+        return options
+
+    options.update(
+        poolclass=InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+    )
+    if settings.DB_PGBOUNCER_MODE and parsed.get_driver_name() == "asyncpg":
+        # PgBouncer in transaction mode may run each statement on another
+        # server connection, where a named prepared statement does not exist
+        options["connect_args"] = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+        }
+    return options
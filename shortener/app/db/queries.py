@@ -0,0 +1,30 @@
+"""
+Prebuilt Core statements for the hot lookups.
+
+They are built once at import and select table columns rather than ORM
+attributes, so executing one skips statement construction, the ORM compile
+plugin and entity hydration. Values are bound per call and rows come back
+as plain tuples.
+"""
+
+from sqlalchemy import bindparam, select
+
+from app.db.objects import Url
+
+urls = Url.__table__
+
+SELECT_LINK_BY_CODE = (
+    select(urls.c.link, urls.c.created_at)
+    .where(urls.c.short_link == bindparam("short_link"))
+    .limit(1)
+)
+
+SELECT_URL_BY_HASH = (
+    select(urls.c.link, urls.c.short_link, urls.c.created_at)
+    .where(urls.c.url_hash == bindparam("url_hash"))
+    .limit(1)
+)
+
+SELECT_URLS_BY_HASHES = select(
+    urls.c.link, urls.c.short_link, urls.c.url_hash, urls.c.created_at
+).where(urls.c.url_hash.in_(bindparam("url_hashes", expanding=True)))
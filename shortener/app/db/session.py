@@ -1,13 +1,80 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.config import Settings, get_settings
+from app.db.pool import engine_options, pool_stats
+from app.db.replicas import RecentWrites, ReplicaSet
+from app.metrics import metrics
 
 Config: Settings = get_settings()
 
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
 db_url = Config.DATABASE_URL
 if not db_url:
     raise ValueError("DATABASE_URL environment variable not set")
 
-engine = create_engine(db_url)
+
+def to_async_url(url: str) -> str:
+    """Map a sync DATABASE_URL onto the equivalent asyncio driver"""
+    parsed = make_url(url)
+    drivername = ASYNC_DRIVERS.get(parsed.drivername, parsed.drivername)
+    return parsed.set(drivername=drivername).render_as_string(hide_password=False)
+
+
+engine = create_engine(db_url, **engine_options(Config, db_url, "shortener"))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+async_db_url = to_async_url(db_url)
+async_engine = create_async_engine(
+    async_db_url,
+    **engine_options(Config, async_db_url, "shortener_async", is_async=True),
+)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
+replica_engines = [
+    create_engine(url, **engine_options(Config, url, f"replica{index}"))
+    for index, url in enumerate(Config.replica_urls)
+]
+async_replica_engines = [
+    create_async_engine(
+        to_async_url(url),
+        **engine_options(
+            Config, to_async_url(url), f"replica{index}_async", is_async=True
+        ),
+    )
+    for index, url in enumerate(Config.replica_urls)
+]
+
+# Shared so a code created through the sync path is guarded on redirects too
+recent_writes = RecentWrites(Config.DB_REPLICA_LAG_GUARD_SECONDS)
+ReadReplicas = ReplicaSet(
+    [
+        sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+        for replica_engine in replica_engines
+    ],
+    Config.DB_REPLICA_RETRY_SECONDS,
+    recent_writes,
+)
+AsyncReadReplicas = ReplicaSet(
+    [
+        async_sessionmaker(bind=replica_engine, autoflush=False, expire_on_commit=False)
+        for replica_engine in async_replica_engines
+    ],
+    Config.DB_REPLICA_RETRY_SECONDS,
+    recent_writes,
+)
+
+metrics.register_collector("db_pool", lambda: pool_stats(engine.pool))
+metrics.register_collector(
+    "db_async_pool", lambda: pool_stats(async_engine.sync_engine.pool)
+)
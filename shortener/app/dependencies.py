@@ -1,26 +1,59 @@
+from collections.abc import AsyncIterator, Iterator
+
 from fastapi import Depends
+from sqlalchemy.orm import Session, sessionmaker
 
+from app.codes import ShortCodeGenerator
 from app.config import Settings, get_settings
-from app.db.session import SessionLocal
+from app.db.session import (
+    AsyncReadReplicas,
+    AsyncSessionLocal,
+    ReadReplicas,
+    SessionLocal,
+)
 from app.grpc.client import AnalyticsClient, GrpcAnalyticsClient
-from app.repository import SqlAlchemyUrlRepository, UrlRepository
-from app.service import UrlShortenerService
+from app.repository import (
+    AsyncSqlAlchemyUrlRepository,
+    AsyncUrlRepository,
+    SqlAlchemyUrlRepository,
+    UrlRepository,
+)
+from app.service import AsyncUrlShortenerService, UrlShortenerService
 
 
 def get_settings_dependency() -> Settings:
     return get_settings()
 
 
-def get_session():
-    session = SessionLocal()
+def get_session_factory() -> sessionmaker[Session]:
+    """
+    For read-only work that outlives the request, such as streamed
+    responses. Uses a healthy read replica when one is configured.
+    """
+    choice = ReadReplicas.choose()
+    return choice[1] if choice is not None else SessionLocal
+
+
+def get_repository() -> Iterator[UrlRepository]:
+    # The session is opened on first use and released after each operation
+    repository = SqlAlchemyUrlRepository(
+        session_factory=SessionLocal, replicas=ReadReplicas
+    )
     try:
-        yield session
+        yield repository
     finally:
-        session.close()
+        repository.close()
 
 
-def get_repository(session=Depends(get_session)) -> UrlRepository:
-    return SqlAlchemyUrlRepository(db_session=session)
+async def get_async_repository() -> AsyncIterator[AsyncUrlRepository]:
+    # Async so the redirect path does not hop to the threadpool
+    repository = AsyncSqlAlchemyUrlRepository(
+        session_factory=AsyncSessionLocal, replicas=AsyncReadReplicas
+    )
+    try:
+        yield repository
+    finally:
+        repository.close()
 
 
 def get_analytics_client(
@@ -29,8 +62,24 @@ def get_analytics_client(
     return GrpcAnalyticsClient.get_instance(target=settings.ANALYTICS_SERVICE_GRPC)
 
 
+def get_code_generator(
+    settings: Settings = Depends(get_settings_dependency),
+) -> ShortCodeGenerator | None:
+    if settings.SHORT_CODE_STRATEGY != "sequence":
+        return None
+    return ShortCodeGenerator.get_instance(session_factory=SessionLocal)
+
+
 def get_url_service(
     repository: UrlRepository = Depends(get_repository),
     analytics_client: AnalyticsClient = Depends(get_analytics_client),
+    code_generator: ShortCodeGenerator | None = Depends(get_code_generator),
 ) -> UrlShortenerService:
-    return UrlShortenerService(repository, analytics_client)
+    return UrlShortenerService(repository, analytics_client, code_generator)
+
+
+def get_async_url_service(
+    repository: AsyncUrlRepository = Depends(get_async_repository),
+    analytics_client: AnalyticsClient = Depends(get_analytics_client),
+) -> AsyncUrlShortenerService:
+    return AsyncUrlShortenerService(repository, analytics_client)
@@ -0,0 +1,133 @@
+"""
+Streaming export of every short link, for reconciliation jobs.
+
+    python -m app.export --format csv --created-from 2026-01-01 > links.csv
+
+Rows come from a server-side cursor in created_at order and are written as
+plain strings, so memory stays flat however large the table is.
+"""
+
+import argparse
+import csv
+import io
+import json
+import sys
+from collections.abc import Iterator
+from datetime import datetime
+from typing import Literal
+
+from sqlalchemy import Row, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.constants import EXPORT_BATCH_SIZE
+from app.db.objects import Url
+from app.db.session import SessionLocal
+
+ExportFormat = Literal["ndjson", "csv"]
+
+EXPORT_COLUMNS = ("short_link", "link", "created_at")
+
+MEDIA_TYPES: dict[ExportFormat, str] = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def iter_rows(
+    session: Session,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> Iterator[Row]:
+    """
+    Rows created in [created_from, created_to), oldest first. yield_per
+    streams results through a server-side cursor where the driver has one.
+    """
+    statement = select(Url.short_link, Url.link, Url.created_at).order_by(
+        Url.created_at, Url.id
+    )
+    if created_from is not None:
+        statement = statement.where(Url.created_at >= created_from)
+    if created_to is not None:
+        statement = statement.where(Url.created_at < created_to)
+    yield from session.execute(statement.execution_options(yield_per=batch_size))
+
+
+def render(rows: Iterator[Row], fmt: ExportFormat, batch_size: int) -> Iterator[str]:
+    """Serialise rows, yielding one string per batch to keep writes large"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    if fmt == "csv":
+        writer.writerow(EXPORT_COLUMNS)
+
+    pending = 0
+    for short_link, link, created_at in rows:
+        if fmt == "csv":
+            writer.writerow((short_link, link, created_at.isoformat()))
+        else:
+            buffer.write(
+                json.dumps(
+                    {
+                        "short_link": short_link,
+                        "link": link,
+                        "created_at": created_at.isoformat(),
+                    }
+                )
+            )
+            buffer.write("\n")
+        pending += 1
+        if pending >= batch_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def stream_export(
+    session_factory: sessionmaker[Session],
+    fmt: ExportFormat,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> Iterator[str]:
+    """Own the session for the whole stream, which outlives the request scope"""
+    with session_factory() as session:
+        rows = iter_rows(session, created_from, created_to, batch_size)
+        yield from render(rows, fmt, batch_size)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.export",
+        description="Stream every short link as NDJSON or CSV",
+    )
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    parser.add_argument(
+        "--created-from",
+        type=datetime.fromisoformat,
+        help="Only links created at or after this ISO timestamp",
+    )
+    parser.add_argument(
+        "--created-to",
+        type=datetime.fromisoformat,
+        help="Only links created before this ISO timestamp",
+    )
+    parser.add_argument("--output", help="File to write to; standard output by default")
+    args = parser.parse_args(argv)
+
+    chunks = stream_export(
+        SessionLocal, args.format, args.created_from, args.created_to
+    )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8", newline="") as output:
+            output.writelines(chunks)
+    else:
+        sys.stdout.writelines(chunks)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
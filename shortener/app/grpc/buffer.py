@@ -0,0 +1,117 @@
+import logging
+from collections import deque
+from collections.abc import Callable
+from threading import Event, Lock, Thread
+from typing import Any, Generic, TypeVar
+
+from app.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class ClickBuffer(Generic[T]):
+    """
+    Clicks waiting to be sent, flushed by a background thread in batches of
+    up to batch_size, as soon as a full batch is waiting or every
+    flush_interval seconds otherwise. `send` returns False when a batch
+    should be kept for the next flush, e.g. while the analytics service is
+    unreachable. At most max_size clicks are held; the oldest are dropped
+    past that, so an outage costs clicks rather than memory.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[list[T]], bool],
+        batch_size: int,
+        flush_interval: float,
+        max_size: int,
+    ):
+        self._send = send
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_size = max_size
+        self._pending: deque[T] = deque()
+        self._lock = Lock()
+        # Serializes sends between the flusher thread and explicit flushes
+        self._send_lock = Lock()
+        self._wake = Event()
+        self._stopped = Event()
+        self._thread: Thread | None = None
+
+    def add(self, click: T) -> bool:
+        """Queue a click; False once the buffer has been closed"""
+        if self._stopped.is_set():
+            return False
+        with self._lock:
+            self._pending.append(click)
+            self._drop_overflow()
+            full = len(self._pending) >= self.batch_size
+            if self._thread is None:
+                self._start()
+        metrics.increment("analytics.clicks_buffered")
+        if full:
+            self._wake.set()
+        return True
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def stats(self) -> dict[str, Any]:
+        return {"pending": len(self), "max_size": self.max_size}
+
+    def flush(self) -> bool:
+        """Send every pending click now, in batches; False if one was kept"""
+        with self._send_lock:
+            while True:
+                batch = self._take()
+                if not batch:
+                    return True
+                if not self._send(batch):
+                    self._requeue(batch)
+                    return False
+
+    def close(self) -> None:
+        """Stop the flusher thread, then send what is left"""
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+
+    def _start(self) -> None:
+        # Started on first use, so importing the client spawns no thread
+        self._thread = Thread(target=self._run, name="click-buffer", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                drained = self.flush()
+            except Exception as e:
+                logger.exception(f"Error flushing buffered clicks: {e}")
+                drained = False
+            if not drained:
+                # Back off for a full interval, however fast clicks arrive
+                self._stopped.wait(self.flush_interval)
+
+    def _take(self) -> list[T]:
+        with self._lock:
+            count = min(self.batch_size, len(self._pending))
+            return [self._pending.popleft() for _ in range(count)]
+
+    def _requeue(self, batch: list[T]) -> None:
+        with self._lock:
+            self._pending.extendleft(reversed(batch))
+            self._drop_overflow()
+
+    def _drop_overflow(self) -> None:
+        overflow = len(self._pending) - self.max_size
+        if overflow > 0:
+            for _ in range(overflow):
+                self._pending.popleft()
+            metrics.increment("analytics.clicks_dropped", overflow)
@@ -6,7 +6,7 @@ from contextlib import contextmanager
 from datetime import datetime
 from enum import Enum
 from threading import Lock
-from typing import ClassVar, Optional
+from typing import Any, ClassVar, Optional
 
 import grpc
 
@@ -17,11 +17,16 @@ from app.constants import (
     GRPC_RETRY_DELAY_SECONDS,
     GRPC_TIMEOUT_SECONDS,
 )
+from app.grpc.buffer import ClickBuffer
 from app.grpc.protos import analytics_pb2, analytics_pb2_grpc
+from app.metrics import metrics
 
 logger = logging.getLogger(__name__)
 Config: Settings = get_settings()
 
+# analytics_pb2.RecordClickRequest; the generated classes are untyped
+ClickRequest = Any
+
 
 class CircuitState(Enum):
     CLOSED = "closed"
@@ -56,6 +61,13 @@ class GrpcAnalyticsClient(AnalyticsClient):
     RECOVERY_TIMEOUT = 30  # Seconds before trying half-open state
     HALF_OPEN_MAX_ATTEMPTS = 3  # Max attempts in half-open state
 
+    NON_RETRYABLE_CODES = (
+        grpc.StatusCode.INVALID_ARGUMENT,
+        grpc.StatusCode.NOT_FOUND,
+        grpc.StatusCode.PERMISSION_DENIED,
+        grpc.StatusCode.UNAUTHENTICATED,
+    )
+
     MAX_RETRIES = GRPC_MAX_RETRIES
     INITIAL_RETRY_DELAY = GRPC_RETRY_DELAY_SECONDS  # seconds
     MAX_RETRY_DELAY = GRPC_RETRY_DELAY_SECONDS * GRPC_BACKOFF_MULTIPLIER  # seconds
@@ -69,12 +81,20 @@ class GrpcAnalyticsClient(AnalyticsClient):
                     cls._instance = cls(target)
         return cls._instance
 
+    @classmethod
+    def close_instance(cls) -> None:
+        """Send buffered clicks and close the shared client"""
+        with cls._lock:
+            instance, cls._instance = cls._instance, None
+        if instance is not None:
+            instance.close()
+
     def __init__(self, target: str | None = None):
         if target is None:
             target = Config.ANALYTICS_SERVICE_GRPC
         self.target = target
 
-        options = [
+        self._options = [
             # Send keepalive every 30s
             ("grpc.keepalive_time_ms", 30000),
             # Wait 10s for keepalive response
@@ -83,10 +103,15 @@ class GrpcAnalyticsClient(AnalyticsClient):
             ("grpc.http2.max_pings_without_data", 0),
         ]
 
-        self._channel = grpc.insecure_channel(self.target, options=options)
+        self._channel = grpc.insecure_channel(self.target, options=self._options)
         self._stub = analytics_pb2_grpc.AnalyticsServiceStub(self._channel)
         self._channel.subscribe(self._on_channel_event)
 
+        # grpc.aio channels are bound to the event loop that uses them, so
+        # they are created lazily on the first async call
+        self._aio_channel: grpc.aio.Channel | None = None
+        self._aio_stub: analytics_pb2_grpc.AnalyticsServiceStub | None = None
+
         self._circuit_state = CircuitState.CLOSED
         self._failure_count = 0
         self._last_failure_time = None
@@ -94,6 +119,16 @@ class GrpcAnalyticsClient(AnalyticsClient):
         self._half_open_attempts = 0
         self._state_lock = Lock()
 
+        self._buffer: ClickBuffer[ClickRequest] | None = None
+        if Config.ANALYTICS_BATCHING_ENABLED:
+            self._buffer = ClickBuffer(
+                self._send_batch,
+                batch_size=Config.ANALYTICS_BATCH_SIZE,
+                flush_interval=Config.ANALYTICS_FLUSH_INTERVAL_MS / 1000,
+                max_size=Config.ANALYTICS_BUFFER_MAX_CLICKS,
+            )
+            metrics.register_collector("analytics_buffer", self._buffer.stats)
+
         logger.info(f"Initialized gRPC client for analytics service at {self.target}")
 
     def _on_channel_event(self, connectivity):
@@ -171,9 +206,76 @@ class GrpcAnalyticsClient(AnalyticsClient):
                 self._circuit_state = CircuitState.OPEN
                 self._circuit_opened_at = datetime.now()
 
+    @staticmethod
+    def _click_request(
+        short_link: str, ip: str, city: str, country: str
+    ) -> ClickRequest:
+        click = analytics_pb2.ClickModel(  # type: ignore
+            ip=ip, city=city, country=country
+        )
+        # Stamped now, so buffered clicks keep the time they happened
+        click.created_at.FromNanoseconds(time.time_ns())
+        return analytics_pb2.RecordClickRequest(  # type: ignore
+            short_link=short_link, click=click
+        )
+
+    def _send_batch(self, batch: list[ClickRequest]) -> bool:
+        """
+        Send buffered clicks in one RecordClicks call. Returns False to keep
+        the batch for the next flush: while the circuit is open, or when the
+        service was unreachable or overloaded and so cannot have recorded any
+        of it.
+        Batches failing any other way are dropped rather than risk being
+        recorded twice.
+        """
+        if not self._should_allow_request():
+            return False
+        try:
+            response = self._stub.RecordClicks(
+                analytics_pb2.RecordClicksRequest(clicks=batch),  # type: ignore
+                timeout=self.TIMEOUT,
+            )
+        except grpc.RpcError as e:
+            self._record_failure()
+            if e.code() in (
+                grpc.StatusCode.UNAVAILABLE,
+                grpc.StatusCode.RESOURCE_EXHAUSTED,
+            ):
+                # Unreachable, or at its limit of concurrent RPCs; either way
+                # the batch was never handled
+                logger.warning(
+                    f"Analytics service {e.code().name.lower()}, "
+                    f"keeping {len(batch)} clicks"
+                )
+                return False
+            logger.error(
+                f"Failed to record {len(batch)} clicks: "
+                f"{e.code().name} - {e.details()}"
+            )
+            metrics.increment("analytics.clicks_dropped", len(batch))
+            return True
+        except Exception as e:
+            self._record_failure()
+            logger.exception(f"Failed to record {len(batch)} clicks: {e}")
+            metrics.increment("analytics.clicks_dropped", len(batch))
+            return True
+
+        self._record_success()
+        metrics.increment("analytics.batches_sent")
+        metrics.increment("analytics.clicks_sent", response.recorded)
+        return True
+
+    def flush(self) -> None:
+        """Send buffered clicks now; blocks while they are sent"""
+        if self._buffer is not None:
+            self._buffer.flush()
+
     def record_click(
         self, short_link: str, ip: str = "", city: str = "", country: str = ""
     ) -> bool:
+        if self._buffer is not None:
+            return self._buffer.add(self._click_request(short_link, ip, city, country))
+
         if not self._should_allow_request():
             logger.warning("Circuit breaker is open, skipping analytics request")
             return False
@@ -182,12 +284,7 @@ class GrpcAnalyticsClient(AnalyticsClient):
 
         for attempt in range(self.MAX_RETRIES):
             try:
-                click = analytics_pb2.ClickModel(  # type: ignore
-                    ip=ip, city=city, country=country
-                )
-                request = analytics_pb2.RecordClickRequest(  # type: ignore
-                    short_link=short_link, click=click
-                )
+                request = self._click_request(short_link, ip, city, country)
 
                 response = self._stub.RecordClick(request, timeout=self.TIMEOUT)
 
@@ -197,12 +294,7 @@ class GrpcAnalyticsClient(AnalyticsClient):
             except grpc.RpcError as e:
                 status_code = e.code()
 
-                if status_code in [
-                    grpc.StatusCode.INVALID_ARGUMENT,
-                    grpc.StatusCode.NOT_FOUND,
-                    grpc.StatusCode.PERMISSION_DENIED,
-                    grpc.StatusCode.UNAUTHENTICATED,
-                ]:
+                if status_code in self.NON_RETRYABLE_CODES:
                     logger.error(
                         f"Non-retryable error recording click: "
                         f"{status_code.name} - {e.details()}"
@@ -247,14 +339,95 @@ class GrpcAnalyticsClient(AnalyticsClient):
     async def record_click_async(
         self, short_link: str, ip: str = "", city: str = "", country: str = ""
     ) -> bool:
-        """Async version of record_click that runs in a thread pool"""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(
-            None, self.record_click, short_link, ip, city, country
-        )
+        """Non-blocking version of record_click using a grpc.aio channel"""
+        if self._buffer is not None:
+            return self._buffer.add(self._click_request(short_link, ip, city, country))
+
+        if not self._should_allow_request():
+            logger.warning("Circuit breaker is open, skipping analytics request")
+            return False
+
+        stub = self._get_aio_stub()
+        retry_delay = self.INITIAL_RETRY_DELAY
+
+        for attempt in range(self.MAX_RETRIES):
+            try:
+                request = self._click_request(short_link, ip, city, country)
+
+                response = await stub.RecordClick(request, timeout=self.TIMEOUT)
+
+                self._record_success()
+                return bool(response.success)
+
+            except grpc.RpcError as e:
+                status_code = e.code()
+
+                if status_code in self.NON_RETRYABLE_CODES:
+                    logger.error(
+                        f"Non-retryable error recording click: "
+                        f"{status_code.name} - {e.details()}"
+                    )
+                    self._record_failure()
+                    return False
+
+                if attempt < self.MAX_RETRIES - 1:
+                    logger.warning(
+                        f"Error recording click (attempt "
+                        f"{attempt + 1}/{self.MAX_RETRIES}): "
+                        f"{status_code.name} - {e.details()}. "
+                        f"Retrying in {retry_delay}s..."
+                    )
+                    await asyncio.sleep(retry_delay)
+                    retry_delay = min(retry_delay * 2, self.MAX_RETRY_DELAY)
+                else:
+                    logger.error(
+                        f"Failed to record click after "
+                        f"{self.MAX_RETRIES} attempts: "
+                        f"{status_code.name} - {e.details()}"
+                    )
+
+            except Exception as e:
+                if attempt < self.MAX_RETRIES - 1:
+                    logger.warning(
+                        f"Unexpected error recording click (attempt "
+                        f"{attempt + 1}/{self.MAX_RETRIES}): "
+                        f"{e!s}. Retrying in {retry_delay}s..."
+                    )
+                    await asyncio.sleep(retry_delay)
+                    retry_delay = min(retry_delay * 2, self.MAX_RETRY_DELAY)
+                else:
+                    logger.exception(
+                        f"Failed to record click after " f"{self.MAX_RETRIES} attempts"
+                    )
+
+        # All retries failed
+        self._record_failure()
+        return False
+
+    def _get_aio_stub(self) -> analytics_pb2_grpc.AnalyticsServiceStub:
+        if self._aio_stub is None:
+            self._aio_channel = grpc.aio.insecure_channel(
+                self.target, options=self._options
+            )
+            self._aio_stub = analytics_pb2_grpc.AnalyticsServiceStub(self._aio_channel)
+        return self._aio_stub
+
+    async def close_async(self):
+        """Close the grpc.aio channel from the event loop that created it"""
+        if self._aio_channel is not None:
+            try:
+                await self._aio_channel.close()
+            except Exception as e:
+                logger.warning(f"Error closing async gRPC channel: {e}")
+            finally:
+                self._aio_channel = None
+                self._aio_stub = None
 
     def close(self):
-        """Explicitly close the gRPC channel"""
+        """Send buffered clicks, then close the gRPC channel"""
+        if self._buffer is not None:
+            self._buffer.close()
+            metrics.unregister_collector("analytics_buffer")
         if hasattr(self, "_channel") and self._channel:
             try:
                 self._channel.close()
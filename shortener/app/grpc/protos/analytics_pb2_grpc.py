@@ -40,6 +40,11 @@ class AnalyticsServiceStub(object):
                 request_serializer=analytics__pb2.RecordClickRequest.SerializeToString,
                 response_deserializer=analytics__pb2.RecordClickResponse.FromString,
                 _registered_method=True)
+        self.RecordClicks = channel.unary_unary(
+                '/analytics.AnalyticsService/RecordClicks',
+                request_serializer=analytics__pb2.RecordClicksRequest.SerializeToString,
+                response_deserializer=analytics__pb2.RecordClicksResponse.FromString,
+                _registered_method=True)
 
 
 class AnalyticsServiceServicer(object):
@@ -51,6 +56,13 @@ class AnalyticsServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def RecordClicks(self, request, context):
+        """Buffered clicks from one client, recorded together
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_AnalyticsServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -59,6 +71,11 @@ def add_AnalyticsServiceServicer_to_server(servicer, server):
                     request_deserializer=analytics__pb2.RecordClickRequest.FromString,
                     response_serializer=analytics__pb2.RecordClickResponse.SerializeToString,
             ),
+            'RecordClicks': grpc.unary_unary_rpc_method_handler(
+                    servicer.RecordClicks,
+                    request_deserializer=analytics__pb2.RecordClicksRequest.FromString,
+                    response_serializer=analytics__pb2.RecordClicksResponse.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'analytics.AnalyticsService', rpc_method_handlers)
@@ -96,3 +113,30 @@ class AnalyticsService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def RecordClicks(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/analytics.AnalyticsService/RecordClicks',
+            analytics__pb2.RecordClicksRequest.SerializeToString,
+            analytics__pb2.RecordClicksResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
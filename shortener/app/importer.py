@@ -0,0 +1,602 @@
+"""
+Bulk import of existing links from CSV or NDJSON files.
+
+    python -m app.importer links.csv --checkpoint links.checkpoint.json
+
+CSV files need a header row with a ``url`` column; NDJSON files hold one
+object per line with a ``url`` key. Either may carry an optional
+``short_link`` to keep an existing code. The file is streamed in chunks, so
+memory use depends on the chunk size rather than the input size, and each
+chunk is committed before the checkpoint moves past it.
+
+After each commit the Redis entries of the imported codes are deleted, so a
+"not found" cached before the import does not hide them. Pods also keep
+not-found entries in their local caches, which the importer cannot reach; an
+imported code that was looked up shortly before may keep returning 404 for
+up to NEGATIVE_CACHE_LOCAL_TTL_SECONDS.
+"""
+
+import argparse
+import csv
+import io
+import json
+import logging
+import os
+import re
+import secrets
+import sys
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any, BinaryIO, Literal, NamedTuple, TextIO
+
+from pydantic import ValidationError
+from sqlalchemy import select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.canonical import link_host, url_hash
+from app.codes import ShortCodeGenerator
+from app.config import get_settings
+from app.constants import BULK_SHORTEN_MAX_URLS, IMPORT_CHUNK_SIZE, SHORT_URL_LENGTH
+from app.db.objects import Url
+from app.db.session import SessionLocal
+from app.models import UrlCreate
+from app.repository import RedisCache
+
+log = logging.getLogger(__name__)
+
+ImportFormat = Literal["csv", "ndjson"]
+
+SHORT_LINK_PATTERN = re.compile(rf"^[A-Za-z0-9_-]{{{SHORT_URL_LENGTH}}}$")
+
+STAGING_TABLE = "url_import_staging"
+
+
+class ImportRecord(NamedTuple):
+    line: int
+    link: str
+    short_link: str | None
+
+
+class RejectedRecord(NamedTuple):
+    line: int
+    reason: str
+    raw: str
+
+
+class ImportStats:
+    def __init__(
+        self, read: int = 0, imported: int = 0, existing: int = 0, rejected: int = 0
+    ):
+        self.read = read
+        self.imported = imported
+        self.existing = existing
+        self.rejected = rejected
+
+    def to_dict(self) -> dict[str, int]:
+        return {
+            "read": self.read,
+            "imported": self.imported,
+            "existing": self.existing,
+            "rejected": self.rejected,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, int]) -> "ImportStats":
+        return cls(**data)
+
+
+class Checkpoint(NamedTuple):
+    """Number of rows read up to the end of the last committed chunk"""
+
+    source: str
+    row: int
+    stats: dict[str, int]
+
+    @classmethod
+    def load(cls, path: Path, source: Path) -> "Checkpoint | None":
+        if not path.exists():
+            return None
+        checkpoint = cls(**json.loads(path.read_text()))
+        if checkpoint.source != str(source.resolve()):
+            raise ValueError(
+                f"Checkpoint {path} belongs to {checkpoint.source}, not {source}"
+            )
+        return checkpoint
+
+    def save(self, path: Path) -> None:
+        # Write then rename, so a crash never leaves a torn checkpoint
+        temp_path = path.with_name(f"{path.name}.tmp")
+        temp_path.write_text(json.dumps(self._asdict()))
+        os.replace(temp_path, path)
+
+
+class _Row(NamedTuple):
+    line: int
+    raw: str
+    fields: dict[str, Any]
+
+
+def read_records(
+    handle: BinaryIO, fmt: ImportFormat, start_row: int = 0
+) -> Iterator[tuple[ImportRecord | RejectedRecord, int]]:
+    """
+    Yield each record with the number of rows read up to it, which is what a
+    checkpoint stores. CSV goes through a single csv.reader, so quoted fields
+    may span lines. Resuming reads the first start_row rows again but skips
+    them without validating them.
+    """
+    # surrogateescape keeps undecodable bytes, so only the row holding them
+    # is rejected rather than the whole file failing to decode
+    text_handle = io.TextIOWrapper(
+        handle, encoding="utf-8-sig", errors="surrogateescape", newline=""
+    )
+    try:
+        rows = _csv_rows(text_handle) if fmt == "csv" else _ndjson_rows(text_handle)
+
+        for row_number, row in enumerate(rows, start=1):
+            if row_number <= start_row or row is None:
+                continue
+            if isinstance(row, RejectedRecord):
+                yield row, row_number
+            else:
+                yield _to_record(row), row_number
+    finally:
+        # The caller owns the binary handle, so don't close it with the wrapper
+        text_handle.detach()
+
+
+def _csv_rows(text: TextIO) -> Iterator[_Row | RejectedRecord | None]:
+    """One item per CSV row after the header, None for a blank one"""
+    reader = csv.reader(text)
+    columns = next(reader, [])
+    if "url" not in columns:
+        raise ValueError("CSV input needs a header row with a 'url' column")
+    line_number = reader.line_num + 1
+    for values in reader:
+        # A quoted field may span lines; report the line the row starts on
+        start, line_number = line_number, reader.line_num + 1
+        raw = _csv_text(values)
+        if not any(value.strip() for value in values):
+            yield None
+        elif _undecodable(raw):
+            yield RejectedRecord(start, "Invalid UTF-8", _escaped(raw))
+        elif len(values) != len(columns):
+            yield RejectedRecord(
+                start, f"Expected {len(columns)} columns, got {len(values)}", raw
+            )
+        else:
+            yield _Row(start, raw, dict(zip(columns, values, strict=True)))
+
+
+def _ndjson_rows(text: TextIO) -> Iterator[_Row | RejectedRecord | None]:
+    """One item per line, None for a blank one"""
+    for line_number, raw_line in enumerate(text, start=1):
+        line = raw_line.rstrip("\r\n")
+        if not line.strip():
+            yield None
+            continue
+        if _undecodable(line):
+            yield RejectedRecord(line_number, "Invalid UTF-8", _escaped(line))
+            continue
+        try:
+            fields = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield RejectedRecord(line_number, f"Invalid JSON: {e.msg}", line)
+            continue
+        if not isinstance(fields, dict):
+            yield RejectedRecord(line_number, "Expected a JSON object", line)
+            continue
+        yield _Row(line_number, line, fields)
+
+
+def _to_record(row: _Row) -> ImportRecord | RejectedRecord:
+    url = row.fields.get("url")
+    if not isinstance(url, str) or not url:
+        return RejectedRecord(row.line, "Missing url", row.raw)
+    try:
+        link = str(UrlCreate.model_validate({"url": url}).url)
+    except ValidationError as e:
+        return RejectedRecord(row.line, _first_error(e), row.raw)
+    short_link = row.fields.get("short_link") or None
+    if short_link is not None and not SHORT_LINK_PATTERN.match(str(short_link)):
+        return RejectedRecord(
+            row.line,
+            f"short_link must be {SHORT_URL_LENGTH} base64url characters",
+            row.raw,
+        )
+    return ImportRecord(row.line, link, short_link)
+
+
+def _first_error(error: ValidationError) -> str:
+    return str(error.errors()[0]["msg"])
+
+
+def _csv_text(values: list[str]) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="").writerow(values)
+    return buffer.getvalue()
+
+
+def _undecodable(text: str) -> bool:
+    try:
+        text.encode("utf-8")
+    except UnicodeEncodeError:
+        return True
+    return False
+
+
+def _escaped(text: str) -> str:
+    return repr(text.encode("utf-8", "surrogateescape"))
+
+
+class RowLoader(ABC):
+    @abstractmethod
+    def load(self, session: Session, rows: list[dict[str, Any]]) -> set[str]:
+        """Insert rows, skipping conflicts; return the url_hash of each inserted row"""
+        raise NotImplementedError
+
+
+class InsertRowLoader(RowLoader):
+    """Multi-row INSERT ... ON CONFLICT DO NOTHING, for drivers without COPY"""
+
+    def load(self, session: Session, rows: list[dict[str, Any]]) -> set[str]:
+        is_postgresql = session.get_bind().dialect.name == "postgresql"
+        dialect_insert = pg_insert if is_postgresql else sqlite_insert
+        inserted: set[str] = set()
+        # Batches keep each statement under bind parameter limits
+        for start in range(0, len(rows), BULK_SHORTEN_MAX_URLS):
+            statement = (
+                dialect_insert(Url)
+                .values(rows[start : start + BULK_SHORTEN_MAX_URLS])
+                .on_conflict_do_nothing()
+                .returning(Url.url_hash)
+            )
+            inserted.update(session.execute(statement).scalars())
+        return inserted
+
+
+class CopyRowLoader(RowLoader):
+    """
+    COPY rows into a temporary staging table, then move them into urls with
+    one INSERT ... SELECT. COPY cannot skip conflicting rows itself, and the
+    staging step lets existing links and taken codes be skipped in bulk.
+    """
+
+    COLUMNS = ("link", "short_link", "url_hash", "host", "created_at")
+
+    def load(self, session: Session, rows: list[dict[str, Any]]) -> set[str]:
+        columns = ", ".join(self.COLUMNS)
+        session.execute(
+            text(
+                f"CREATE TEMPORARY TABLE IF NOT EXISTS {STAGING_TABLE} "
+                f"(link TEXT, short_link VARCHAR({SHORT_URL_LENGTH}), "
+                "url_hash VARCHAR(64), host VARCHAR(255), created_at TIMESTAMP) "
+                "ON COMMIT DELETE ROWS"
+            )
+        )
+        session.execute(text(f"TRUNCATE {STAGING_TABLE}"))
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow(
+                [
+                    row["link"],
+                    row["short_link"],
+                    row["url_hash"],
+                    row["host"],
+                    row["created_at"].isoformat(),
+                ]
+            )
+        buffer.seek(0)
+
+        # The session pins one connection per transaction, so COPY and the
+        # statements around it see the same temporary table
+        dbapi_connection = session.connection().connection
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {STAGING_TABLE} ({columns}) FROM STDIN WITH (FORMAT csv)",
+                buffer,
+            )
+        finally:
+            cursor.close()
+
+        result = session.execute(
+            text(
+                f"INSERT INTO urls ({columns}) SELECT {columns} FROM {STAGING_TABLE} "
+                "ON CONFLICT DO NOTHING RETURNING url_hash"
+            )
+        )
+        return set(result.scalars())
+
+
+class UrlImporter:
+    MAX_RETRIES = 5
+
+    def __init__(
+        self,
+        session_factory: sessionmaker[Session],
+        code_generator: ShortCodeGenerator | None = None,
+        chunk_size: int = IMPORT_CHUNK_SIZE,
+        loader: RowLoader | None = None,
+        cache: RedisCache | None = None,
+    ):
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be positive")
+        self.session_factory = session_factory
+        self.code_generator = code_generator
+        self.chunk_size = chunk_size
+        self.loader = loader
+        self.cache = cache
+
+    def run(
+        self,
+        path: Path,
+        fmt: ImportFormat,
+        checkpoint_path: Path | None = None,
+        rejects_path: Path | None = None,
+    ) -> ImportStats:
+        checkpoint = Checkpoint.load(checkpoint_path, path) if checkpoint_path else None
+        stats = ImportStats.from_dict(checkpoint.stats) if checkpoint else ImportStats()
+        if checkpoint:
+            log.info(f"Resuming {path} after row {checkpoint.row}")
+
+        started = time.perf_counter()
+        read_at_start = stats.read
+        row = checkpoint.row if checkpoint else 0
+        rejects = rejects_path.open("a", encoding="utf-8") if rejects_path else None
+        try:
+            with path.open("rb") as handle:
+                chunk: list[ImportRecord] = []
+                for record, record_row in read_records(handle, fmt, row):
+                    row = record_row
+                    stats.read += 1
+                    if isinstance(record, RejectedRecord):
+                        self._reject(stats, rejects, record)
+                    else:
+                        chunk.append(record)
+                    if len(chunk) >= self.chunk_size:
+                        self._load_chunk(chunk, stats, rejects)
+                        chunk = []
+                        self._checkpoint(checkpoint_path, rejects, path, row, stats)
+                        self._log_progress(stats, read_at_start, started)
+
+                if chunk:
+                    self._load_chunk(chunk, stats, rejects)
+                self._checkpoint(checkpoint_path, rejects, path, row, stats)
+        finally:
+            if rejects:
+                rejects.close()
+
+        self._log_progress(stats, read_at_start, started)
+        return stats
+
+    def _load_chunk(
+        self,
+        chunk: list[ImportRecord],
+        stats: ImportStats,
+        rejects: TextIO | None,
+    ) -> None:
+        """Load one chunk in a single transaction, skipping links already stored"""
+        pending: dict[str, ImportRecord] = {}
+        custom_codes: set[str] = set()
+        for record in chunk:
+            key = url_hash(record.link)
+            if key in pending:
+                stats.existing += 1
+            elif record.short_link is not None and record.short_link in custom_codes:
+                self._reject(
+                    stats,
+                    rejects,
+                    RejectedRecord(record.line, "short_link repeated", record.link),
+                )
+            else:
+                pending[key] = record
+                if record.short_link is not None:
+                    custom_codes.add(record.short_link)
+
+        created_at = datetime.now(UTC)
+        stored_codes: list[str] = []
+        with self.session_factory() as session:
+            self._skip_stored(session, pending, stats)
+            loader = self.loader or self._default_loader(session)
+
+            for attempt in range(self.MAX_RETRIES):
+                if not pending:
+                    break
+                rows = self._build_rows(pending, created_at)
+                inserted = loader.load(session, rows)
+                stats.imported += len(inserted)
+                codes = {row["url_hash"]: row["short_link"] for row in rows}
+                stored_codes.extend(codes[key] for key in inserted)
+                for key in inserted:
+                    pending.pop(key, None)
+
+                # Links stored by someone else since the lookup above
+                self._skip_stored(session, pending, stats)
+                for key, record in list(pending.items()):
+                    if record.short_link is not None:
+                        pending.pop(key)
+                        self._reject(
+                            stats,
+                            rejects,
+                            RejectedRecord(
+                                record.line, "short_link already taken", record.link
+                            ),
+                        )
+                if pending:
+                    log.warning(
+                        f"Collision detected for {len(pending)} codes, "
+                        f"attempt {attempt + 1}/{self.MAX_RETRIES}"
+                    )
+
+            for record in pending.values():
+                self._reject(
+                    stats,
+                    rejects,
+                    RejectedRecord(
+                        record.line,
+                        f"Failed to generate unique short URL after "
+                        f"{self.MAX_RETRIES} attempts",
+                        record.link,
+                    ),
+                )
+            session.commit()
+
+        # A tombstone cached by a lookup before the import would hide the
+        # new code until it expired
+        if self.cache and stored_codes:
+            self.cache.invalidate_many(stored_codes)
+
+    @staticmethod
+    def _skip_stored(
+        session: Session, pending: dict[str, ImportRecord], stats: ImportStats
+    ) -> None:
+        if not pending:
+            return
+        stored = session.execute(
+            select(Url.url_hash).where(Url.url_hash.in_(list(pending)))
+        ).scalars()
+        for key in stored:
+            if pending.pop(key, None) is not None:
+                stats.existing += 1
+
+    def _build_rows(
+        self, pending: dict[str, ImportRecord], created_at: datetime
+    ) -> list[dict[str, Any]]:
+        generated = iter(
+            self._generate_codes(
+                sum(record.short_link is None for record in pending.values())
+            )
+        )
+        return [
+            {
+                "link": record.link,
+                "short_link": record.short_link or next(generated),
+                "url_hash": key,
+                "host": link_host(record.link),
+                "created_at": created_at,
+            }
+            for key, record in pending.items()
+        ]
+
+    def _generate_codes(self, count: int) -> list[str]:
+        if self.code_generator is not None:
+            try:
+                return self.code_generator.next_codes(count)
+            except Exception as e:
+                log.warning(
+                    f"Short code generator unavailable, using random codes: {e}"
+                )
+        # 6 random bytes encode to exactly SHORT_URL_LENGTH base64url characters
+        return [secrets.token_urlsafe(SHORT_URL_LENGTH * 3 // 4) for _ in range(count)]
+
+    @staticmethod
+    def _default_loader(session: Session) -> RowLoader:
+        dialect = session.get_bind().dialect
+        if dialect.name == "postgresql" and dialect.driver == "psycopg2":
+            return CopyRowLoader()
+        return InsertRowLoader()
+
+    @staticmethod
+    def _reject(
+        stats: ImportStats, rejects: TextIO | None, record: RejectedRecord
+    ) -> None:
+        stats.rejected += 1
+        log.debug(f"Rejected line {record.line}: {record.reason}")
+        if rejects:
+            rejects.write(json.dumps(record._asdict()) + "\n")
+
+    @staticmethod
+    def _checkpoint(
+        checkpoint_path: Path | None,
+        rejects: TextIO | None,
+        path: Path,
+        row: int,
+        stats: ImportStats,
+    ) -> None:
+        # Rejects reach disk before the checkpoint moves past them
+        if rejects:
+            rejects.flush()
+        if checkpoint_path:
+            Checkpoint(str(path.resolve()), row, stats.to_dict()).save(checkpoint_path)
+
+    @staticmethod
+    def _log_progress(stats: ImportStats, read_at_start: int, started: float) -> None:
+        elapsed = time.perf_counter() - started
+        rate = (stats.read - read_at_start) / elapsed if elapsed > 0 else 0.0
+        log.info(
+            f"Read {stats.read} rows: {stats.imported} imported, "
+            f"{stats.existing} existing, {stats.rejected} rejected "
+            f"({rate:.0f} rows/s)"
+        )
+
+
+def infer_format(path: Path) -> ImportFormat:
+    if path.suffix.lower() in (".ndjson", ".jsonl"):
+        return "ndjson"
+    return "csv"
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.importer",
+        description="Bulk import links from a CSV or NDJSON file",
+    )
+    parser.add_argument("path", type=Path, help="CSV or NDJSON file to import")
+    parser.add_argument(
+        "--format",
+        choices=["csv", "ndjson"],
+        help="Input format; inferred from the file extension by default",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=IMPORT_CHUNK_SIZE,
+        help="Rows loaded per transaction",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        type=Path,
+        help="File recording progress; an existing one resumes the import",
+    )
+    parser.add_argument(
+        "--rejects", type=Path, help="NDJSON file to append rejected rows to"
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s"
+    )
+    if not args.path.is_file():
+        log.error(f"No such file: {args.path}")
+        return 1
+
+    code_generator = None
+    if get_settings().SHORT_CODE_STRATEGY == "sequence":
+        code_generator = ShortCodeGenerator.get_instance(session_factory=SessionLocal)
+    cache = RedisCache.get_instance() if get_settings().CACHE_ENABLED else None
+    importer = UrlImporter(
+        SessionLocal, code_generator, chunk_size=args.chunk_size, cache=cache
+    )
+    try:
+        stats = importer.run(
+            args.path,
+            args.format or infer_format(args.path),
+            checkpoint_path=args.checkpoint,
+            rejects_path=args.rejects,
+        )
+    finally:
+        RedisCache.close_instance()
+    print(json.dumps(stats.to_dict()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,6 +3,8 @@ from urllib.parse import urlparse
 
 from pydantic import BaseModel, Field, HttpUrl, field_validator
 
+from app.constants import BULK_SHORTEN_MAX_URLS
+
 
 class UrlCreate(BaseModel):
     url: HttpUrl = Field(
@@ -99,3 +101,71 @@ class ResponseModel(BaseModel):
     data: UrlModel | list[UrlModel] | None = Field(
         default=None, title="data", description="The data returned by the request"
     )
+
+
+class BulkUrlCreate(BaseModel):
+    urls: list[str] = Field(
+        ...,
+        title="urls",
+        description="The URLs to shorten; each is validated like a single create",
+        min_length=1,
+        max_length=BULK_SHORTEN_MAX_URLS,
+    )
+
+
+class BulkShortenResult(BaseModel):
+    url: str = Field(..., title="url", description="The URL as submitted")
+    success: bool = Field(
+        default=True, title="success", description="Whether the URL was shortened"
+    )
+    data: UrlModel | None = Field(
+        default=None, title="data", description="The shortened URL"
+    )
+    error: str | None = Field(
+        default=None, title="error", description="Why the URL was rejected"
+    )
+
+
+class BulkResponseModel(BaseModel):
+    success: bool = Field(
+        default=True, title="success", description="Whether the request was successful"
+    )
+    data: list[BulkShortenResult] = Field(
+        default_factory=list,
+        title="data",
+        description="One result per submitted URL, in input order",
+    )
+
+
+class UrlPage(BaseModel):
+    items: list[UrlModel] = Field(default_factory=list)
+    next_cursor: str | None = None
+    total_estimate: int | None = None
+
+
+class PageResponseModel(BaseModel):
+    success: bool = Field(
+        default=True, title="success", description="Whether the request was successful"
+    )
+    data: list[UrlModel] = Field(
+        default_factory=list,
+        title="data",
+        description="URLs on this page, newest first",
+    )
+    next_cursor: str | None = Field(
+        default=None,
+        title="next_cursor",
+        description="Cursor for the next page; absent on the last page",
+    )
+    total_estimate: int | None = Field(
+        default=None,
+        title="total_estimate",
+        description="Approximate number of stored URLs, when requested",
+    )
+
+
+class CountResponseModel(BaseModel):
+    success: bool = Field(
+        default=True, title="success", description="Whether the request was successful"
+    )
+    count: int = Field(..., title="count", description="Number of matching URLs")
@@ -0,0 +1,47 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import NamedTuple
+
+
+@dataclass(frozen=True)
+class UrlFilter:
+    """
+    Narrows a listing to one host and a half-open created_at range. Naive
+    bounds are taken as UTC, the zone created_at is stored in.
+    """
+
+    host: str | None = None
+    created_from: datetime | None = None
+    created_to: datetime | None = None
+
+    def __post_init__(self) -> None:
+        for name in ("created_from", "created_to"):
+            value = getattr(self, name)
+            if value is not None and value.tzinfo is None:
+                object.__setattr__(self, name, value.replace(tzinfo=UTC))
+
+
+class PageCursor(NamedTuple):
+    """
+    Keyset position of the last row on a page. Pages are ordered by
+    (created_at, id) descending, so the next page starts strictly below it.
+    """
+
+    created_at: datetime
+    id: int
+
+    def encode(self) -> str:
+        payload = json.dumps([self.created_at.isoformat(), self.id])
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, token: str) -> "PageCursor":
+        try:
+            padded = token + "=" * (-len(token) % 4)
+            created_at, row_id = json.loads(base64.urlsafe_b64decode(padded))
+            return cls(datetime.fromisoformat(created_at), int(row_id))
+        except (binascii.Error, ValueError, TypeError) as e:
+            raise ValueError(f"Invalid cursor: {token}") from e
@@ -1,91 +1,966 @@
+import asyncio
 import builtins
+import functools
+import itertools
 import json
 import logging
+import math
+import random
+import secrets
 import time
 from abc import ABC, abstractmethod
-from collections.abc import Callable
-from typing import TypeVar, cast
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from datetime import datetime
+from enum import Enum
+from threading import Event, Lock
+from typing import (
+    Any,
+    ClassVar,
+    Concatenate,
+    Literal,
+    NamedTuple,
+    Optional,
+    ParamSpec,
+    TypeVar,
+    cast,
+)
 
 import redis
+import redis.asyncio as aioredis
 from pydantic import HttpUrl
-from sqlalchemy.exc import DatabaseError, IntegrityError, OperationalError
-from sqlalchemy.orm import Session
+from sqlalchemy import (
+    ColumnElement,
+    Executable,
+    Row,
+    exists,
+    func,
+    literal,
+    or_,
+    select,
+    text,
+    tuple_,
+    union_all,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import (
+    DatabaseError,
+    IntegrityError,
+    InterfaceError,
+    OperationalError,
+)
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 
+from app.canonical import link_host, url_hash
 from app.config import get_settings
-from app.constants import CACHE_TTL_SECONDS
+from app.constants import CACHE_TTL_SECONDS, SINGLE_FLIGHT_WAIT_TIMEOUT_SECONDS
 from app.db.objects import Url
-from app.models import UrlModel
+from app.db.queries import (
+    SELECT_LINK_BY_CODE,
+    SELECT_URL_BY_HASH,
+    SELECT_URLS_BY_HASHES,
+)
+from app.db.replicas import ReplicaSet
+from app.metrics import metrics
+from app.models import UrlModel, UrlPage
+from app.pagination import PageCursor, UrlFilter
+from app.retry import db_retry
 
 T = TypeVar("T")
+P = ParamSpec("P")
 
 log = logging.getLogger(__name__)
 
 
+class CacheMarker(Enum):
+    NOT_FOUND = "not_found"
+
+
+class CachedLink(NamedTuple):
+    """
+    A link as the cache tiers hold it: the destination exactly as stored,
+    already validated on create, and the ISO creation time. Redirects use
+    `link` as is; a UrlModel is only built for callers that need one.
+    """
+
+    link: str
+    created_at: str | None = None
+
+    @classmethod
+    def from_model(cls, model: UrlModel) -> "CachedLink":
+        created_at = model.created_at.isoformat() if model.created_at else None
+        return cls(str(model.link), created_at)
+
+    @classmethod
+    def from_row(cls, link: str, created_at: datetime | None) -> "CachedLink":
+        return cls(link, created_at.isoformat() if created_at else None)
+
+    def to_model(self, short_link: str) -> UrlModel:
+        return UrlModel.model_validate(
+            {"link": self.link, "short_link": short_link, "created_at": self.created_at}
+        )
+
+
+# Cached proof that a short code does not exist (a negative entry)
+NOT_FOUND = CacheMarker.NOT_FOUND
+
+CachedUrl = CachedLink | Literal[CacheMarker.NOT_FOUND]
+
+# Bookkeeping keys live outside url:*, which clear() and size() treat as
+# cache entries only
+NEGATIVE_BUDGET_KEY = "urlmeta:negative:budget"
+
+# Stores a tombstone unless the budget for the current TTL window is spent,
+# so at most NEGATIVE_CACHE_MAX_ENTRIES tombstones are alive at any time.
+# NX keeps a tombstone from overwriting a link cached by a concurrent create.
+# Returns 1 when stored, 0 when the key already exists, -1 when over budget.
+PUT_NEGATIVE_SCRIPT = """
+local count = redis.call('INCR', KEYS[2])
+if count == 1 then
+    redis.call('EXPIRE', KEYS[2], ARGV[1])
+end
+if count > tonumber(ARGV[2]) then
+    return -1
+end
+if redis.call('SET', KEYS[1], '', 'EX', ARGV[1], 'NX') then
+    return 1
+end
+return 0
+"""
+
+# Deletes a single-flight lock only while it still holds our token, so a load
+# that outlived the lock TTL cannot release a lock taken by another pod
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+LOCK_POLL_INTERVAL_SECONDS = 0.02
+
+
+def _cache_key(key: str) -> str:
+    return f"url:{key}"
+
+
+def _lock_key(key: str) -> str:
+    return f"lock:url:{key}"
+
+
+def _encode_cached_url(value: CachedLink, delta: float, ttl_seconds: int) -> str:
+    """
+    Store the raw destination behind a space separated header holding its
+    absolute expiry, the seconds it took to load (delta), which drive
+    probabilistic early refresh on read, and the creation time. The link
+    comes last, so it is never split and needs no escaping.
+    """
+    expiry = time.time() + ttl_seconds
+    return f"{expiry:.3f} {delta:.6f} {value.created_at or '-'} {value.link}"
+
+
+def _decode_cached_entry(cached_result: bytes | str) -> tuple[CachedUrl, float, float]:
+    """Decode a cached value into (link, delta, expiry)"""
+    # Ensure we have string data
+    if isinstance(cached_result, bytes):
+        cached_data = cached_result.decode("utf-8")
+    else:
+        cached_data = str(cached_result)
+    if not cached_data:
+        return NOT_FOUND, 0.0, math.inf
+    if cached_data[0] == "{":
+        # JSON entry written by an older release; never refreshed early
+        data = json.loads(cached_data)
+        data = data.get("url", data)
+        return CachedLink(data["link"], data.get("created_at")), 0.0, math.inf
+    expiry, delta, created_at, link = cached_data.split(" ", 3)
+    value = CachedLink(link, None if created_at == "-" else created_at)
+    return value, float(delta), float(expiry)
+
+
+def _decode_cached_url(cached_result: bytes | str) -> CachedUrl:
+    return _decode_cached_entry(cached_result)[0]
+
+
+def _should_refresh_early(delta: float, expiry: float, beta: float) -> bool:
+    """
+    XFetch: refresh before expiry with a probability that rises as expiry
+    nears, scaled by how long the value takes to recompute. Spreads refreshes
+    of hot keys over time instead of having every reader miss at once.
+    """
+    if delta <= 0 or beta <= 0:
+        return False
+    # 1 - random() is in (0, 1], so the log is always defined
+    return time.time() - delta * beta * math.log(1.0 - random.random()) >= expiry
+
+
+def _record_negative_put(result: int) -> None:
+    if result < 0:
+        metrics.increment("cache.redis.negative_rejected")
+    elif result > 0:
+        metrics.increment("cache.redis.negative_stored")
+
+
+class InstrumentedConnectionPool(redis.BlockingConnectionPool):
+    """
+    Blocking connection pool that records how often callers had to wait for
+    a free connection, so REDIS_CONNECTION_POOL_SIZE can be sized from load.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = Lock()
+        self._waits = 0
+        self._wait_seconds = 0.0
+
+    def get_connection(self, command_name, *keys, **options):
+        # The queue holds idle connections plus placeholders for connections
+        # not yet created; when it is empty every connection is checked out.
+        if self.pool.qsize() > 0:
+            return super().get_connection(command_name, *keys, **options)
+
+        started = time.perf_counter()
+        try:
+            return super().get_connection(command_name, *keys, **options)
+        finally:
+            with self._stats_lock:
+                self._waits += 1
+                self._wait_seconds += time.perf_counter() - started
+
+    def stats(self) -> dict[str, Any]:
+        in_use = self.max_connections - self.pool.qsize()
+        created = len(self._connections)
+        with self._stats_lock:
+            waits = self._waits
+            wait_seconds = self._wait_seconds
+        return {
+            "max_connections": self.max_connections,
+            "created": created,
+            "in_use": in_use,
+            "idle": max(0, created - in_use),
+            "waits": waits,
+            "wait_seconds_total": round(wait_seconds, 6),
+        }
+
+
+class FrequencySketch:
+    """
+    Count-min sketch of recent access frequency with 4-bit counters. All
+    counters are halved once the number of recorded accesses reaches the
+    sample size, so the estimate tracks recent popularity rather than
+    all-time popularity.
+    """
+
+    DEPTH = 4
+    MAX_COUNT = 15
+    COUNTERS_PER_ENTRY = 4
+
+    def __init__(self, capacity: int):
+        width = 16
+        while width < capacity * self.COUNTERS_PER_ENTRY:
+            width <<= 1
+        self._mask = width - 1
+        self._rows = [bytearray(width) for _ in range(self.DEPTH)]
+        self._seeds = [random.getrandbits(64) | 1 for _ in range(self.DEPTH)]
+        self._sample_size = 10 * max(capacity, 1)
+        self._additions = 0
+
+    def _indexes(self, key: str) -> builtins.list[int]:
+        key_hash = hash(key)
+        return [((key_hash * seed) >> 17) & self._mask for seed in self._seeds]
+
+    def increment(self, key: str) -> None:
+        for row, index in zip(self._rows, self._indexes(key), strict=True):
+            if row[index] < self.MAX_COUNT:
+                row[index] += 1
+
+        self._additions += 1
+        if self._additions >= self._sample_size:
+            self._reset()
+
+    def frequency(self, key: str) -> int:
+        return min(
+            row[index]
+            for row, index in zip(self._rows, self._indexes(key), strict=True)
+        )
+
+    def _reset(self) -> None:
+        for i, row in enumerate(self._rows):
+            self._rows[i] = bytearray(count >> 1 for count in row)
+        self._additions //= 2
+
+
+class TinyLfuCache:
+    """
+    Bounded in-process cache using the W-TinyLFU policy: new entries land in
+    a small LRU window, and an entry evicted from the window is only admitted
+    to the main segmented LRU if it has been requested more often than the
+    entry it would replace. A scan of one-off keys therefore churns the
+    window but cannot push popular links out of the main region.
+    """
+
+    _instance: ClassVar[Optional["TinyLfuCache"]] = None
+    _lock: ClassVar[Lock] = Lock()
+
+    WINDOW_RATIO = 0.01
+    PROTECTED_RATIO = 0.8
+
+    @classmethod
+    def get_instance(cls) -> "TinyLfuCache":
+        """Return the process-wide local cache shared by all repositories"""
+        if not cls._instance:
+            with cls._lock:
+                if not cls._instance:
+                    settings = get_settings()
+                    cls._instance = cls(
+                        max_size=settings.CACHE_MAX_SIZE,
+                        ttl_seconds=settings.LOCAL_CACHE_TTL_SECONDS,
+                        negative_ttl_seconds=(
+                            settings.NEGATIVE_CACHE_LOCAL_TTL_SECONDS
+                            if settings.NEGATIVE_CACHE_ENABLED
+                            else 0
+                        ),
+                    )
+                    metrics.register_collector("local_cache", cls._instance.stats)
+        return cls._instance
+
+    @classmethod
+    def close_instance(cls) -> None:
+        with cls._lock:
+            if cls._instance:
+                metrics.unregister_collector("local_cache")
+                cls._instance = None
+
+    def __init__(
+        self, max_size: int, ttl_seconds: float, negative_ttl_seconds: float = 0
+    ):
+        self.max_size = max(max_size, 2)
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+
+        self._window_size = max(1, int(self.max_size * self.WINDOW_RATIO))
+        main_size = self.max_size - self._window_size
+        self._protected_size = max(1, int(main_size * self.PROTECTED_RATIO))
+        self._main_size = main_size
+
+        self._window: OrderedDict[str, tuple[CachedUrl, float]] = OrderedDict()
+        self._probation: OrderedDict[str, tuple[CachedUrl, float]] = OrderedDict()
+        self._protected: OrderedDict[str, tuple[CachedUrl, float]] = OrderedDict()
+        self._sketch = FrequencySketch(self.max_size)
+        self._entries_lock = Lock()
+
+        self._admitted = 0
+        self._rejected = 0
+
+    def get(self, key: str) -> CachedUrl | None:
+        now = time.monotonic()
+        with self._entries_lock:
+            self._sketch.increment(key)
+
+            if key in self._window:
+                segment = self._window
+            elif key in self._probation:
+                segment = self._probation
+            elif key in self._protected:
+                segment = self._protected
+            else:
+                metrics.increment("cache.local.misses")
+                return None
+
+            value, expires_at = segment[key]
+            if expires_at <= now:
+                del segment[key]
+                metrics.increment("cache.local.misses")
+                return None
+
+            if segment is self._probation:
+                self._promote(key)
+            else:
+                segment.move_to_end(key)
+
+        if value is NOT_FOUND:
+            metrics.increment("cache.local.negative_hits")
+        else:
+            metrics.increment("cache.local.hits")
+        return value
+
+    def put(self, key: str, value: CachedLink) -> None:
+        self._put(key, value, self.ttl_seconds)
+
+    def put_negative(self, key: str) -> None:
+        """Remember briefly that a short code does not exist"""
+        if self.negative_ttl_seconds > 0:
+            self._put(key, NOT_FOUND, self.negative_ttl_seconds)
+
+    def _put(self, key: str, value: CachedUrl, ttl_seconds: float) -> None:
+        entry = (value, time.monotonic() + ttl_seconds)
+        with self._entries_lock:
+            for segment in (self._window, self._probation, self._protected):
+                if key in segment:
+                    segment[key] = entry
+                    segment.move_to_end(key)
+                    return
+
+            self._window[key] = entry
+            if len(self._window) > self._window_size:
+                candidate, candidate_entry = self._window.popitem(last=False)
+                self._admit(candidate, candidate_entry)
+
+    def invalidate(self, key: str) -> None:
+        with self._entries_lock:
+            for segment in (self._window, self._probation, self._protected):
+                segment.pop(key, None)
+
+    def clear(self) -> None:
+        with self._entries_lock:
+            self._window.clear()
+            self._probation.clear()
+            self._protected.clear()
+
+    def size(self) -> int:
+        with self._entries_lock:
+            return len(self._window) + len(self._probation) + len(self._protected)
+
+    def stats(self) -> dict[str, Any]:
+        with self._entries_lock:
+            return {
+                "max_size": self.max_size,
+                "window": len(self._window),
+                "probation": len(self._probation),
+                "protected": len(self._protected),
+                "admitted": self._admitted,
+                "rejected": self._rejected,
+            }
+
+    def _promote(self, key: str) -> None:
+        """Move a re-accessed probation entry into the protected segment"""
+        self._protected[key] = self._probation.pop(key)
+        if len(self._protected) > self._protected_size:
+            demoted, demoted_entry = self._protected.popitem(last=False)
+            self._probation[demoted] = demoted_entry
+
+    def _admit(self, candidate: str, entry: tuple[CachedUrl, float]) -> None:
+        """Decide whether a window evictee replaces the main region's victim"""
+        if len(self._probation) + len(self._protected) < self._main_size:
+            self._probation[candidate] = entry
+            self._admitted += 1
+            return
+
+        victims = self._probation or self._protected
+        victim = next(iter(victims))
+        if self._sketch.frequency(candidate) > self._sketch.frequency(victim):
+            del victims[victim]
+            self._probation[candidate] = entry
+            self._admitted += 1
+        else:
+            self._rejected += 1
+
+
 class RedisCache:
-    def __init__(self, ttl_seconds: int = CACHE_TTL_SECONDS):
+    _instance: ClassVar[Optional["RedisCache"]] = None
+    _lock: ClassVar[Lock] = Lock()
+
+    @classmethod
+    def get_instance(cls) -> "RedisCache":
+        """Return the process-wide cache, sharing one connection pool"""
+        if not cls._instance:
+            with cls._lock:
+                if not cls._instance:
+                    settings = get_settings()
+                    cls._instance = cls(
+                        ttl_seconds=settings.CACHE_TTL_SECONDS,
+                        negative_ttl_seconds=(
+                            settings.NEGATIVE_CACHE_TTL_SECONDS
+                            if settings.NEGATIVE_CACHE_ENABLED
+                            else 0
+                        ),
+                        negative_max_entries=settings.NEGATIVE_CACHE_MAX_ENTRIES,
+                        lock_ttl_ms=(
+                            settings.SINGLE_FLIGHT_LOCK_TTL_MS
+                            if settings.SINGLE_FLIGHT_DISTRIBUTED
+                            else 0
+                        ),
+                        lock_wait_ms=settings.SINGLE_FLIGHT_LOCK_WAIT_MS,
+                    )
+                    metrics.register_collector("redis_pool", cls._instance.pool_stats)
+        return cls._instance
+
+    @classmethod
+    def close_instance(cls) -> None:
+        with cls._lock:
+            if cls._instance:
+                metrics.unregister_collector("redis_pool")
+                cls._instance.close()
+                cls._instance = None
+
+    def __init__(
+        self,
+        ttl_seconds: int = CACHE_TTL_SECONDS,
+        pool: redis.ConnectionPool | None = None,
+        negative_ttl_seconds: int = 0,
+        negative_max_entries: int = 0,
+        lock_ttl_ms: int = 0,
+        lock_wait_ms: int = 0,
+    ):
         self.ttl_seconds = ttl_seconds
-        settings = get_settings()
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.negative_max_entries = negative_max_entries
+        self.lock_ttl_ms = lock_ttl_ms
+        self.lock_wait_ms = lock_wait_ms
 
-        self._pool = redis.ConnectionPool.from_url(
-            settings.REDIS_URL,
-            max_connections=settings.REDIS_CONNECTION_POOL_SIZE,
-            socket_connect_timeout=settings.REDIS_SOCKET_CONNECT_TIMEOUT,
-            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
-            retry_on_timeout=True,
-            health_check_interval=30,
-        )
+        if pool is None:
+            settings = get_settings()
+            pool = InstrumentedConnectionPool.from_url(
+                settings.REDIS_URL,
+                max_connections=settings.REDIS_CONNECTION_POOL_SIZE,
+                timeout=settings.REDIS_POOL_TIMEOUT,
+                socket_connect_timeout=settings.REDIS_SOCKET_CONNECT_TIMEOUT,
+                socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+                retry_on_timeout=True,
+                health_check_interval=30,
+            )
+        self._pool = pool
         self._client = redis.Redis(connection_pool=self._pool, decode_responses=True)
+        self._put_negative_script = self._client.register_script(PUT_NEGATIVE_SCRIPT)
+        self._release_lock_script = self._client.register_script(RELEASE_LOCK_SCRIPT)
+
+    @property
+    def locks_enabled(self) -> bool:
+        return self.lock_ttl_ms > 0
+
+    def pool_stats(self) -> dict[str, Any]:
+        if isinstance(self._pool, InstrumentedConnectionPool):
+            return self._pool.stats()
+        return {"max_connections": self._pool.max_connections}
 
-    def get(self, key: str) -> UrlModel | None:
+    def close(self) -> None:
         try:
-            cached_result = self._client.get(f"url:{key}")
+            self._client.close()
+            self._pool.disconnect()
+        except redis.RedisError as e:
+            log.warning(f"Error closing Redis connection pool: {e}")
+
+    def get(self, key: str) -> CachedUrl | None:
+        try:
+            cached_result = self._client.get(_cache_key(key))
             if cached_result is None:
+                metrics.increment("cache.redis.misses")
                 return None
-            # Ensure we have string data
-            if isinstance(cached_result, bytes):
-                cached_data = cached_result.decode("utf-8")
+            value = _decode_cached_url(cast(bytes | str, cached_result))
+            if value is NOT_FOUND:
+                metrics.increment("cache.redis.negative_hits")
             else:
-                cached_data = str(cached_result)
-            data = json.loads(cached_data)
-            return UrlModel(**data)
-        except (redis.RedisError, json.JSONDecodeError, ValueError) as e:
+                metrics.increment("cache.redis.hits")
+            return value
+        except (redis.RedisError, json.JSONDecodeError, KeyError, ValueError) as e:
             log.warning(f"Error retrieving from Redis cache: {e}")
             return None
 
-    def put(self, key: str, value: UrlModel) -> None:
+    def put(self, key: str, value: CachedLink, delta: float = 0.0) -> None:
+        try:
+            cached_data = _encode_cached_url(value, delta, self.ttl_seconds)
+            self._client.setex(_cache_key(key), self.ttl_seconds, cached_data)
+        except redis.RedisError as e:
+            log.warning(f"Error storing to Redis cache: {e}")
+
+    def put_many(self, entries: dict[str, CachedLink], delta: float = 0.0) -> None:
+        """Store several links in one pipelined round trip"""
+        if not entries:
+            return
         try:
-            cached_data = value.model_dump_json()
-            self._client.setex(f"url:{key}", self.ttl_seconds, cached_data)
+            pipeline = self._client.pipeline(transaction=False)
+            for key, value in entries.items():
+                cached_data = _encode_cached_url(value, delta, self.ttl_seconds)
+                pipeline.setex(_cache_key(key), self.ttl_seconds, cached_data)
+            pipeline.execute()
         except redis.RedisError as e:
             log.warning(f"Error storing to Redis cache: {e}")
 
+    def put_negative(self, key: str) -> None:
+        """Store a short-lived tombstone for a code missing from the database"""
+        if self.negative_ttl_seconds <= 0:
+            return
+        try:
+            result = self._put_negative_script(
+                keys=[_cache_key(key), NEGATIVE_BUDGET_KEY],
+                args=[self.negative_ttl_seconds, self.negative_max_entries],
+            )
+            _record_negative_put(int(cast(int, result)))
+        except redis.RedisError as e:
+            log.warning(f"Error storing negative entry to Redis cache: {e}")
+
     def invalidate(self, key: str) -> None:
         try:
-            self._client.delete(f"url:{key}")
+            self._client.delete(_cache_key(key))
+        except redis.RedisError as e:
+            log.warning(f"Error invalidating Redis cache: {e}")
+
+    def invalidate_many(self, keys: list[str]) -> None:
+        try:
+            self._client.delete(*[_cache_key(key) for key in keys])
         except redis.RedisError as e:
             log.warning(f"Error invalidating Redis cache: {e}")
 
+    def acquire_lock(self, key: str) -> str | None:
+        """
+        Take the cross-pod load lock for a code. Returns the lock token, or
+        None if another pod holds it. If Redis is unavailable the caller
+        proceeds as if it held the lock.
+        """
+        token = secrets.token_hex(8)
+        try:
+            acquired = self._client.set(
+                _lock_key(key), token, nx=True, px=self.lock_ttl_ms
+            )
+        except redis.RedisError as e:
+            log.warning(f"Error acquiring single-flight lock: {e}")
+            return token
+        return token if acquired else None
+
+    def release_lock(self, key: str, token: str) -> None:
+        try:
+            self._release_lock_script(keys=[_lock_key(key)], args=[token])
+        except redis.RedisError as e:
+            log.warning(f"Error releasing single-flight lock: {e}")
+
+    def wait_for_peer(self, key: str) -> CachedUrl | None:
+        """Poll for the entry another pod is loading, up to lock_wait_ms"""
+        deadline = time.monotonic() + self.lock_wait_ms / 1000
+        while time.monotonic() < deadline:
+            time.sleep(LOCK_POLL_INTERVAL_SECONDS)
+            try:
+                cached_result = self._client.get(_cache_key(key))
+                if cached_result is not None:
+                    return _decode_cached_url(cast(bytes | str, cached_result))
+            except (redis.RedisError, json.JSONDecodeError, KeyError, ValueError) as e:
+                log.warning(f"Error polling Redis cache: {e}")
+                return None
+        return None
+
     def clear(self) -> None:
         try:
-            pattern = "url:*"
-            key_result = self._client.keys(pattern)
-            if key_result:
-                # Convert keys to list to ensure they are iterable
-                key_list = list(cast(list, key_result))
-                if key_list:
-                    self._client.delete(*key_list)
+            # SCAN walks the keyspace in steps instead of blocking Redis
+            # the way KEYS does
+            batch: list = []
+            for key in self._client.scan_iter(match="url:*", count=1000):
+                batch.append(key)
+                if len(batch) == 1000:
+                    self._client.delete(*batch)
+                    batch = []
+            if batch:
+                self._client.delete(*batch)
         except redis.RedisError as e:
             log.warning(f"Error clearing Redis cache: {e}")
 
     def size(self) -> int:
         try:
-            key_result = self._client.keys("url:*")
-            return len(list(cast(list, key_result)))
+            return sum(1 for _ in self._client.scan_iter(match="url:*", count=1000))
         except redis.RedisError as e:
             log.warning(f"Error getting Redis cache size: {e}")
             return 0
 
 
+class InstrumentedAsyncConnectionPool(aioredis.BlockingConnectionPool):
+    """asyncio counterpart of InstrumentedConnectionPool"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._waits = 0
+        self._wait_seconds = 0.0
+
+    async def get_connection(self, command_name, *keys, **options):
+        if self.can_get_connection():
+            return await super().get_connection(command_name, *keys, **options)
+
+        started = time.perf_counter()
+        try:
+            return await super().get_connection(command_name, *keys, **options)
+        finally:
+            # Only touched from the event loop thread, so no lock is needed
+            self._waits += 1
+            self._wait_seconds += time.perf_counter() - started
+
+    def stats(self) -> dict[str, Any]:
+        in_use = len(self._in_use_connections)
+        idle = len(self._available_connections)
+        return {
+            "max_connections": self.max_connections,
+            "created": in_use + idle,
+            "in_use": in_use,
+            "idle": idle,
+            "waits": self._waits,
+            "wait_seconds_total": round(self._wait_seconds, 6),
+        }
+
+
+class AsyncRedisCache:
+    """
+    redis.asyncio variant of RedisCache used by the async redirect path.
+    Connections belong to the event loop that created them, so the shared
+    instance must be closed from that loop (see the app lifespan).
+    """
+
+    _instance: ClassVar[Optional["AsyncRedisCache"]] = None
+
+    @classmethod
+    def get_instance(cls) -> "AsyncRedisCache":
+        # Only ever called from the event loop thread
+        if not cls._instance:
+            settings = get_settings()
+            cls._instance = cls(
+                ttl_seconds=settings.CACHE_TTL_SECONDS,
+                negative_ttl_seconds=(
+                    settings.NEGATIVE_CACHE_TTL_SECONDS
+                    if settings.NEGATIVE_CACHE_ENABLED
+                    else 0
+                ),
+                negative_max_entries=settings.NEGATIVE_CACHE_MAX_ENTRIES,
+                lock_ttl_ms=(
+                    settings.SINGLE_FLIGHT_LOCK_TTL_MS
+                    if settings.SINGLE_FLIGHT_DISTRIBUTED
+                    else 0
+                ),
+                lock_wait_ms=settings.SINGLE_FLIGHT_LOCK_WAIT_MS,
+                early_refresh_beta=(
+                    settings.CACHE_EARLY_REFRESH_BETA
+                    if settings.CACHE_EARLY_REFRESH_ENABLED
+                    else 0.0
+                ),
+            )
+            metrics.register_collector("redis_async_pool", cls._instance.pool_stats)
+        return cls._instance
+
+    @classmethod
+    async def close_instance(cls) -> None:
+        if cls._instance:
+            metrics.unregister_collector("redis_async_pool")
+            instance, cls._instance = cls._instance, None
+            await instance.close()
+
+    def __init__(
+        self,
+        ttl_seconds: int = CACHE_TTL_SECONDS,
+        pool: aioredis.ConnectionPool | None = None,
+        negative_ttl_seconds: int = 0,
+        negative_max_entries: int = 0,
+        lock_ttl_ms: int = 0,
+        lock_wait_ms: int = 0,
+        early_refresh_beta: float = 0.0,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.negative_max_entries = negative_max_entries
+        self.lock_ttl_ms = lock_ttl_ms
+        self.lock_wait_ms = lock_wait_ms
+        self.early_refresh_beta = early_refresh_beta
+
+        if pool is None:
+            settings = get_settings()
+            pool = InstrumentedAsyncConnectionPool.from_url(
+                settings.REDIS_URL,
+                max_connections=settings.REDIS_CONNECTION_POOL_SIZE,
+                timeout=settings.REDIS_POOL_TIMEOUT,
+                socket_connect_timeout=settings.REDIS_SOCKET_CONNECT_TIMEOUT,
+                socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+                retry_on_timeout=True,
+                health_check_interval=30,
+            )
+        self._pool = pool
+        self._client = aioredis.Redis(connection_pool=self._pool)
+        self._put_negative_script = self._client.register_script(PUT_NEGATIVE_SCRIPT)
+        self._release_lock_script = self._client.register_script(RELEASE_LOCK_SCRIPT)
+
+    @property
+    def locks_enabled(self) -> bool:
+        return self.lock_ttl_ms > 0
+
+    def pool_stats(self) -> dict[str, Any]:
+        if isinstance(self._pool, InstrumentedAsyncConnectionPool):
+            return self._pool.stats()
+        return {"max_connections": self._pool.max_connections}
+
+    async def close(self) -> None:
+        try:
+            await self._client.aclose()
+            await self._pool.disconnect()
+        except (redis.RedisError, RuntimeError) as e:
+            log.warning(f"Error closing async Redis connection pool: {e}")
+
+    async def get(self, key: str) -> CachedUrl | None:
+        value, _ = await self.get_entry(key)
+        return value
+
+    async def get_entry(self, key: str) -> tuple[CachedUrl | None, bool]:
+        """Return the cached value and whether it is due for an early refresh"""
+        try:
+            cached_result = await self._client.get(_cache_key(key))
+            if cached_result is None:
+                metrics.increment("cache.redis.misses")
+                return None, False
+            value, delta, expiry = _decode_cached_entry(cached_result)
+            if value is NOT_FOUND:
+                metrics.increment("cache.redis.negative_hits")
+            else:
+                metrics.increment("cache.redis.hits")
+            refresh = _should_refresh_early(delta, expiry, self.early_refresh_beta)
+            return value, refresh
+        except (redis.RedisError, json.JSONDecodeError, KeyError, ValueError) as e:
+            log.warning(f"Error retrieving from Redis cache: {e}")
+            return None, False
+
+    async def put(self, key: str, value: CachedLink, delta: float = 0.0) -> None:
+        try:
+            cached_data = _encode_cached_url(value, delta, self.ttl_seconds)
+            await self._client.setex(_cache_key(key), self.ttl_seconds, cached_data)
+        except redis.RedisError as e:
+            log.warning(f"Error storing to Redis cache: {e}")
+
+    async def put_negative(self, key: str) -> None:
+        """Store a short-lived tombstone for a code missing from the database"""
+        if self.negative_ttl_seconds <= 0:
+            return
+        try:
+            result = await self._put_negative_script(
+                keys=[_cache_key(key), NEGATIVE_BUDGET_KEY],
+                args=[self.negative_ttl_seconds, self.negative_max_entries],
+            )
+            _record_negative_put(int(result))
+        except redis.RedisError as e:
+            log.warning(f"Error storing negative entry to Redis cache: {e}")
+
+    async def invalidate(self, key: str) -> None:
+        try:
+            await self._client.delete(_cache_key(key))
+        except redis.RedisError as e:
+            log.warning(f"Error invalidating Redis cache: {e}")
+
+    async def acquire_lock(self, key: str) -> str | None:
+        """See RedisCache.acquire_lock"""
+        token = secrets.token_hex(8)
+        try:
+            acquired = await self._client.set(
+                _lock_key(key), token, nx=True, px=self.lock_ttl_ms
+            )
+        except redis.RedisError as e:
+            log.warning(f"Error acquiring single-flight lock: {e}")
+            return token
+        return token if acquired else None
+
+    async def release_lock(self, key: str, token: str) -> None:
+        try:
+            await self._release_lock_script(keys=[_lock_key(key)], args=[token])
+        except redis.RedisError as e:
+            log.warning(f"Error releasing single-flight lock: {e}")
+
+    async def wait_for_peer(self, key: str) -> CachedUrl | None:
+        """Poll for the entry another pod is loading, up to lock_wait_ms"""
+        deadline = time.monotonic() + self.lock_wait_ms / 1000
+        while time.monotonic() < deadline:
+            await asyncio.sleep(LOCK_POLL_INTERVAL_SECONDS)
+            try:
+                cached_result = await self._client.get(_cache_key(key))
+                if cached_result is not None:
+                    return _decode_cached_url(cached_result)
+            except (redis.RedisError, json.JSONDecodeError, KeyError, ValueError) as e:
+                log.warning(f"Error polling Redis cache: {e}")
+                return None
+        return None
+
+
+class _Flight:
+    def __init__(self) -> None:
+        self.done = Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """
+    Collapses concurrent loads of the same key within the process: the first
+    caller runs the loader and the others block until its result is ready.
+    """
+
+    def __init__(
+        self, wait_timeout_seconds: float = SINGLE_FLIGHT_WAIT_TIMEOUT_SECONDS
+    ):
+        self.wait_timeout_seconds = wait_timeout_seconds
+        self._flights: dict[str, _Flight] = {}
+        self._lock = Lock()
+
+    def do(self, key: str, loader: Callable[[], T]) -> T:
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if flight is None:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            metrics.increment("singleflight.collapsed")
+            if flight.done.wait(self.wait_timeout_seconds):
+                if flight.error is not None:
+                    raise flight.error
+                return cast(T, flight.result)
+            log.warning(f"Timed out waiting for in-flight load of {key}")
+            metrics.increment("singleflight.wait_timeouts")
+            return loader()
+
+        metrics.increment("singleflight.loads")
+        try:
+            flight.result = loader()
+            return cast(T, flight.result)
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+
+class AsyncSingleFlight:
+    """
+    asyncio variant of SingleFlight. The load runs in its own task, so a
+    cancelled leader (e.g. a client disconnect) does not fail its waiters.
+    """
+
+    def __init__(
+        self, wait_timeout_seconds: float = SINGLE_FLIGHT_WAIT_TIMEOUT_SECONDS
+    ):
+        self.wait_timeout_seconds = wait_timeout_seconds
+        self._flights: dict[str, asyncio.Future[Any]] = {}
+
+    async def do(self, key: str, loader: Callable[[], Awaitable[T]]) -> T:
+        flight = self._flights.get(key)
+        if flight is None:
+            metrics.increment("singleflight.loads")
+            flight = asyncio.ensure_future(loader())
+            self._flights[key] = flight
+            flight.add_done_callback(lambda task: self._finish(key, task))
+            return cast(T, await asyncio.shield(flight))
+
+        metrics.increment("singleflight.collapsed")
+        try:
+            return cast(
+                T,
+                await asyncio.wait_for(
+                    asyncio.shield(flight), self.wait_timeout_seconds
+                ),
+            )
+        except TimeoutError:
+            log.warning(f"Timed out waiting for in-flight load of {key}")
+            metrics.increment("singleflight.wait_timeouts")
+            return await loader()
+
+    def _finish(self, key: str, task: asyncio.Future[Any]) -> None:
+        if self._flights.get(key) is task:
+            del self._flights[key]
+        if not task.cancelled():
+            # Mark the error as retrieved when every caller has gone away
+            task.exception()
+
+
 class UrlRepository(ABC):
     @abstractmethod
     def create(self, shortened_url: str, url: HttpUrl) -> UrlModel:
@@ -99,18 +974,77 @@ class UrlRepository(ABC):
     def find_by_url(self, url: HttpUrl) -> UrlModel | None:
         raise NotImplementedError
 
+    @abstractmethod
+    def find_by_urls(self, urls: builtins.list[HttpUrl]) -> dict[str, UrlModel]:
+        """Stored links among urls, keyed by url_hash, in one lookup"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def create_many(
+        self, items: builtins.list[tuple[str, HttpUrl]]
+    ) -> dict[str, UrlModel]:
+        """
+        Store (short code, url) pairs in one statement. Returns the stored
+        link keyed by url_hash for each url that was inserted or already
+        existed; urls whose code is held by another link are left out.
+        """
+        raise NotImplementedError
+
     @abstractmethod
     def list(self) -> list[UrlModel]:
         raise NotImplementedError
 
+    @abstractmethod
+    def list_page(
+        self,
+        limit: int,
+        cursor: PageCursor | None = None,
+        include_total: bool = False,
+    ) -> UrlPage:
+        """
+        Up to limit URLs ordered by (created_at, id) descending, starting
+        after cursor. The total is an estimate, only computed on request.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def search(
+        self, filters: UrlFilter, limit: int, cursor: PageCursor | None = None
+    ) -> UrlPage:
+        """Like list_page, restricted to URLs matching filters"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def count(self, filters: UrlFilter) -> int:
+        """Exact number of URLs matching filters"""
+        raise NotImplementedError
+
     @abstractmethod
     def delete(self, shortened_url: str) -> None:
         raise NotImplementedError
 
 
+class AsyncUrlRepository(ABC):
+    """Read-only repository used by the async redirect path"""
+
+    @abstractmethod
+    async def get(self, shortened_url: str) -> UrlModel | None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_link(self, shortened_url: str) -> str | None:
+        """Return only the stored destination, skipping model validation"""
+        raise NotImplementedError
+
+
 class InMemoryUrlRepository(UrlRepository):
     _instance = None
     _urls: dict[str, UrlModel] = {}
+    # url_hash -> short link, mirroring the unique index of the SQL schema
+    _short_links_by_hash: dict[str, str] = {}
+    # short link -> row id, standing in for the autoincrement key
+    _ids: dict[str, int] = {}
+    _sequence = itertools.count(1)
 
     def __new__(cls):
         if cls._instance is None:
@@ -120,110 +1054,544 @@ class InMemoryUrlRepository(UrlRepository):
     def create(self, shortened_url: str, url: HttpUrl) -> UrlModel:
         url_model = UrlModel(link=url, short_link=shortened_url)
         self._urls[shortened_url] = url_model
+        self._ids[shortened_url] = next(self._sequence)
+        self._short_links_by_hash.setdefault(url_hash(str(url)), shortened_url)
         return url_model
 
     def get(self, shortened_url: str) -> UrlModel | None:
         return self._urls.get(shortened_url)
 
     def find_by_url(self, url: HttpUrl) -> UrlModel | None:
-        url_str = str(url)
-        for url_model in self._urls.values():
-            if str(url_model.link) == url_str:
-                return url_model
-        return None
+        short_link = self._short_links_by_hash.get(url_hash(str(url)))
+        if short_link is None:
+            return None
+        return self._urls.get(short_link)
+
+    def find_by_urls(self, urls: builtins.list[HttpUrl]) -> dict[str, UrlModel]:
+        found = {}
+        for url in urls:
+            url_model = self.find_by_url(url)
+            if url_model is not None:
+                found[url_hash(str(url))] = url_model
+        return found
+
+    def create_many(
+        self, items: builtins.list[tuple[str, HttpUrl]]
+    ) -> dict[str, UrlModel]:
+        stored = {}
+        for shortened_url, url in items:
+            key = url_hash(str(url))
+            existing = self.find_by_url(url)
+            if existing is not None:
+                stored[key] = existing
+            elif shortened_url not in self._urls:
+                stored[key] = self.create(shortened_url, url)
+        return stored
 
     def list(self) -> list[UrlModel]:
         return list(self._urls.values())
 
+    def list_page(
+        self,
+        limit: int,
+        cursor: PageCursor | None = None,
+        include_total: bool = False,
+    ) -> UrlPage:
+        page = self._page(UrlFilter(), limit, cursor)
+        if include_total:
+            page.total_estimate = len(self._urls)
+        return page
+
+    def search(
+        self, filters: UrlFilter, limit: int, cursor: PageCursor | None = None
+    ) -> UrlPage:
+        return self._page(filters, limit, cursor)
+
+    def count(self, filters: UrlFilter) -> int:
+        return sum(
+            self._matches(url_model, filters) for url_model in self._urls.values()
+        )
+
+    def _page(
+        self, filters: UrlFilter, limit: int, cursor: PageCursor | None
+    ) -> UrlPage:
+        positions = sorted(
+            (
+                (PageCursor(url_model.created_at, self._ids[short_link]), url_model)
+                for short_link, url_model in self._urls.items()
+                if url_model.created_at is not None
+                and self._matches(url_model, filters)
+            ),
+            key=lambda item: item[0],
+            reverse=True,
+        )
+        if cursor is not None:
+            positions = [item for item in positions if item[0] < cursor]
+
+        page = positions[:limit]
+        has_more = len(positions) > limit
+        return UrlPage(
+            items=[url_model for _, url_model in page],
+            next_cursor=page[-1][0].encode() if has_more else None,
+        )
+
+    @staticmethod
+    def _matches(url_model: UrlModel, filters: UrlFilter) -> bool:
+        created_at = url_model.created_at
+        if filters.host is not None and link_host(str(url_model.link)) != filters.host:
+            return False
+        if filters.created_from is not None and (
+            created_at is None or created_at < filters.created_from
+        ):
+            return False
+        if filters.created_to is not None and (
+            created_at is None or created_at >= filters.created_to
+        ):
+            return False
+        return True
+
     def delete(self, shortened_url: str) -> None:
         if shortened_url not in self._urls:
             return
 
-        del self._urls[shortened_url]
+        url_model = self._urls.pop(shortened_url)
+        self._ids.pop(shortened_url, None)
+        key = url_hash(str(url_model.link))
+        if self._short_links_by_hash.get(key) == shortened_url:
+            del self._short_links_by_hash[key]
+
+
+class ConnectionUse:
+    """
+    Whether one request needed a database connection. Recorded once per
+    request; /metrics reports the fraction of requests that did.
+    """
+
+    def __init__(self) -> None:
+        self.used = False
+
+    def record(self) -> None:
+        metrics.increment("db.requests")
+        if self.used:
+            metrics.increment("db.requests_with_connection")
+
+
+def _connection_use_stats() -> dict[str, Any]:
+    requests = metrics.get("db.requests")
+    with_connection = metrics.get("db.requests_with_connection")
+    return {
+        "requests": requests,
+        "with_connection": with_connection,
+        "fraction": with_connection / requests if requests else 0.0,
+    }
+
+
+metrics.register_collector("db_connection_use", _connection_use_stats)
+
+
+def releases_session(
+    method: Callable[Concatenate["SqlAlchemyUrlRepository", P], T],
+) -> Callable[Concatenate["SqlAlchemyUrlRepository", P], T]:
+    """Release the repository's session once the operation has finished"""
+
+    @functools.wraps(method)
+    def wrapper(
+        self: "SqlAlchemyUrlRepository", *args: P.args, **kwargs: P.kwargs
+    ) -> T:
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self.release()
+
+    return wrapper
 
 
 class SqlAlchemyUrlRepository(UrlRepository):
-    MAX_RETRIES = 3
-    RETRY_DELAY = 0.1  # Initial delay in seconds
+    # Shared by every request-scoped repository in the process
+    _single_flight: ClassVar[SingleFlight] = SingleFlight()
+
+    ROW_COLUMNS = (Url.id, Url.link, Url.short_link, Url.url_hash, Url.created_at)
 
-    def __init__(self, db_session: Session):
-        self.session = db_session
+    def __init__(
+        self,
+        db_session: Session | None = None,
+        cache: RedisCache | None = None,
+        local_cache: TinyLfuCache | None = None,
+        replicas: ReplicaSet[sessionmaker[Session]] | None = None,
+        session_factory: sessionmaker[Session] | None = None,
+    ):
+        if db_session is None and session_factory is None:
+            raise ValueError("Either db_session or session_factory is required")
+        self._session = db_session
+        self._session_factory = session_factory
+        self._connection_use = ConnectionUse()
+        self._replicas = replicas
         settings = get_settings()
-        self._cache: RedisCache | None = None
+        self._cache: RedisCache | None = cache
+        self._local_cache: TinyLfuCache | None = local_cache
         if settings.CACHE_ENABLED:
-            self._cache = RedisCache(ttl_seconds=settings.CACHE_TTL_SECONDS)
+            if self._cache is None:
+                self._cache = RedisCache.get_instance()
+            if self._local_cache is None and settings.LOCAL_CACHE_ENABLED:
+                self._local_cache = TinyLfuCache.get_instance()
+
+    @property
+    def session(self) -> Session:
+        """
+        The primary session. One built from session_factory is only opened
+        on first use, so requests the caches answer never touch the pool.
+        """
+        if self._session is None:
+            assert self._session_factory is not None
+            self._session = self._session_factory()
+            self._connection_use.used = True
+        return self._session
+
+    def release(self) -> None:
+        """Close a session opened from session_factory, returning its connection"""
+        if self._session_factory is not None and self._session is not None:
+            self._session.close()
+            self._session = None
 
+    def close(self) -> None:
+        """Release the session at the end of a request and record its use"""
+        self.release()
+        self._connection_use.record()
+
+    @releases_session
     def create(self, shortened_url: str, url: HttpUrl) -> UrlModel:
-        existing = self.get(shortened_url)
-        if existing:
-            if str(existing.link) == str(url):
-                # Same URL, return existing
-                return existing
-            else:
-                # Different URL with same short code. This is a collision
-                error_msg = (
-                    f"Short URL '{shortened_url}' already exists for a different URL"
-                )
-                raise IntegrityError(error_msg, params=None, orig=None)  # type: ignore[arg-type]
+        link = str(url)
+        link_hash = url_hash(link)
 
-        db_url = Url(
-            link=str(url),
-            short_link=shortened_url,
+        started = time.perf_counter()
+        rows = self._write(
+            lambda: self._insert_or_get(shortened_url, link, link_hash), "create URL"
         )
+        self._note_write(shortened_url)
 
-        try:
-            self.session.add(db_url)
-            self._save()
-            result = db_url.to_model()
-            if self._cache:
-                self._cache.put(shortened_url, result)
-            return result
-        except IntegrityError as e:
-            self.session.rollback()
-            log.warning(f"Integrity error creating URL: {e}")
+        row = self._pick_created_row(rows, shortened_url, link, link_hash)
+        if row is None:
+            # Different URL with same short code. This is a collision
+            error_msg = (
+                f"Short URL '{shortened_url}' already exists for a different URL"
+            )
+            raise IntegrityError(error_msg, params=None, orig=None)  # type: ignore[arg-type]
 
-            # Check if it's the same URL (race condition)
-            existing = self.get(shortened_url)
-            if existing and str(existing.link) == str(url):
-                return existing
-            raise
+        cached = CachedLink.from_row(row.link, row.created_at)
+        self._cache_put(row.short_link, cached, time.perf_counter() - started)
+        return UrlModel(
+            link=HttpUrl(row.link), short_link=row.short_link, created_at=row.created_at
+        )
+
+    def _insert_or_get(
+        self, shortened_url: str, link: str, link_hash: str
+    ) -> builtins.list[Row]:
+        """
+        Insert the link unless its code or hash is taken, returning the new
+        row or the rows it conflicted with. On PostgreSQL this is a single
+        statement; SQLite cannot put an INSERT in a CTE, so conflicts there
+        cost one extra SELECT.
+        """
+        values = {
+            "link": link,
+            "short_link": shortened_url,
+            "url_hash": link_hash,
+            "host": link_host(link),
+        }
+        columns = self.ROW_COLUMNS
+        conflicts = or_(Url.short_link == shortened_url, Url.url_hash == link_hash)
+
+        insert_ignoring_conflicts = (
+            self._dialect_insert().values(**values).on_conflict_do_nothing()
+        )
+        if self._is_postgresql():
+            inserted = insert_ignoring_conflicts.returning(*columns).cte("inserted")
+            statement: Executable = union_all(
+                select(*inserted.c),
+                select(*columns).where(conflicts, ~exists(select(inserted.c.id))),
+            )
+        else:
+            statement = insert_ignoring_conflicts.returning(*columns)
+
+        rows = builtins.list(self.session.execute(statement).all())
+        if not rows:
+            # Lost to a row the statement could not see, e.g. one committed
+            # while PostgreSQL waited on the conflict under READ COMMITTED
+            rows = builtins.list(
+                self.session.execute(select(*columns).where(conflicts)).all()
+            )
+        return rows
+
+    @releases_session
+    def create_many(
+        self, items: builtins.list[tuple[str, HttpUrl]]
+    ) -> dict[str, UrlModel]:
+        if not items:
+            return {}
+        values = [
+            {
+                "link": str(url),
+                "short_link": code,
+                "url_hash": url_hash(str(url)),
+                "host": link_host(str(url)),
+            }
+            for code, url in items
+        ]
+
+        started = time.perf_counter()
+        inserted, stored_earlier = self._write(
+            lambda: self._insert_many(values), "create URLs"
+        )
+        # Links stored earlier were not written now, so replicas have them
+        for row in inserted:
+            self._note_write(row.short_link)
+        delta = time.perf_counter() - started
+
+        stored = {row.url_hash: row for row in inserted + stored_earlier}
+        self._cache_put_many(
+            {
+                row.short_link: CachedLink.from_row(row.link, row.created_at)
+                for row in stored.values()
+            },
+            delta,
+        )
+        return {
+            key: UrlModel(
+                link=HttpUrl(row.link),
+                short_link=row.short_link,
+                created_at=row.created_at,
+            )
+            for key, row in stored.items()
+        }
+
+    def _insert_many(
+        self, values: builtins.list[dict[str, str | None]]
+    ) -> tuple[builtins.list[Row], builtins.list[Row]]:
+        """
+        Multi-row insert that skips conflicts. Returns the rows it inserted
+        and, apart, the rows of links stored earlier under other codes.
+        """
+        columns = self.ROW_COLUMNS
+        statement = (
+            self._dialect_insert()
+            .values(values)
+            .on_conflict_do_nothing()
+            .returning(*columns)
+        )
+        inserted = builtins.list(self.session.execute(statement).all())
+
+        missing = {value["url_hash"] for value in values} - {
+            row.url_hash for row in inserted
+        }
+        stored_earlier: builtins.list[Row] = []
+        if missing:
+            # Rows skipped because their code is taken by another link stay
+            # missing for a retry
+            stored_earlier = builtins.list(
+                self.session.execute(
+                    select(*columns).where(Url.url_hash.in_(missing))
+                ).all()
+            )
+        return inserted, stored_earlier
+
+    def _is_postgresql(self) -> bool:
+        return self.session.get_bind().dialect.name == "postgresql"
+
+    def _dialect_insert(self) -> Any:
+        # Both dialects support ON CONFLICT DO NOTHING ... RETURNING
+        return pg_insert(Url) if self._is_postgresql() else sqlite_insert(Url)
 
+    @staticmethod
+    def _pick_created_row(
+        rows: builtins.list[Row], shortened_url: str, link: str, link_hash: str
+    ) -> Row | None:
+        # Our insert or the same URL stored earlier, possibly under another code
+        for row in rows:
+            if row.url_hash == link_hash:
+                return row
+        # Same URL stored before hashes existed
+        for row in rows:
+            if row.short_link == shortened_url and row.link == link:
+                return row
+        return None
+
+    @releases_session
     def get(self, shortened_url: str) -> UrlModel | None:
-        # Try cache first if enabled
+        cached = self._lookup(shortened_url)
+        return cached.to_model(shortened_url) if cached is not None else None
+
+    def _lookup(self, shortened_url: str) -> CachedLink | None:
+        # Try the in-process tier, then Redis, if enabled
+        if self._local_cache:
+            local_result = self._local_cache.get(shortened_url)
+            if local_result is NOT_FOUND:
+                return None
+            if local_result is not None:
+                return local_result
+
         if self._cache:
             cached_result = self._cache.get(shortened_url)
+            if cached_result is NOT_FOUND:
+                if self._local_cache:
+                    self._local_cache.put_negative(shortened_url)
+                return None
             if cached_result is not None:
                 log.debug(f"Cache hit for URL: {shortened_url}")
+                if self._local_cache:
+                    self._local_cache.put(shortened_url, cached_result)
                 return cached_result
 
         log.debug(f"Cache miss for URL: {shortened_url}")
-        result = self._execute_with_retry(
-            lambda: self._get_impl(shortened_url), "get URL"
+        return self._single_flight.do(shortened_url, lambda: self._load(shortened_url))
+
+    def _load(self, shortened_url: str) -> CachedLink | None:
+        """Load a code from the database and populate the cache tiers"""
+        token = None
+        if self._cache and self._cache.locks_enabled:
+            token = self._cache.acquire_lock(shortened_url)
+            if token is None:
+                # Another pod is loading this code, give it a moment to finish
+                peer_result = self._cache.wait_for_peer(shortened_url)
+                if peer_result is NOT_FOUND:
+                    metrics.increment("singleflight.peer_collapsed")
+                    if self._local_cache:
+                        self._local_cache.put_negative(shortened_url)
+                    return None
+                if peer_result is not None:
+                    metrics.increment("singleflight.peer_collapsed")
+                    if self._local_cache:
+                        self._local_cache.put(shortened_url, peer_result)
+                    return peer_result
+                metrics.increment("singleflight.peer_fallbacks")
+
+        try:
+            started = time.perf_counter()
+            result = self._execute_with_retry(
+                lambda: self._get_impl(shortened_url), "get URL"
+            )
+            if result is not None:
+                self._cache_put(shortened_url, result, time.perf_counter() - started)
+            else:
+                self._cache_put_negative(shortened_url)
+            return result
+        finally:
+            if token is not None and self._cache:
+                self._cache.release_lock(shortened_url, token)
+
+    def _cache_put(
+        self, shortened_url: str, result: CachedLink, delta: float = 0.0
+    ) -> None:
+        # Overwrites any negative entry left by an earlier lookup of the code
+        if self._local_cache:
+            self._local_cache.put(shortened_url, result)
+        if self._cache:
+            self._cache.put(shortened_url, result, delta)
+
+    def _cache_put_many(self, entries: dict[str, CachedLink], delta: float) -> None:
+        if self._local_cache:
+            for shortened_url, value in entries.items():
+                self._local_cache.put(shortened_url, value)
+        if self._cache:
+            self._cache.put_many(entries, delta)
+
+    def _cache_put_negative(self, shortened_url: str) -> None:
+        if self._local_cache:
+            self._local_cache.put_negative(shortened_url)
+        if self._cache:
+            self._cache.put_negative(shortened_url)
+
+    def _get_impl(self, shortened_url: str) -> CachedLink | None:
+        return self._read(
+            lambda session: self._select_link(session, shortened_url),
+            key=shortened_url,
+            retry_empty=True,
         )
 
-        if result is not None and self._cache:
-            self._cache.put(shortened_url, result)
+    @staticmethod
+    def _select_link(session: Session, shortened_url: str) -> CachedLink | None:
+        # Only the columns the caches hold; no ORM object is built
+        row = session.execute(
+            SELECT_LINK_BY_CODE, {"short_link": shortened_url}
+        ).first()
+        if row is None:
+            return None
+        return CachedLink.from_row(row.link, row.created_at)
 
-        return result
+    def _note_write(self, shortened_url: str) -> None:
+        if self._replicas:
+            self._replicas.note_write(shortened_url)
 
-    def _get_impl(self, shortened_url: str) -> UrlModel | None:
-        db_url = self.session.query(Url).filter(Url.short_link == shortened_url).first()
-        if db_url:
-            return db_url.to_model()
-        return None
+    def _read(
+        self,
+        query: Callable[[Session], T],
+        key: str | None = None,
+        retry_empty: bool = False,
+    ) -> T:
+        """
+        Run a read-only query on a read replica when one is healthy, else on
+        the primary session. A replica that fails is marked down and the
+        query is repeated on the primary; with retry_empty so is a query that
+        found nothing, as the replica may lag behind a new code.
+        """
+        choice = self._replicas.choose(key) if self._replicas else None
+        if choice is None:
+            return query(self.session)
+
+        index, replica_session_factory = choice
+        self._connection_use.used = True
+        try:
+            with replica_session_factory() as session:
+                result = query(session)
+        except (OperationalError, InterfaceError) as e:
+            assert self._replicas is not None
+            self._replicas.mark_failed(index, e)
+            return query(self.session)
+
+        if retry_empty and result is None:
+            metrics.increment("db.replica.miss_fallbacks")
+            return query(self.session)
+        metrics.increment("db.replica.reads")
+        return result
 
+    @releases_session
     def find_by_url(self, url: HttpUrl) -> UrlModel | None:
         return self._execute_with_retry(
             lambda: self._find_by_url_impl(url), "find URL by link"
         )
 
     def _find_by_url_impl(self, url: HttpUrl) -> UrlModel | None:
-        url_str = str(url)
-        db_url = self.session.query(Url).filter(Url.link == url_str).first()
-        if db_url:
-            return db_url.to_model()
-        return None
+        row = self.session.execute(
+            SELECT_URL_BY_HASH, {"url_hash": url_hash(str(url))}
+        ).first()
+        if row is None:
+            return None
+        return UrlModel(
+            link=HttpUrl(row.link), short_link=row.short_link, created_at=row.created_at
+        )
 
+    @releases_session
+    def find_by_urls(self, urls: builtins.list[HttpUrl]) -> dict[str, UrlModel]:
+        hashes = {url_hash(str(url)) for url in urls}
+        return self._execute_with_retry(
+            lambda: self._find_by_urls_impl(hashes), "find URLs by link"
+        )
+
+    def _find_by_urls_impl(self, hashes: set[str]) -> dict[str, UrlModel]:
+        if not hashes:
+            return {}
+        rows = self.session.execute(
+            SELECT_URLS_BY_HASHES, {"url_hashes": builtins.list(hashes)}
+        ).all()
+        return {
+            row.url_hash: UrlModel(
+                link=HttpUrl(row.link),
+                short_link=row.short_link,
+                created_at=row.created_at,
+            )
+            for row in rows
+        }
+
+    @releases_session
     def list(self) -> list[UrlModel]:
         return self._execute_with_retry(lambda: self._list_impl(), "list URLs")
 
@@ -231,72 +1599,345 @@ class SqlAlchemyUrlRepository(UrlRepository):
         db_urls = self.session.query(Url).all()
         return [url.to_model() for url in db_urls]
 
+    @releases_session
+    def list_page(
+        self,
+        limit: int,
+        cursor: PageCursor | None = None,
+        include_total: bool = False,
+    ) -> UrlPage:
+        return self._execute_with_retry(
+            lambda: self._read(
+                lambda session: self._page_impl(
+                    session, UrlFilter(), limit, cursor, include_total
+                )
+            ),
+            "list URLs",
+        )
+
+    @releases_session
+    def search(
+        self, filters: UrlFilter, limit: int, cursor: PageCursor | None = None
+    ) -> UrlPage:
+        return self._execute_with_retry(
+            lambda: self._read(
+                lambda session: self._page_impl(session, filters, limit, cursor, False)
+            ),
+            "search URLs",
+        )
+
+    @releases_session
+    def count(self, filters: UrlFilter) -> int:
+        statement = (
+            select(func.count()).select_from(Url).where(*self._filter_clauses(filters))
+        )
+        return self._execute_with_retry(
+            lambda: self._read(
+                lambda session: int(session.execute(statement).scalar_one())
+            ),
+            "count URLs",
+        )
+
+    @staticmethod
+    def _filter_clauses(filters: UrlFilter) -> builtins.list[ColumnElement[bool]]:
+        # Equality on host then a created_at range keeps to one index range
+        clauses = []
+        if filters.host is not None:
+            clauses.append(Url.host == filters.host)
+        if filters.created_from is not None:
+            clauses.append(Url.created_at >= filters.created_from)
+        if filters.created_to is not None:
+            clauses.append(Url.created_at < filters.created_to)
+        return clauses
+
+    def _page_impl(
+        self,
+        session: Session,
+        filters: UrlFilter,
+        limit: int,
+        cursor: PageCursor | None,
+        include_total: bool,
+    ) -> UrlPage:
+        # One extra row tells whether another page follows
+        statement = (
+            select(Url.id, Url.link, Url.short_link, Url.created_at)
+            .where(*self._filter_clauses(filters))
+            .order_by(Url.created_at.desc(), Url.id.desc())
+            .limit(limit + 1)
+        )
+        if cursor is not None:
+            statement = statement.where(
+                tuple_(Url.created_at, Url.id)
+                < tuple_(literal(cursor.created_at), literal(cursor.id))
+            )
+        rows = session.execute(statement).all()
+
+        page = rows[:limit]
+        next_cursor = None
+        if len(rows) > limit:
+            next_cursor = PageCursor(page[-1].created_at, page[-1].id).encode()
+        return UrlPage(
+            items=[
+                UrlModel(
+                    link=HttpUrl(row.link),
+                    short_link=row.short_link,
+                    created_at=row.created_at,
+                )
+                for row in page
+            ],
+            next_cursor=next_cursor,
+            total_estimate=self._estimate_total(session) if include_total else None,
+        )
+
+    @staticmethod
+    def _estimate_total(session: Session) -> int | None:
+        """
+        Row count from planner statistics on PostgreSQL, which costs one
+        catalog lookup instead of a full scan. Returns None until the table
+        has been analyzed. Other databases fall back to COUNT(*).
+        """
+        if session.get_bind().dialect.name == "postgresql":
+            estimate = session.execute(
+                text(
+                    "SELECT reltuples::bigint FROM pg_class WHERE oid = 'urls'::regclass"
+                )
+            ).scalar()
+            return int(estimate) if estimate is not None and estimate >= 0 else None
+        return int(session.execute(select(func.count()).select_from(Url)).scalar_one())
+
+    @releases_session
     def delete(self, shortened_url: str) -> None:
-        db_url = self.session.query(Url).filter(Url.short_link == shortened_url).first()
-        if db_url:
-            self.session.delete(db_url)
-            self._save()
+        if self._write(lambda: self._delete_impl(shortened_url), "delete URL"):
+            self._note_write(shortened_url)
+            if self._local_cache:
+                self._local_cache.invalidate(shortened_url)
             if self._cache:
                 self._cache.invalidate(shortened_url)
 
-    def _save(self) -> None:
-        """Save changes with retry logic for transient failures"""
-        for attempt in range(self.MAX_RETRIES):
+    def _delete_impl(self, shortened_url: str) -> bool:
+        db_url = self.session.query(Url).filter(Url.short_link == shortened_url).first()
+        if db_url is None:
+            return False
+        self.session.delete(db_url)
+        return True
+
+    def _write(self, func: Callable[[], T], operation_name: str) -> T:
+        """
+        Run func and commit as one unit. A transient failure rolls the whole
+        unit back and runs it again, since a commit retried after a rollback
+        would have nothing left to write.
+        """
+
+        def unit() -> T:
             try:
-                self.session.commit()
-                return
-            except OperationalError as e:
-                self.session.rollback()
-                if attempt < self.MAX_RETRIES - 1:
-                    # Exponential backoff
-                    delay = self.RETRY_DELAY * (2**attempt)
-                    log.warning(
-                        f"Database connection error (attempt "
-                        f"{attempt + 1}/{self.MAX_RETRIES}): {e}. "
-                        f"Retrying in {delay}s..."
-                    )
-                    time.sleep(delay)
-                else:
-                    log.error(
-                        f"Failed to save after " f"{self.MAX_RETRIES} attempts: {e}"
-                    )
-                    raise
-            except IntegrityError:
-                self.session.rollback()
-                raise
-            except DatabaseError as e:
-                self.session.rollback()
-                log.error(f"Database error: {e}")
-                raise
-            except Exception as e:
-                self.session.rollback()
-                log.exception(f"Unexpected error saving to database: {e}")
+                result = func()
+            except Exception:
+                self._rollback()
                 raise
+            self._save()
+            return result
+
+        return self._execute_with_retry(unit, operation_name)
+
+    def _save(self) -> None:
+        """Commit, rolling back on any failure"""
+        try:
+            self.session.commit()
+        except (OperationalError, IntegrityError):
+            self.session.rollback()
+            raise
+        except DatabaseError as e:
+            self.session.rollback()
+            log.error(f"Database error: {e}")
+            raise
+        except Exception as e:
+            self.session.rollback()
+            log.exception(f"Unexpected error saving to database: {e}")
+            raise
 
     def _execute_with_retry(self, func: Callable[[], T], operation_name: str) -> T:
-        """Execute a read operation with retry logic"""
-        for attempt in range(self.MAX_RETRIES):
+        """Run func under the shared retry policy"""
+        return db_retry.call(func, operation_name, on_retry=self._rollback)
+
+    def _rollback(self) -> None:
+        # Clear the failed transaction before the next attempt
+        if self._session is not None:
+            self._session.rollback()
+
+
+class AsyncSqlAlchemyUrlRepository(AsyncUrlRepository):
+    _single_flight: ClassVar[AsyncSingleFlight] = AsyncSingleFlight()
+    # Early refreshes in progress, keyed by code, with strong task references
+    _refreshes: ClassVar[dict[str, asyncio.Task]] = {}
+
+    @classmethod
+    async def cancel_refreshes(cls) -> None:
+        """Cancel pending early refreshes; called before the engine is disposed"""
+        tasks = list(cls._refreshes.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        cache: AsyncRedisCache | None = None,
+        local_cache: TinyLfuCache | None = None,
+        replicas: ReplicaSet[async_sessionmaker[AsyncSession]] | None = None,
+    ):
+        self.session_factory = session_factory
+        self._connection_use = ConnectionUse()
+        self._replicas = replicas
+        settings = get_settings()
+        self._cache: AsyncRedisCache | None = cache
+        self._local_cache: TinyLfuCache | None = local_cache
+        if settings.CACHE_ENABLED:
+            if self._cache is None:
+                self._cache = AsyncRedisCache.get_instance()
+            if self._local_cache is None and settings.LOCAL_CACHE_ENABLED:
+                self._local_cache = TinyLfuCache.get_instance()
+
+    async def get(self, shortened_url: str) -> UrlModel | None:
+        cached = await self._lookup(shortened_url)
+        return cached.to_model(shortened_url) if cached is not None else None
+
+    async def get_link(self, shortened_url: str) -> str | None:
+        cached = await self._lookup(shortened_url)
+        return cached.link if cached is not None else None
+
+    async def _lookup(self, shortened_url: str) -> CachedLink | None:
+        # Try the in-process tier, then Redis, if enabled
+        if self._local_cache:
+            local_result = self._local_cache.get(shortened_url)
+            if local_result is NOT_FOUND:
+                return None
+            if local_result is not None:
+                return local_result
+
+        if self._cache:
+            cached_result, refresh = await self._cache.get_entry(shortened_url)
+            if cached_result is NOT_FOUND:
+                if self._local_cache:
+                    self._local_cache.put_negative(shortened_url)
+                return None
+            if cached_result is not None:
+                log.debug(f"Cache hit for URL: {shortened_url}")
+                if refresh:
+                    self._schedule_refresh(shortened_url)
+                if self._local_cache:
+                    self._local_cache.put(shortened_url, cached_result)
+                return cached_result
+
+        log.debug(f"Cache miss for URL: {shortened_url}")
+        return await self._single_flight.do(
+            shortened_url, lambda: self._load(shortened_url)
+        )
+
+    def _schedule_refresh(self, shortened_url: str) -> None:
+        if shortened_url in self._refreshes:
+            return
+        metrics.increment("cache.early_refreshes")
+        task = asyncio.create_task(self._refresh(shortened_url))
+        self._refreshes[shortened_url] = task
+        task.add_done_callback(lambda _: self._refreshes.pop(shortened_url, None))
+
+    async def _refresh(self, shortened_url: str) -> None:
+        try:
+            await self._single_flight.do(
+                shortened_url, lambda: self._load(shortened_url)
+            )
+        except Exception as e:
+            # The current entry stays valid until it expires, so just log
+            log.warning(f"Error refreshing cached URL {shortened_url}: {e}")
+
+    async def _load(self, shortened_url: str) -> CachedLink | None:
+        """Load a code from the database and populate the cache tiers"""
+        token = None
+        if self._cache and self._cache.locks_enabled:
+            token = await self._cache.acquire_lock(shortened_url)
+            if token is None:
+                # Another pod is loading this code, give it a moment to finish
+                peer_result = await self._cache.wait_for_peer(shortened_url)
+                if peer_result is NOT_FOUND:
+                    metrics.increment("singleflight.peer_collapsed")
+                    if self._local_cache:
+                        self._local_cache.put_negative(shortened_url)
+                    return None
+                if peer_result is not None:
+                    metrics.increment("singleflight.peer_collapsed")
+                    if self._local_cache:
+                        self._local_cache.put(shortened_url, peer_result)
+                    return peer_result
+                metrics.increment("singleflight.peer_fallbacks")
+
+        try:
+            started = time.perf_counter()
+            result = await self._execute_with_retry(
+                lambda: self._get_impl(shortened_url), "get URL"
+            )
+            if result is not None:
+                await self._cache_put(
+                    shortened_url, result, time.perf_counter() - started
+                )
+            else:
+                await self._cache_put_negative(shortened_url)
+            return result
+        finally:
+            if token is not None and self._cache:
+                await self._cache.release_lock(shortened_url, token)
+
+    async def _cache_put(
+        self, shortened_url: str, result: CachedLink, delta: float = 0.0
+    ) -> None:
+        if self._local_cache:
+            self._local_cache.put(shortened_url, result)
+        if self._cache:
+            await self._cache.put(shortened_url, result, delta)
+
+    async def _cache_put_negative(self, shortened_url: str) -> None:
+        if self._local_cache:
+            self._local_cache.put_negative(shortened_url)
+        if self._cache:
+            await self._cache.put_negative(shortened_url)
+
+    def close(self) -> None:
+        """Record at the end of a request whether it needed a connection"""
+        self._connection_use.record()
+
+    async def _get_impl(self, shortened_url: str) -> CachedLink | None:
+        # Sessions are opened per lookup, so only cache misses get here
+        self._connection_use.used = True
+        choice = self._replicas.choose(shortened_url) if self._replicas else None
+        if choice is not None:
+            index, replica_session_factory = choice
             try:
-                return func()
-            except OperationalError as e:
-                if attempt < self.MAX_RETRIES - 1:
-                    delay = self.RETRY_DELAY * (2**attempt)
-                    log.warning(
-                        f"Database error during {operation_name} (attempt "
-                        f"{attempt + 1}/{self.MAX_RETRIES}): {e}. "
-                        f"Retrying in {delay}s..."
-                    )
-                    time.sleep(delay)
-                    # Rollback to clear any failed transaction state
-                    self.session.rollback()
-                else:
-                    log.error(
-                        f"Failed to {operation_name} after "
-                        f"{self.MAX_RETRIES} attempts: {e}"
-                    )
-                    raise
-            except Exception as e:
-                log.error(f"Unexpected error during {operation_name}: {e}")
-                raise
-        # This should never be reached, but mypy requires it
-        raise RuntimeError(f"Failed to {operation_name} after all retries")
+                result = await self._select_link(replica_session_factory, shortened_url)
+            except (OperationalError, InterfaceError) as e:
+                assert self._replicas is not None
+                self._replicas.mark_failed(index, e)
+            else:
+                if result is not None:
+                    metrics.increment("db.replica.reads")
+                    return result
+                # The replica may not have replayed a just-created code yet
+                metrics.increment("db.replica.miss_fallbacks")
+        return await self._select_link(self.session_factory, shortened_url)
+
+    @staticmethod
+    async def _select_link(
+        session_factory: async_sessionmaker[AsyncSession], shortened_url: str
+    ) -> CachedLink | None:
+        async with session_factory() as session:
+            result = await session.execute(
+                SELECT_LINK_BY_CODE, {"short_link": shortened_url}
+            )
+            row = result.first()
+            if row is None:
+                return None
+            return CachedLink.from_row(row.link, row.created_at)
+
+    async def _execute_with_retry(
+        self, func: Callable[[], Awaitable[T]], operation_name: str
+    ) -> T:
+        """Run func under the shared retry policy, without blocking the loop"""
+        return await db_retry.call_async(func, operation_name)
@@ -0,0 +1,146 @@
+import asyncio
+import logging
+import random
+import time
+from collections.abc import Awaitable, Callable
+from threading import Lock
+from typing import TypeVar
+
+from sqlalchemy.exc import OperationalError
+
+from app.constants import (
+    RETRY_BASE_DELAY_SECONDS,
+    RETRY_BUDGET_CAPACITY,
+    RETRY_BUDGET_RATIO,
+    RETRY_MAX_ATTEMPTS,
+    RETRY_MAX_DELAY_SECONDS,
+)
+from app.metrics import metrics
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class RetryBudget:
+    """
+    Caps retries at a fraction of calls across the process. Every call
+    deposits `ratio` tokens and every retry spends one, so during an outage
+    at most `ratio` of calls are retried; the `capacity` tokens saved up
+    while healthy cover short bursts.
+    """
+
+    def __init__(self, ratio: float, capacity: float):
+        self.ratio = ratio
+        self.capacity = capacity
+        self._tokens = capacity
+        self._lock = Lock()
+
+    def deposit(self) -> None:
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    @property
+    def tokens(self) -> float:
+        with self._lock:
+            return self._tokens
+
+
+class RetryPolicy:
+    """
+    Retries transient database errors with decorrelated jitter: each delay
+    is drawn between the base delay and three times the previous one, capped
+    at max_delay, so callers that failed together do not retry together.
+    Retries draw on a shared RetryBudget. Counters are exported as
+    retry.<name>.calls, .retries, .budget_exhausted and .gave_up.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        budget: RetryBudget,
+        max_attempts: int = RETRY_MAX_ATTEMPTS,
+        base_delay: float = RETRY_BASE_DELAY_SECONDS,
+        max_delay: float = RETRY_MAX_DELAY_SECONDS,
+        retry_on: tuple[type[Exception], ...] = (OperationalError,),
+    ):
+        self.name = name
+        self.budget = budget
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_on = retry_on
+
+    def call(
+        self,
+        func: Callable[[], T],
+        operation_name: str,
+        on_retry: Callable[[], object] | None = None,
+    ) -> T:
+        """Run func, sleeping the thread between attempts"""
+        metrics.increment(f"retry.{self.name}.calls")
+        self.budget.deposit()
+        delay = self.base_delay
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                return func()
+            except self.retry_on as e:
+                delay = self._next_delay(attempt, delay, e, operation_name)
+                if on_retry is not None:
+                    on_retry()
+                time.sleep(delay)
+        raise AssertionError("unreachable")
+
+    async def call_async(
+        self,
+        func: Callable[[], Awaitable[T]],
+        operation_name: str,
+        on_retry: Callable[[], Awaitable[object]] | None = None,
+    ) -> T:
+        """Run func, yielding to the event loop between attempts"""
+        metrics.increment(f"retry.{self.name}.calls")
+        self.budget.deposit()
+        delay = self.base_delay
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                return await func()
+            except self.retry_on as e:
+                delay = self._next_delay(attempt, delay, e, operation_name)
+                if on_retry is not None:
+                    await on_retry()
+                await asyncio.sleep(delay)
+        raise AssertionError("unreachable")
+
+    def _next_delay(
+        self, attempt: int, previous: float, error: Exception, operation_name: str
+    ) -> float:
+        """The delay before the next attempt; re-raises when there is none"""
+        if attempt >= self.max_attempts:
+            metrics.increment(f"retry.{self.name}.gave_up")
+            log.error(f"Failed to {operation_name} after {attempt} attempts: {error}")
+            raise error
+        if not self.budget.try_spend():
+            metrics.increment(f"retry.{self.name}.budget_exhausted")
+            log.error(f"Not retrying {operation_name}, retry budget spent: {error}")
+            raise error
+
+        metrics.increment(f"retry.{self.name}.retries")
+        delay = min(self.max_delay, random.uniform(self.base_delay, previous * 3))
+        log.warning(
+            f"Database error during {operation_name} (attempt "
+            f"{attempt}/{self.max_attempts}): {error}. "
+            f"Retrying in {delay:.3f}s..."
+        )
+        return delay
+
+
+# One budget per process, so every caller backs off together in an outage
+db_retry_budget = RetryBudget(RETRY_BUDGET_RATIO, RETRY_BUDGET_CAPACITY)
+db_retry = RetryPolicy("db", db_retry_budget)
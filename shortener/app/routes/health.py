@@ -5,6 +5,7 @@ from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.sql import text
 
 from app.db.session import SessionLocal
+from app.metrics import metrics
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -40,3 +41,8 @@ async def readiness_check(session=Depends(get_session)) -> dict:
         "service": "shortener",
         "dependencies": {"database": db_status},
     }
+
+
+@router.get("/metrics")
+async def metrics_snapshot() -> dict:
+    return {"service": "shortener", **metrics.snapshot()}
@@ -1,13 +1,46 @@
 import ipaddress
 import logging
-
-from fastapi import APIRouter, Body, Depends, HTTPException, Path, Request, status
-from fastapi.responses import RedirectResponse
-
-from app.constants import SHORT_URL_LENGTH, TRUSTED_PROXY_NETWORKS
-from app.dependencies import get_url_service
-from app.models import ResponseModel, UrlCreate, UrlModel
-from app.service import UrlShortenerService
+from datetime import datetime
+
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    HTTPException,
+    Path,
+    Query,
+    Request,
+    status,
+)
+from fastapi.responses import RedirectResponse, StreamingResponse
+from pydantic import HttpUrl, ValidationError
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.canonical import normalize_host
+from app.constants import (
+    LIST_PAGE_MAX_SIZE,
+    LIST_PAGE_SIZE,
+    SHORT_URL_LENGTH,
+    TRUSTED_PROXY_NETWORKS,
+)
+from app.dependencies import (
+    get_async_url_service,
+    get_session_factory,
+    get_url_service,
+)
+from app.export import MEDIA_TYPES, ExportFormat, stream_export
+from app.models import (
+    BulkResponseModel,
+    BulkShortenResult,
+    BulkUrlCreate,
+    CountResponseModel,
+    PageResponseModel,
+    ResponseModel,
+    UrlCreate,
+    UrlModel,
+)
+from app.pagination import PageCursor, UrlFilter
+from app.service import AsyncUrlShortenerService, UrlShortenerService
 
 router = APIRouter()
 
@@ -31,10 +64,60 @@ def shorten_url(
     return ResponseModel(data=shorten_url)
 
 
-@router.get("/", response_model=ResponseModel)
-def list_urls(service: UrlShortenerService = Depends(get_url_service)):
+@router.post(
+    "/batch", response_model=BulkResponseModel, status_code=status.HTTP_201_CREATED
+)
+def shorten_urls(
+    payload: BulkUrlCreate = Body(..., description="URLs to shorten"),
+    service: UrlShortenerService = Depends(get_url_service),
+):
+    results: list[BulkShortenResult] = []
+    valid: list[tuple[int, HttpUrl]] = []
+    for raw_url in payload.urls:
+        try:
+            url = UrlCreate.model_validate({"url": raw_url}).url
+        except ValidationError as e:
+            error = e.errors()[0]["msg"]
+            results.append(BulkShortenResult(url=raw_url, success=False, error=error))
+            continue
+        valid.append((len(results), url))
+        results.append(BulkShortenResult(url=raw_url))
+
     try:
-        shortened_urls = service.get_all_urls()
+        shortened = service.shorten_urls([url for _, url in valid])
+    except Exception as e:
+        logger.error(f"Error shortening URLs: {e!s}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Something went wrong",
+        )
+
+    for (index, _), url_model in zip(valid, shortened, strict=True):
+        results[index].data = url_model
+
+    return BulkResponseModel(data=results)
+
+
+@router.get("/", response_model=PageResponseModel)
+def list_urls(
+    limit: int = Query(
+        LIST_PAGE_SIZE, ge=1, le=LIST_PAGE_MAX_SIZE, description="Page size"
+    ),
+    cursor: str | None = Query(None, description="next_cursor from the previous page"),
+    include_total: bool = Query(
+        False, description="Include an approximate count of all URLs"
+    ),
+    service: UrlShortenerService = Depends(get_url_service),
+):
+    try:
+        page_cursor = PageCursor.decode(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+
+    try:
+        page = service.list_urls(limit, page_cursor, include_total)
     except Exception as e:
         logger.error(f"Error listing URLs: {e!s}")
         raise HTTPException(
@@ -42,21 +125,94 @@ def list_urls(service: UrlShortenerService = Depends(get_url_service)):
             detail="Something went wrong",
         )
 
-    return ResponseModel(data=shortened_urls)
+    return PageResponseModel(
+        data=page.items,
+        next_cursor=page.next_cursor,
+        total_estimate=page.total_estimate,
+    )
+
+
+@router.get("/search", response_model=PageResponseModel | CountResponseModel)
+def search_urls(
+    domain: str = Query(
+        ..., min_length=1, max_length=255, description="Exact host, e.g. example.com"
+    ),
+    created_from: datetime | None = Query(
+        None, description="Only URLs created at or after this time"
+    ),
+    created_to: datetime | None = Query(
+        None, description="Only URLs created before this time"
+    ),
+    limit: int = Query(
+        LIST_PAGE_SIZE, ge=1, le=LIST_PAGE_MAX_SIZE, description="Page size"
+    ),
+    cursor: str | None = Query(None, description="next_cursor from the previous page"),
+    count_only: bool = Query(
+        False, description="Return only the number of matching URLs"
+    ),
+    service: UrlShortenerService = Depends(get_url_service),
+):
+    try:
+        host = normalize_host(domain)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid domain"
+        )
+    filters = UrlFilter(
+        host=host,
+        created_from=created_from,
+        created_to=created_to,
+    )
+    try:
+        page_cursor = PageCursor.decode(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+
+    try:
+        if count_only:
+            return CountResponseModel(count=service.count_urls(filters))
+        page = service.search_urls(filters, limit, page_cursor)
+    except Exception as e:
+        logger.error(f"Error searching URLs: {e!s}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Something went wrong",
+        )
+
+    return PageResponseModel(data=page.items, next_cursor=page.next_cursor)
+
+
+@router.get("/export")
+def export_urls(
+    format: ExportFormat = Query("ndjson", description="ndjson or csv"),
+    created_from: datetime | None = Query(
+        None, description="Only URLs created at or after this time"
+    ),
+    created_to: datetime | None = Query(
+        None, description="Only URLs created before this time"
+    ),
+    session_factory: sessionmaker[Session] = Depends(get_session_factory),
+):
+    return StreamingResponse(
+        stream_export(session_factory, format, created_from, created_to),
+        media_type=MEDIA_TYPES[format],
+    )
 
 
 @router.get("/{shortened_url}", response_model=ResponseModel)
-def get_url(
+async def get_url(
     request: Request,
     shortened_url: str = Path(
         ..., min_length=SHORT_URL_LENGTH, max_length=SHORT_URL_LENGTH
     ),
-    service: UrlShortenerService = Depends(get_url_service),
+    service: AsyncUrlShortenerService = Depends(get_async_url_service),
 ):
 
     client_ip, city, country = _parse_request(request)
 
-    shorten_url = service.get_url(
+    shorten_url = await service.get_url(
         shortened_url=shortened_url,
         request_ip=client_ip,
         city=city,
@@ -174,25 +330,25 @@ def delete_url(
 
 
 @router.get("/redirect/{shortened_url}")
-def redirect_to_url(
+async def redirect_to_url(
     request: Request,
     shortened_url: str = Path(
         ..., min_length=SHORT_URL_LENGTH, max_length=SHORT_URL_LENGTH
     ),
-    service: UrlShortenerService = Depends(get_url_service),
+    service: AsyncUrlShortenerService = Depends(get_async_url_service),
 ):
     client_ip, city, country = _parse_request(request)
 
-    shorten_url = service.get_url(
+    link = await service.get_link(
         shortened_url=shortened_url,
         request_ip=client_ip,
         city=city,
         country=country,
     )
-    if not shorten_url:
+    if not link:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="URL not found"
         )
 
     # Return a 302 redirect to the original URL
-    return RedirectResponse(url=str(shorten_url.link), status_code=302)
+    return RedirectResponse(url=link, status_code=302)
@@ -6,21 +6,35 @@ import secrets
 from datetime import datetime
 
 from pydantic import HttpUrl
+from sqlalchemy.exc import IntegrityError
 
-from app.constants import NANOSECONDS_MULTIPLIER, SHORT_URL_LENGTH
+from app.canonical import url_hash
+from app.codes import ShortCodeGenerator
+from app.constants import LIST_PAGE_SIZE, NANOSECONDS_MULTIPLIER, SHORT_URL_LENGTH
 from app.grpc.client import AnalyticsClient
-from app.models import UrlModel
-from app.repository import UrlRepository
+from app.models import UrlModel, UrlPage
+from app.pagination import PageCursor, UrlFilter
+from app.repository import AsyncUrlRepository, UrlRepository
 
 logger = logging.getLogger(__name__)
 
+# Strong references to in-flight analytics tasks so they are not
+# garbage-collected before completion
+_background_tasks: set[asyncio.Task] = set()
+
 
 class UrlShortenerService:
     MAX_RETRIES = 5
 
-    def __init__(self, repository: UrlRepository, analytics_client: AnalyticsClient):
+    def __init__(
+        self,
+        repository: UrlRepository,
+        analytics_client: AnalyticsClient,
+        code_generator: ShortCodeGenerator | None = None,
+    ):
         self.analytics_client = analytics_client
         self.repository = repository
+        self.code_generator = code_generator
 
     def shorten_url(self, url: HttpUrl) -> UrlModel:
         existing_url = self.repository.find_by_url(url)
@@ -28,6 +42,11 @@ class UrlShortenerService:
             logger.info(f"URL already exists: {url} -> {existing_url.short_link}")
             return existing_url
 
+        if self.code_generator is not None:
+            created = self._create_with_generated_code(url)
+            if created is not None:
+                return created
+
         for attempt in range(self.MAX_RETRIES):
             shortened_url = self._generate_short_url(url)
 
@@ -44,6 +63,79 @@ class UrlShortenerService:
             f"Failed to generate unique short URL after " f"{self.MAX_RETRIES} attempts"
         )
 
+    def _create_with_generated_code(self, url: HttpUrl) -> UrlModel | None:
+        """
+        Create with a collision-free code, skipping the availability read.
+        Returns None when no code can be leased, so callers fall back to
+        random codes.
+        """
+        assert self.code_generator is not None
+        for attempt in range(self.MAX_RETRIES):
+            try:
+                shortened_url = self.code_generator.next_code()
+            except Exception as e:
+                logger.warning(
+                    f"Short code generator unavailable, using random codes: {e}"
+                )
+                return None
+
+            try:
+                return self.repository.create(shortened_url=shortened_url, url=url)
+            except IntegrityError:
+                # Only a code issued by the random strategy can be in the way
+                logger.warning(
+                    f"Generated code {shortened_url} already taken, "
+                    f"attempt {attempt + 1}/{self.MAX_RETRIES}"
+                )
+
+        raise ValueError(
+            f"Failed to generate unique short URL after " f"{self.MAX_RETRIES} attempts"
+        )
+
+    def shorten_urls(self, urls: list[HttpUrl]) -> list[UrlModel]:
+        """
+        Shorten many URLs with one dedupe lookup and one insert per attempt.
+        Results follow input order; repeated URLs share a short link.
+        """
+        hashes = [url_hash(str(url)) for url in urls]
+        pending = dict(zip(hashes, urls, strict=True))
+        stored = self.repository.find_by_urls(list(pending.values()))
+        for key in stored:
+            pending.pop(key, None)
+
+        for attempt in range(self.MAX_RETRIES):
+            if not pending:
+                break
+            codes = self._generate_short_urls(list(pending.values()))
+            created = self.repository.create_many(
+                list(zip(codes, pending.values(), strict=True))
+            )
+            stored.update(created)
+            for key in created:
+                pending.pop(key, None)
+            if pending:
+                logger.warning(
+                    f"Collision detected for {len(pending)} codes, "
+                    f"attempt {attempt + 1}/{self.MAX_RETRIES}"
+                )
+
+        if pending:
+            raise ValueError(
+                f"Failed to generate unique short URLs after "
+                f"{self.MAX_RETRIES} attempts"
+            )
+        return [stored[key] for key in hashes]
+
+    def _generate_short_urls(self, urls: list[HttpUrl]) -> list[str]:
+        if self.code_generator is not None:
+            try:
+                return self.code_generator.next_codes(len(urls))
+            except Exception as e:
+                logger.warning(
+                    f"Short code generator unavailable, using random codes: {e}"
+                )
+        return [self._generate_short_url(url) for url in urls]
+
     @staticmethod
     def _generate_short_url(url: HttpUrl) -> str:
         # Add secure random salt to prevent predictable hashes
@@ -59,6 +151,25 @@ class UrlShortenerService:
     def get_all_urls(self) -> list[UrlModel]:
         return self.repository.list()
 
+    def list_urls(
+        self,
+        limit: int = LIST_PAGE_SIZE,
+        cursor: PageCursor | None = None,
+        include_total: bool = False,
+    ) -> UrlPage:
+        return self.repository.list_page(limit, cursor, include_total)
+
+    def search_urls(
+        self,
+        filters: UrlFilter,
+        limit: int = LIST_PAGE_SIZE,
+        cursor: PageCursor | None = None,
+    ) -> UrlPage:
+        return self.repository.search(filters, limit, cursor)
+
+    def count_urls(self, filters: UrlFilter) -> int:
+        return self.repository.count(filters)
+
     def get_url(
         self,
         shortened_url: str,
@@ -129,3 +240,72 @@ class UrlShortenerService:
 
     def delete_url(self, shortened_url: str) -> None:
         self.repository.delete(shortened_url)
+
+
+class AsyncUrlShortenerService:
+    """Redirect lookups for the async request path"""
+
+    def __init__(
+        self, repository: AsyncUrlRepository, analytics_client: AnalyticsClient
+    ):
+        self.analytics_client = analytics_client
+        self.repository = repository
+
+    async def get_url(
+        self,
+        shortened_url: str,
+        request_ip: str | None = None,
+        city: str = "unknown",
+        country: str = "unknown",
+    ) -> UrlModel | None:
+        self._record_analytics(shortened_url, request_ip, city, country)
+
+        return await self.repository.get(shortened_url)
+
+    async def get_link(
+        self,
+        shortened_url: str,
+        request_ip: str | None = None,
+        city: str = "unknown",
+        country: str = "unknown",
+    ) -> str | None:
+        """Redirect fast path: the stored destination without building a model"""
+        self._record_analytics(shortened_url, request_ip, city, country)
+
+        return await self.repository.get_link(shortened_url)
+
+    def _record_analytics(
+        self, shortened_url: str, request_ip: str | None, city: str, country: str
+    ) -> None:
+        """Schedule analytics on the running loop without awaiting it"""
+        ip = request_ip if request_ip else "0.0.0.0"
+        task = asyncio.create_task(
+            self._record_click_with_error_handling(shortened_url, ip, city, country)
+        )
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+
+    async def _record_click_with_error_handling(
+        self, shortened_url: str, ip: str, city: str, country: str
+    ) -> None:
+        try:
+            await self.analytics_client.record_click_async(
+                short_link=shortened_url,
+                ip=ip,
+                city=city,
+                country=country,
+            )
+        except Exception as e:
+            logger.error(f"Error recording click asynchronously: {e!s}")
+
+
+async def drain_background_tasks(timeout: float) -> None:
+    """Give in-flight analytics tasks a chance to finish, then cancel them"""
+    if not _background_tasks:
+        return
+
+    _, pending = await asyncio.wait(set(_background_tasks), timeout=timeout)
+    for task in pending:
+        task.cancel()
+    if pending:
+        logger.warning(f"Cancelled {len(pending)} pending analytics tasks")
@@ -0,0 +1,103 @@
+"""
+Per-call cost of the hot lookups, as they were and as they are now.
+
+    python -m benchmarks.lookups --rows 10000 --calls 20000
+
+Each pair runs the same lookup against the same database: first as an ORM
+query built per call, then as the prebuilt Core statement from
+app.db.queries. An in-memory SQLite database is used unless --url names a
+scratch database to seed, so by default the numbers are mostly Python
+overhead rather than I/O.
+"""
+
+import argparse
+import random
+import timeit
+from collections.abc import Callable
+from typing import Any
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.canonical import link_host, url_hash
+from app.db.objects import Base, Url
+from app.db.queries import SELECT_LINK_BY_CODE, SELECT_URL_BY_HASH
+
+
+def seed(session: Session, rows: int) -> list[tuple[str, str]]:
+    """Insert `rows` links and return their (code, hash) pairs"""
+    keys = []
+    for i in range(rows):
+        link = f"https://example.com/{i}"
+        code = f"b{i:07d}"
+        link_hash = url_hash(link)
+        session.add(
+            Url(link=link, short_link=code, url_hash=link_hash, host=link_host(link))
+        )
+        keys.append((code, link_hash))
+    session.commit()
+    return keys
+
+
+def cases(
+    session: Session, keys: list[tuple[str, str]]
+) -> dict[str, Callable[[], Any]]:
+    codes = [code for code, _ in keys]
+    hashes = [link_hash for _, link_hash in keys]
+
+    def get_orm() -> Any:
+        code = random.choice(codes)
+        return session.query(Url).filter(Url.short_link == code).first()
+
+    def get_select_per_call() -> Any:
+        code = random.choice(codes)
+        return session.execute(
+            select(Url.link, Url.created_at).where(Url.short_link == code).limit(1)
+        ).first()
+
+    def get_core() -> Any:
+        code = random.choice(codes)
+        return session.execute(SELECT_LINK_BY_CODE, {"short_link": code}).first()
+
+    def find_orm() -> Any:
+        link_hash = random.choice(hashes)
+        return session.query(Url).filter(Url.url_hash == link_hash).first()
+
+    def find_core() -> Any:
+        link_hash = random.choice(hashes)
+        return session.execute(SELECT_URL_BY_HASH, {"url_hash": link_hash}).first()
+
+    return {
+        "get by code, ORM query": get_orm,
+        "get by code, select built per call": get_select_per_call,
+        "get by code, prebuilt Core": get_core,
+        "find by hash, ORM query": find_orm,
+        "find by hash, prebuilt Core": find_core,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.lookups",
+        description="Time the hot lookups per call",
+    )
+    parser.add_argument("--url", default="sqlite://", help="Database to run against")
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--calls", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    engine = create_engine(args.url)
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as session:
+        keys = seed(session, args.rows)
+        for name, case in cases(session, keys).items():
+            case()  # warm the statement cache
+            best = min(timeit.repeat(case, number=args.calls, repeat=args.repeat))
+            print(f"{name:<40} {best / args.calls * 1e6:8.1f} us/call")
+    engine.dispose()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -6,10 +6,22 @@ from http import HTTPMethod as Method
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.codes import ShortCodeGenerator
+from app.config import get_settings
+from app.constants import ANALYTICS_DRAIN_TIMEOUT_SECONDS
+from app.db.session import SessionLocal, async_engine, async_replica_engines
 from app.exceptions import catch_all_exception_handler, internal_server_error_handler
+from app.grpc.client import GrpcAnalyticsClient
 from app.middleware.rate_limiting import cleanup_rate_limiter, rate_limit_middleware
+from app.repository import (
+    AsyncRedisCache,
+    AsyncSqlAlchemyUrlRepository,
+    RedisCache,
+    TinyLfuCache,
+)
 from app.routes.health import router as health_router
 from app.routes.urls import router as urls_router
+from app.service import drain_background_tasks
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +29,14 @@ logger = logging.getLogger(__name__)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Manage application lifespan events"""
+    settings = get_settings()
+    if settings.CACHE_ENABLED:
+        logger.info("Initializing shared Redis cache...")
+        RedisCache.get_instance()
+    if settings.SHORT_CODE_STRATEGY == "sequence":
+        # Fail fast on a missing SHORT_CODE_SECRET
+        ShortCodeGenerator.get_instance(session_factory=SessionLocal)
+
     logger.info("Starting background tasks...")
     cleanup_task = asyncio.create_task(periodic_cleanup())
 
@@ -29,6 +49,28 @@ async def lifespan(app: FastAPI):
     except asyncio.CancelledError:
         pass
 
+    await drain_background_tasks(timeout=ANALYTICS_DRAIN_TIMEOUT_SECONDS)
+    if GrpcAnalyticsClient._instance:
+        await GrpcAnalyticsClient._instance.close_async()
+        # Sends the clicks still buffered, within the same drain budget
+        try:
+            await asyncio.wait_for(
+                asyncio.to_thread(GrpcAnalyticsClient.close_instance),
+                timeout=ANALYTICS_DRAIN_TIMEOUT_SECONDS,
+            )
+        except TimeoutError:
+            logger.warning("Timed out sending buffered analytics clicks")
+
+    await AsyncSqlAlchemyUrlRepository.cancel_refreshes()
+
+    logger.info("Closing shared caches...")
+    RedisCache.close_instance()
+    await AsyncRedisCache.close_instance()
+    TinyLfuCache.close_instance()
+    await async_engine.dispose()
+    for replica_engine in async_replica_engines:
+        await replica_engine.dispose()
+
 
 async def periodic_cleanup():
     """Background task for periodic cleanup operations"""
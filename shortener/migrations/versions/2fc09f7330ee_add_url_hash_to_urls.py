@@ -0,0 +1,114 @@
+"""Add url_hash to urls
+
+Revision ID: 2fc09f7330ee
+Revises: d1829c8520bf
+Create Date: 2026-10-17 10:12:41.203518
+
+"""
+import hashlib
+import logging
+import re
+from typing import Sequence, Union
+from urllib.parse import urlsplit, urlunsplit
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2fc09f7330ee'
+down_revision: Union[str, None] = 'd1829c8520bf'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 1000
+
+logger = logging.getLogger('alembic.runtime.migration')
+
+# Frozen copy of app.canonical as of this revision, so later changes to the
+# app's canonical form cannot change what this migration writes
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+PERCENT_ESCAPE = re.compile(r'%[0-9a-fA-F]{2}')
+
+
+def upgrade() -> None:
+    op.add_column('urls', sa.Column('url_hash', sa.String(length=64), nullable=True))
+    _backfill_url_hash()
+    _clear_duplicate_hashes()
+    # Built after the backfill so it is not maintained row by row
+    op.create_index(op.f('ix_urls_url_hash'), 'urls', ['url_hash'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_urls_url_hash'), table_name='urls')
+    with op.batch_alter_table('urls') as batch_op:
+        batch_op.drop_column('url_hash')
+
+
+def _backfill_url_hash() -> None:
+    """Hash existing links in id order, one batch at a time"""
+    connection = op.get_bind()
+    select_batch = sa.text(
+        "SELECT id, link FROM urls WHERE id > :last_id ORDER BY id LIMIT :limit"
+    )
+    update_hash = sa.text("UPDATE urls SET url_hash = :url_hash WHERE id = :id")
+
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            select_batch, {'last_id': last_id, 'limit': BACKFILL_BATCH_SIZE}
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+
+        updates = [{'id': row.id, 'url_hash': _url_hash(row.link)} for row in rows]
+        connection.execute(update_hash, updates)
+
+
+def _clear_duplicate_hashes() -> None:
+    """
+    Links saved before dedupe may share a canonical form. Only the oldest
+    row of each such set keeps the hash, so the unique index can be built;
+    the others stay NULL and still redirect as before.
+    """
+    result = op.get_bind().execute(sa.text(
+        "UPDATE urls SET url_hash = NULL"
+        " WHERE url_hash IS NOT NULL AND id NOT IN ("
+        "  SELECT MIN(id) FROM urls WHERE url_hash IS NOT NULL GROUP BY url_hash"
+        ")"
+    ))
+    if result.rowcount:
+        logger.warning(
+            f"{result.rowcount} urls share their canonical link with an older"
+            " row and were left without url_hash"
+        )
+
+
+def _url_hash(url: str) -> str:
+    return hashlib.sha256(_canonicalize_url(url).encode('utf-8')).hexdigest()
+
+
+def _canonicalize_url(url: str) -> str:
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+
+    netloc = (parts.hostname or '').lower()
+    if parts.port is not None and parts.port != DEFAULT_PORTS.get(scheme):
+        netloc = f'{netloc}:{parts.port}'
+    if parts.username is not None:
+        userinfo = parts.username
+        if parts.password is not None:
+            userinfo = f'{userinfo}:{parts.password}'
+        netloc = f'{userinfo}@{netloc}'
+
+    path = _uppercase_escapes(parts.path) or '/'
+    query = _uppercase_escapes(parts.query)
+    fragment = _uppercase_escapes(parts.fragment)
+
+    return urlunsplit((scheme, netloc, path, query, fragment))
+
+
+def _uppercase_escapes(value: str) -> str:
+    return PERCENT_ESCAPE.sub(lambda match: match.group(0).upper(), value)
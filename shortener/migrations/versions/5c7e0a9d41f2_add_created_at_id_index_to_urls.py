@@ -0,0 +1,26 @@
+"""Add created_at, id index to urls
+
+Revision ID: 5c7e0a9d41f2
+Revises: bbd6f73323be
+Create Date: 2026-10-17 13:24:09.118302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c7e0a9d41f2'
+down_revision: Union[str, None] = 'bbd6f73323be'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_urls_created_at_id', 'urls', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_urls_created_at_id', table_name='urls')
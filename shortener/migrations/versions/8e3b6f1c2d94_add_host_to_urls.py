@@ -0,0 +1,71 @@
+"""Add host to urls
+
+Revision ID: 8e3b6f1c2d94
+Revises: 5c7e0a9d41f2
+Create Date: 2026-10-17 14:05:52.730144
+
+"""
+from typing import Sequence, Union
+from urllib.parse import urlsplit
+
+from alembic import op
+from pydantic import HttpUrl, TypeAdapter
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e3b6f1c2d94'
+down_revision: Union[str, None] = '5c7e0a9d41f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 1000
+
+# Frozen copy of app.canonical.link_host as of this revision, so later
+# changes to how the app stores hosts cannot change what this migration writes
+HTTP_URL: TypeAdapter[HttpUrl] = TypeAdapter(HttpUrl)
+
+
+def upgrade() -> None:
+    op.add_column('urls', sa.Column('host', sa.String(length=255), nullable=True))
+    _backfill_host()
+    # Built after the backfill so it is not maintained row by row
+    op.create_index('ix_urls_host_created_at_id', 'urls', ['host', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_urls_host_created_at_id', table_name='urls')
+    with op.batch_alter_table('urls') as batch_op:
+        batch_op.drop_column('host')
+
+
+def _backfill_host() -> None:
+    """Fill host for existing links in id order, one batch at a time"""
+    connection = op.get_bind()
+    select_batch = sa.text(
+        "SELECT id, link FROM urls WHERE id > :last_id ORDER BY id LIMIT :limit"
+    )
+    update_host = sa.text("UPDATE urls SET host = :host WHERE id = :id")
+
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            select_batch, {'last_id': last_id, 'limit': BACKFILL_BATCH_SIZE}
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+
+        updates = [{'id': row.id, 'host': _link_host(row.link)} for row in rows]
+        connection.execute(update_host, updates)
+
+
+def _link_host(url: str) -> str | None:
+    host = urlsplit(url.strip()).hostname
+    if not host:
+        return None
+    host = host.strip()
+    if not host.isascii():
+        # HttpUrl follows UTS #46, which differs from Python's idna codec
+        host = HTTP_URL.validate_python(f'http://{host}/').host or host
+    return host.lower().rstrip('.')
@@ -0,0 +1,30 @@
+"""Create short_code_blocks table
+
+Revision ID: bbd6f73323be
+Revises: 2fc09f7330ee
+Create Date: 2026-10-17 11:02:17.584931
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'bbd6f73323be'
+down_revision: Union[str, None] = '2fc09f7330ee'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('short_code_blocks',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('allocated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('short_code_blocks')
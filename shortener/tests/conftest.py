@@ -1,13 +1,16 @@
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
+import pytest_asyncio
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 
 from app.db.objects import Base
 from app.grpc.client import AnalyticsClient
-from app.repository import SqlAlchemyUrlRepository
-from app.service import UrlShortenerService
+from app.repository import AsyncSqlAlchemyUrlRepository, SqlAlchemyUrlRepository
+from app.service import AsyncUrlShortenerService, UrlShortenerService
 
 
 @pytest.fixture
@@ -57,6 +60,38 @@ def service(repository, mock_analytics_client):
     return UrlShortenerService(repository, mock_analytics_client)
 
 
+@pytest_asyncio.fixture
+async def async_session_factory():
+    """Create an in-memory aiosqlite database shared by all async sessions"""
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    yield async_sessionmaker(bind=engine, expire_on_commit=False)
+
+    await engine.dispose()
+
+
+@pytest.fixture
+def async_repository(async_session_factory):
+    """Create an async repository instance for testing without cache"""
+    with patch("app.repository.get_settings") as mock_settings:
+        mock_settings.return_value.CACHE_ENABLED = False
+        return AsyncSqlAlchemyUrlRepository(async_session_factory)
+
+
+@pytest.fixture
+def async_analytics_client():
+    client = Mock(spec=AnalyticsClient)
+    client.record_click_async = AsyncMock(return_value=True)
+    return client
+
+
+@pytest.fixture
+def async_service(async_repository, async_analytics_client):
+    return AsyncUrlShortenerService(async_repository, async_analytics_client)
+
+
 @pytest.fixture
 def sample_urls():
     """Sample URLs for testing"""
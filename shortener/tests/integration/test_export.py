@@ -0,0 +1,65 @@
+import csv
+import io
+import json
+from datetime import UTC, datetime
+
+import pytest
+
+from app.db.objects import Url
+from app.export import main, stream_export
+
+
+@pytest.fixture
+def stored_urls(in_memory_db):
+    with in_memory_db() as session:
+        for day in (1, 2, 3):
+            session.add(
+                Url(
+                    link=f"https://export.example.com/{day}",
+                    short_link=f"export0{day}",
+                    created_at=datetime(2026, 1, day, tzinfo=UTC),
+                )
+            )
+        session.commit()
+    return in_memory_db
+
+
+def test_should_stream_ndjson_in_created_at_order(stored_urls):
+    chunks = list(stream_export(stored_urls, "ndjson", batch_size=2))
+
+    assert len(chunks) == 2
+    rows = [json.loads(line) for line in "".join(chunks).splitlines()]
+    assert [row["short_link"] for row in rows] == ["export01", "export02", "export03"]
+    assert rows[0]["link"] == "https://export.example.com/1"
+    assert rows[0]["created_at"].startswith("2026-01-01T00:00:00")
+
+
+def test_should_stream_csv_within_created_at_range(stored_urls):
+    output = "".join(
+        stream_export(
+            stored_urls,
+            "csv",
+            created_from=datetime(2026, 1, 2, tzinfo=UTC),
+            created_to=datetime(2026, 1, 3, tzinfo=UTC),
+        )
+    )
+
+    rows = list(csv.DictReader(io.StringIO(output)))
+    assert [row["short_link"] for row in rows] == ["export02"]
+
+
+def test_should_write_only_csv_header_when_nothing_matches(stored_urls):
+    output = "".join(
+        stream_export(stored_urls, "csv", created_from=datetime(2027, 1, 1, tzinfo=UTC))
+    )
+
+    assert output == "short_link,link,created_at\n"
+
+
+def test_should_export_to_file_from_command_line(stored_urls, tmp_path, monkeypatch):
+    monkeypatch.setattr("app.export.SessionLocal", stored_urls)
+    output = tmp_path / "links.ndjson"
+
+    assert main(["--created-from", "2026-01-03", "--output", str(output)]) == 0
+
+    assert [json.loads(line)["short_link"] for line in output.open()] == ["export03"]
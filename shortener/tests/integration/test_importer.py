@@ -0,0 +1,186 @@
+import io
+import json
+from unittest.mock import Mock
+
+import pytest
+from sqlalchemy import select
+
+from app.codes import InMemoryIdBlockAllocator, ShortCodeGenerator
+from app.db.objects import Url
+from app.importer import (
+    ImportRecord,
+    InsertRowLoader,
+    RejectedRecord,
+    UrlImporter,
+    infer_format,
+    read_records,
+)
+
+
+class FailingLoader(InsertRowLoader):
+    """Fails the given chunk, as a crash mid-import would"""
+
+    def __init__(self, fail_on_call: int):
+        self.calls = 0
+        self.fail_on_call = fail_on_call
+
+    def load(self, session, rows):
+        self.calls += 1
+        if self.calls == self.fail_on_call:
+            raise RuntimeError("connection lost")
+        return super().load(session, rows)
+
+
+def _stored_links(session_factory):
+    with session_factory() as session:
+        return dict(session.execute(select(Url.short_link, Url.link)).tuples().all())
+
+
+def test_should_import_csv_with_custom_codes_and_report_rejects(in_memory_db, tmp_path):
+    source = tmp_path / "links.csv"
+    source.write_text(
+        "url,short_link\n"
+        "https://example.com/a,legacy01\n"
+        "https://example.com/b,\n"
+        "not a url,\n"
+        "http://localhost/admin,\n"
+        "https://example.com/c,bad code\n"
+        "HTTPS://EXAMPLE.com:443/a,\n"
+    )
+    rejects = tmp_path / "rejects.ndjson"
+
+    stats = UrlImporter(in_memory_db, chunk_size=2).run(
+        source, "csv", rejects_path=rejects
+    )
+
+    assert stats.to_dict() == {"read": 6, "imported": 2, "existing": 1, "rejected": 3}
+    stored = _stored_links(in_memory_db)
+    assert stored["legacy01"] == "https://example.com/a"
+    assert sorted(stored.values()) == ["https://example.com/a", "https://example.com/b"]
+    rejected_lines = [json.loads(line)["line"] for line in rejects.open()]
+    assert rejected_lines == [4, 5, 6]
+
+
+def test_should_import_ndjson(in_memory_db, tmp_path):
+    source = tmp_path / "links.ndjson"
+    source.write_text(
+        '{"url": "https://example.com/a"}\n'
+        "\n"
+        '{"url": "https://example.com/b", "short_link": "legacy02"}\n'
+        "[1, 2]\n"
+    )
+
+    stats = UrlImporter(in_memory_db).run(source, infer_format(source))
+
+    assert stats.imported == 2
+    assert stats.rejected == 1
+    assert _stored_links(in_memory_db)["legacy02"] == "https://example.com/b"
+
+
+def test_should_resume_from_checkpoint_after_failure(in_memory_db, tmp_path):
+    source = tmp_path / "links.csv"
+    source.write_text("url\n" + "".join(f"https://example.com/{i}\n" for i in range(5)))
+    checkpoint = tmp_path / "links.checkpoint.json"
+
+    failing = UrlImporter(in_memory_db, chunk_size=2, loader=FailingLoader(2))
+    with pytest.raises(RuntimeError):
+        failing.run(source, "csv", checkpoint_path=checkpoint)
+
+    saved = json.loads(checkpoint.read_text())
+    assert saved["row"] == 2
+    assert saved["stats"]["imported"] == 2
+
+    stats = UrlImporter(in_memory_db, chunk_size=2).run(
+        source, "csv", checkpoint_path=checkpoint
+    )
+
+    assert stats.to_dict() == {"read": 5, "imported": 5, "existing": 0, "rejected": 0}
+    assert len(_stored_links(in_memory_db)) == 5
+
+
+def test_should_skip_links_already_stored(in_memory_db, tmp_path):
+    source = tmp_path / "links.csv"
+    source.write_text("url\nhttps://example.com/a\nhttps://example.com/a\n")
+    UrlImporter(in_memory_db).run(source, "csv")
+
+    stats = UrlImporter(in_memory_db).run(source, "csv")
+
+    assert stats.imported == 0
+    assert stats.existing == 2
+    assert len(_stored_links(in_memory_db)) == 1
+
+
+def test_should_retry_generated_codes_and_reject_taken_custom_codes(
+    in_memory_db, tmp_path
+):
+    generator = ShortCodeGenerator(InMemoryIdBlockAllocator(), b"secret")
+    taken_code = ShortCodeGenerator(InMemoryIdBlockAllocator(), b"secret").next_code()
+    with in_memory_db() as session:
+        session.add(Url(link="https://example.org/", short_link=taken_code))
+        session.add(Url(link="https://example.org/x", short_link="legacy03"))
+        session.commit()
+    source = tmp_path / "links.csv"
+    source.write_text(
+        "url,short_link\nhttps://example.com/a,\nhttps://example.com/b,legacy03\n"
+    )
+
+    stats = UrlImporter(in_memory_db, code_generator=generator).run(source, "csv")
+
+    assert stats.imported == 1
+    assert stats.rejected == 1
+    assert "https://example.com/a" in _stored_links(in_memory_db).values()
+
+
+def test_should_invalidate_cached_entries_of_imported_codes(in_memory_db, tmp_path):
+    source = tmp_path / "links.csv"
+    source.write_text(
+        "url,short_link\nhttps://example.com/a,legacy04\nhttps://example.com/b,\n"
+    )
+    UrlImporter(in_memory_db).run(source, "csv")
+    source.write_text(
+        "url,short_link\nhttps://example.com/a,\nhttps://example.com/c,legacy05\n"
+    )
+    cache = Mock()
+
+    UrlImporter(in_memory_db, cache=cache).run(source, "csv")
+
+    cache.invalidate_many.assert_called_once_with(["legacy05"])
+
+
+def test_should_read_records_from_row():
+    data = b"url\nhttps://example.com/a\nhttps://example.com/b\n"
+
+    records = list(read_records(io.BytesIO(data), "csv"))
+    first_row = records[0][1]
+    resumed = list(read_records(io.BytesIO(data), "csv", start_row=first_row))
+
+    assert [record for record, _ in resumed] == [
+        ImportRecord(3, "https://example.com/b", None)
+    ]
+
+
+def test_should_read_quoted_csv_fields_spanning_lines():
+    data = (
+        b'url,note\n"https://example.com/a","two\nlines"\n'
+        b"https://example.com/b,\n\xff,\n"
+    )
+
+    records = list(read_records(io.BytesIO(data), "csv"))
+    resumed = list(read_records(io.BytesIO(data), "csv", start_row=1))
+
+    assert [record for record, _ in records[:2]] == [
+        ImportRecord(2, "https://example.com/a", None),
+        ImportRecord(4, "https://example.com/b", None),
+    ]
+    assert records[2][0] == RejectedRecord(5, "Invalid UTF-8", "b'\\xff,'")
+    assert [row for _, row in records] == [1, 2, 3]
+    assert resumed[0] == records[1]
+
+
+def test_should_reject_csv_rows_with_wrong_column_count():
+    data = b"url\nhttps://example.com/a,extra\n"
+
+    [(record, _)] = read_records(io.BytesIO(data), "csv")
+
+    assert isinstance(record, RejectedRecord)
+    assert record.line == 2
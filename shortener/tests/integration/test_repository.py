@@ -1,8 +1,28 @@
-from unittest.mock import patch
+import asyncio
+from datetime import UTC, datetime
+from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 from pydantic import HttpUrl
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.canonical import url_hash
+from app.db.objects import Base, Url
+from app.db.replicas import RecentWrites, ReplicaSet
+from app.metrics import metrics
+from app.pagination import PageCursor, UrlFilter
+from app.repository import (
+    AsyncSqlAlchemyUrlRepository,
+    CachedLink,
+    InMemoryUrlRepository,
+    SqlAlchemyUrlRepository,
+    TinyLfuCache,
+)
 
 
 def test_should_create_url_when_given_valid_data(repository, sample_urls):
@@ -46,6 +66,59 @@ def test_should_return_same_url_when_creating_duplicate(repository, sample_urls)
     assert str(first.link) == str(second.link)
 
 
+def test_should_find_url_by_link_when_exists(repository, sample_urls):
+    url = HttpUrl(sample_urls[1])
+    repository.create("test1234", url)
+
+    result = repository.find_by_url(HttpUrl(sample_urls[1]))
+
+    assert result is not None
+    assert result.short_link == "test1234"
+    assert repository.find_by_url(HttpUrl(sample_urls[2])) is None
+
+
+def test_should_store_hash_of_canonical_link_when_created(
+    repository, db_session, sample_urls
+):
+    repository.create("test1234", HttpUrl(sample_urls[0]))
+
+    db_url = db_session.query(Url).filter(Url.short_link == "test1234").one()
+    assert db_url.url_hash == url_hash(sample_urls[0])
+
+
+def test_should_return_existing_url_when_link_stored_under_another_code(
+    repository, db_session, sample_urls
+):
+    # Simulates a concurrent create that won the race for the same link
+    db_session.add(
+        Url(
+            link=str(HttpUrl(sample_urls[0])),
+            short_link="first123",
+            url_hash=url_hash(sample_urls[0]),
+        )
+    )
+    db_session.commit()
+
+    result = repository.create("second12", HttpUrl(sample_urls[0]))
+
+    assert result.short_link == "first123"
+
+
+def test_should_find_url_in_memory_repository_by_link(sample_urls):
+    repository = InMemoryUrlRepository()
+    repository.create("test1234", HttpUrl(sample_urls[0]))
+
+    try:
+        result = repository.find_by_url(HttpUrl(sample_urls[0]))
+        assert result is not None
+        assert result.short_link == "test1234"
+
+        repository.delete("test1234")
+        assert repository.find_by_url(HttpUrl(sample_urls[0])) is None
+    finally:
+        repository.delete("test1234")
+
+
 def test_should_raise_error_when_short_link_collision_occurs(repository, sample_urls):
     url1 = HttpUrl(sample_urls[0])
     url2 = HttpUrl(sample_urls[1])
@@ -57,6 +130,91 @@ def test_should_raise_error_when_short_link_collision_occurs(repository, sample_
         repository.create(short_link, url2)
 
 
+def test_should_create_url_with_single_statement(repository, db_session, sample_urls):
+    statements = []
+    event.listen(
+        db_session.get_bind(),
+        "before_cursor_execute",
+        lambda *args: statements.append(args[2]),
+    )
+
+    repository.create("test1234", HttpUrl(sample_urls[0]))
+
+    assert len(statements) == 1
+    assert "ON CONFLICT DO NOTHING" in statements[0]
+
+
+def test_should_return_existing_row_when_same_url_created_twice_under_one_code(
+    repository, db_session, sample_urls
+):
+    first = repository.create("test1234", HttpUrl(sample_urls[0]))
+    second = repository.create("test1234", HttpUrl(sample_urls[0]))
+
+    assert second.short_link == first.short_link
+    assert db_session.query(Url).count() == 1
+
+
+def test_should_build_single_upsert_statement_for_postgresql():
+    session = Mock()
+    session.get_bind.return_value.dialect.name = "postgresql"
+    session.execute.return_value.all.return_value = [Mock()]
+    with patch("app.repository.get_settings") as mock_settings:
+        mock_settings.return_value.CACHE_ENABLED = False
+        repository = SqlAlchemyUrlRepository(session)
+
+    repository._insert_or_get("test1234", "https://example.com/", "hash")
+
+    statement = session.execute.call_args.args[0]
+    sql = str(statement.compile(dialect=postgresql.dialect()))
+    assert session.execute.call_count == 1
+    assert sql.startswith("WITH inserted AS")
+    assert "ON CONFLICT DO NOTHING RETURNING" in sql
+    assert "UNION ALL" in sql
+
+
+def test_should_create_many_urls_with_single_insert(
+    repository, db_session, sample_urls
+):
+    statements = []
+    event.listen(
+        db_session.get_bind(),
+        "before_cursor_execute",
+        lambda *args: statements.append(args[2]),
+    )
+    items = [(f"bulk{i:04d}", HttpUrl(url)) for i, url in enumerate(sample_urls)]
+
+    stored = repository.create_many(items)
+
+    assert len(stored) == len(sample_urls)
+    assert len(statements) == 1
+    assert stored[url_hash(str(HttpUrl(sample_urls[0])))].short_link == "bulk0000"
+
+
+def test_should_return_existing_and_skip_taken_codes_in_create_many(
+    repository, sample_urls
+):
+    repository.create("first123", HttpUrl(sample_urls[0]))
+    repository.create("taken123", HttpUrl(sample_urls[1]))
+
+    stored = repository.create_many(
+        [
+            ("other123", HttpUrl(sample_urls[0])),
+            ("taken123", HttpUrl(sample_urls[2])),
+        ]
+    )
+
+    assert stored[url_hash(str(HttpUrl(sample_urls[0])))].short_link == "first123"
+    assert url_hash(str(HttpUrl(sample_urls[2]))) not in stored
+
+
+def test_should_find_many_urls_in_one_lookup(repository, sample_urls):
+    repository.create("test1234", HttpUrl(sample_urls[0]))
+
+    found = repository.find_by_urls([HttpUrl(sample_urls[0]), HttpUrl(sample_urls[1])])
+
+    assert [url_model.short_link for url_model in found.values()] == ["test1234"]
+
+
 def test_should_list_all_urls_when_multiple_exist(repository, sample_urls):
     urls = [HttpUrl(url) for url in sample_urls[:3]]
     short_links = ["test001", "test002", "test003"]
@@ -72,6 +230,219 @@ def test_should_list_all_urls_when_multiple_exist(repository, sample_urls):
         assert str(original_url) in stored_links
 
 
+def test_should_page_through_urls_by_created_at_and_id(
+    repository, db_session, sample_urls
+):
+    same_time = datetime(2026, 1, 1, 12, 0, 0, tzinfo=UTC)
+    for index, link in enumerate(sample_urls):
+        db_session.add(
+            Url(link=link, short_link=f"page{index:04d}", created_at=same_time)
+        )
+    db_session.add(Url(link="https://newest.example.com/", short_link="newest01"))
+    db_session.commit()
+
+    first = repository.list_page(limit=2, include_total=True)
+    assert [url.short_link for url in first.items] == ["newest01", "page0003"]
+    assert first.total_estimate == 5
+    assert first.next_cursor is not None
+
+    second = repository.list_page(limit=2, cursor=PageCursor.decode(first.next_cursor))
+    assert [url.short_link for url in second.items] == ["page0002", "page0001"]
+    assert second.total_estimate is None
+
+    last = repository.list_page(limit=2, cursor=PageCursor.decode(second.next_cursor))
+    assert [url.short_link for url in last.items] == ["page0000"]
+    assert last.next_cursor is None
+
+
+def test_should_page_through_in_memory_repository(sample_urls):
+    repository = InMemoryUrlRepository()
+    short_links = [f"mem{index:05d}" for index in range(3)]
+    for short_link, link in zip(short_links, sample_urls, strict=False):
+        repository.create(short_link, HttpUrl(link))
+
+    try:
+        first = repository.list_page(limit=2)
+        assert [url.short_link for url in first.items] == ["mem00002", "mem00001"]
+
+        rest = repository.list_page(
+            limit=2, cursor=PageCursor.decode(first.next_cursor)
+        )
+        assert [url.short_link for url in rest.items] == ["mem00000"]
+        assert rest.next_cursor is None
+    finally:
+        for short_link in short_links:
+            repository.delete(short_link)
+
+
+def test_should_search_by_host_and_created_at_range(repository, db_session):
+    for day in range(1, 6):
+        db_session.add(
+            Url(
+                link=f"https://Target.example.com/{day}",
+                short_link=f"target0{day}",
+                host="target.example.com",
+                created_at=datetime(2026, 1, day, tzinfo=UTC),
+            )
+        )
+    repository.create("other001", HttpUrl("https://other.example.com/"))
+    db_session.commit()
+    filters = UrlFilter(
+        host="target.example.com",
+        created_from=datetime(2026, 1, 2, tzinfo=UTC),
+        created_to=datetime(2026, 1, 5, tzinfo=UTC),
+    )
+
+    first = repository.search(filters, limit=2)
+    rest = repository.search(
+        filters, limit=2, cursor=PageCursor.decode(first.next_cursor)
+    )
+
+    assert [url.short_link for url in first.items] == ["target04", "target03"]
+    assert [url.short_link for url in rest.items] == ["target02"]
+    assert rest.next_cursor is None
+    assert repository.count(filters) == 3
+    assert repository.count(UrlFilter(host="other.example.com")) == 1
+
+
+def test_should_store_host_when_created(repository, db_session):
+    repository.create("host0001", HttpUrl("https://WWW.Example.com/a"))
+    repository.create_many([("host0002", HttpUrl("https://api.example.com/b"))])
+
+    hosts = dict(db_session.execute(select(Url.short_link, Url.host)).tuples().all())
+
+    assert hosts == {"host0001": "www.example.com", "host0002": "api.example.com"}
+
+
+def test_should_search_in_memory_repository_by_host(sample_urls):
+    repository = InMemoryUrlRepository()
+    repository.create("memsrch1", HttpUrl(sample_urls[1]))
+
+    try:
+        page = repository.search(UrlFilter(host="github.com"), limit=10)
+        assert [url.short_link for url in page.items] == ["memsrch1"]
+        assert repository.count(UrlFilter(host="example.org")) == 0
+    finally:
+        repository.delete("memsrch1")
+
+
+def test_should_search_in_memory_repository_with_naive_bounds(sample_urls):
+    repository = InMemoryUrlRepository()
+    repository.create("memsrch2", HttpUrl(sample_urls[1]))
+
+    try:
+        # Naive bounds, as parsed from ?created_from=... without an offset
+        start = datetime(2000, 1, 1, tzinfo=UTC).replace(tzinfo=None)
+        end = datetime(2100, 1, 1, tzinfo=UTC).replace(tzinfo=None)
+        filters = UrlFilter(created_from=start, created_to=end)
+        page = repository.search(filters, limit=10)
+        assert "memsrch2" in [url.short_link for url in page.items]
+        assert repository.count(UrlFilter(created_to=start)) == 0
+    finally:
+        repository.delete("memsrch2")
+
+
+@pytest.fixture
+def replica_db():
+    """A second database standing in for a read replica"""
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+def _replica_repository(db_session, *factories):
+    with patch("app.repository.get_settings") as mock_settings:
+        mock_settings.return_value.CACHE_ENABLED = False
+        return SqlAlchemyUrlRepository(
+            db_session, replicas=ReplicaSet(list(factories), 30.0, RecentWrites(5.0))
+        )
+
+
+def test_should_read_from_replica_and_fall_back_on_miss(db_session, replica_db):
+    with replica_db() as replica_session:
+        replica_session.add(
+            Url(link="https://replica.example.com/", short_link="replica1")
+        )
+        replica_session.commit()
+    repository = _replica_repository(db_session, replica_db)
+    db_session.add(Url(link="https://primary.example.com/", short_link="primary1"))
+    db_session.commit()
+
+    assert str(repository.get("replica1").link) == "https://replica.example.com/"
+    assert str(repository.get("primary1").link) == "https://primary.example.com/"
+
+
+def test_should_read_own_recent_writes_from_primary(db_session, replica_db):
+    with replica_db() as replica_session:
+        replica_session.add(
+            Url(link="https://stale.example.com/", short_link="write123")
+        )
+        replica_session.commit()
+    repository = _replica_repository(db_session, replica_db)
+
+    repository.create("write123", HttpUrl("https://fresh.example.com/"))
+
+    assert str(repository.get("write123").link) == "https://fresh.example.com/"
+
+
+def test_should_note_only_inserted_codes_as_recent_writes(
+    db_session, replica_db, sample_urls
+):
+    repository = _replica_repository(db_session, replica_db)
+    repository.create("first123", HttpUrl(sample_urls[0]))
+    repository.create("taken123", HttpUrl(sample_urls[1]))
+
+    with patch.object(repository._replicas, "note_write") as note_write:
+        repository.create_many(
+            [
+                ("other123", HttpUrl(sample_urls[0])),
+                ("taken123", HttpUrl(sample_urls[2])),
+                ("fresh123", HttpUrl(sample_urls[3])),
+            ]
+        )
+
+    assert [args.args for args in note_write.call_args_list] == [("fresh123",)]
+
+
+def test_should_mark_failing_replica_down_and_use_primary(db_session, tmp_path):
+    broken = sessionmaker(
+        bind=create_engine(f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+    )
+    repository = _replica_repository(db_session, broken)
+    db_session.add(Url(link="https://primary.example.com/", short_link="primary1"))
+    db_session.commit()
+
+    assert repository.get("primary1") is not None
+    assert repository._replicas.choose() is None
+
+
+@pytest.mark.asyncio
+async def test_should_fall_back_to_primary_on_async_replica_miss(
+    async_session_factory,
+):
+    replica_engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with replica_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with async_session_factory() as session:
+        session.add(Url(link="https://primary.example.com/", short_link="primary1"))
+        await session.commit()
+    with patch("app.repository.get_settings") as mock_settings:
+        mock_settings.return_value.CACHE_ENABLED = False
+        repository = AsyncSqlAlchemyUrlRepository(
+            async_session_factory,
+            replicas=ReplicaSet(
+                [async_sessionmaker(bind=replica_engine)], 30.0, RecentWrites(5.0)
+            ),
+        )
+
+    try:
+        assert await repository.get_link("primary1") == "https://primary.example.com/"
+        assert await repository.get_link("missing1") is None
+    finally:
+        await replica_engine.dispose()
+
+
 def test_should_delete_url_when_exists(repository, sample_urls):
     url = HttpUrl(sample_urls[0])
     short_link = "test1234"
@@ -144,3 +515,208 @@ def test_should_handle_multiple_concurrent_operations(repository, sample_urls):
     for i in range(1, len(short_links), 2):
         result = repository.get(short_links[i])
         assert result is not None
+
+
+@pytest.mark.asyncio
+async def test_should_retrieve_url_asynchronously_when_exists(
+    async_repository, async_session_factory, sample_urls
+):
+    async with async_session_factory() as session:
+        session.add(Url(link=sample_urls[0], short_link="test1234"))
+        await session.commit()
+
+    result = await async_repository.get("test1234")
+
+    assert result is not None
+    assert result.short_link == "test1234"
+    assert str(result.link).startswith(sample_urls[0])
+
+
+@pytest.mark.asyncio
+async def test_should_return_none_asynchronously_when_url_missing(async_repository):
+    result = await async_repository.get("missing1")
+
+    assert result is None
+
+
+@pytest.mark.asyncio
+async def test_should_return_stored_link_on_fast_path(
+    async_repository, async_session_factory
+):
+    async with async_session_factory() as session:
+        session.add(Url(link="https://example.com/path?q=1", short_link="test1234"))
+        await session.commit()
+
+    assert await async_repository.get_link("test1234") == "https://example.com/path?q=1"
+    assert await async_repository.get_link("missing1") is None
+
+
+@pytest.mark.asyncio
+async def test_should_query_database_once_for_concurrent_async_misses(
+    async_repository, async_session_factory, sample_urls
+):
+    async with async_session_factory() as session:
+        session.add(Url(link=sample_urls[0], short_link="test1234"))
+        await session.commit()
+
+    with patch.object(
+        async_repository, "_get_impl", wraps=async_repository._get_impl
+    ) as get_impl:
+        results = await asyncio.gather(
+            *(async_repository.get("test1234") for _ in range(20))
+        )
+
+    assert get_impl.call_count == 1
+    assert all(result.short_link == "test1234" for result in results)
+
+
+@pytest.mark.asyncio
+async def test_should_refresh_cached_url_in_background_when_due(
+    async_session_factory, sample_urls
+):
+    async with async_session_factory() as session:
+        session.add(Url(link=sample_urls[0], short_link="test1234"))
+        await session.commit()
+    cached = CachedLink(sample_urls[0])
+    cache = AsyncMock()
+    cache.locks_enabled = False
+    cache.get_entry.return_value = (cached, True)
+    with patch("app.repository.get_settings") as mock_settings:
+        mock_settings.return_value.CACHE_ENABLED = False
+        repository = AsyncSqlAlchemyUrlRepository(async_session_factory, cache=cache)
+
+    result = await repository.get("test1234")
+    await asyncio.gather(*AsyncSqlAlchemyUrlRepository._refreshes.values())
+
+    assert result is not None
+    assert str(result.link).startswith(sample_urls[0])
+    cache.put.assert_awaited_once()
+    assert cache.put.await_args.args[0] == "test1234"
+
+
+def test_should_serve_url_from_local_cache_without_database(db_session, sample_urls):
+    with patch("app.repository.get_settings") as mock_settings:
+        mock_settings.return_value.CACHE_ENABLED = False
+        repository = SqlAlchemyUrlRepository(
+            db_session, local_cache=TinyLfuCache(max_size=100, ttl_seconds=60)
+        )
+    repository.create("test1234", HttpUrl(sample_urls[0]))
+
+    db_session.query(Url).delete()
+    db_session.commit()
+    result = repository.get("test1234")
+
+    assert result is not None
+    assert result.short_link == "test1234"
+
+
+def test_should_rerun_write_when_commit_fails_transiently(
+    db_session, in_memory_db, sample_urls
+):
+    with patch("app.repository.get_settings") as mock_settings:
+        mock_settings.return_value.CACHE_ENABLED = False
+        repository = SqlAlchemyUrlRepository(db_session)
+    commit = db_session.commit
+    attempts = []
+
+    def flaky_commit():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise OperationalError("COMMIT", {}, Exception("connection reset"))
+        commit()
+
+    with (
+        patch.object(db_session, "commit", side_effect=flaky_commit),
+        patch("app.retry.time.sleep"),
+    ):
+        repository.create("test1234", HttpUrl(sample_urls[0]))
+
+    assert len(attempts) == 2
+
+    with in_memory_db() as session:
+        assert session.scalar(select(Url.short_link)) == "test1234"
+
+
+def test_should_open_session_lazily_and_release_it_after_each_operation(
+    in_memory_db, sample_urls
+):
+    with patch("app.repository.get_settings") as mock_settings:
+        mock_settings.return_value.CACHE_ENABLED = False
+        repository = SqlAlchemyUrlRepository(
+            session_factory=in_memory_db,
+            local_cache=TinyLfuCache(max_size=100, ttl_seconds=60),
+        )
+    assert repository._session is None
+
+    repository.create("test1234", HttpUrl(sample_urls[0]))
+    assert repository._session is None
+
+    with in_memory_db() as session:
+        assert session.scalar(select(Url.short_link)) == "test1234"
+
+
+def test_should_record_whether_a_request_needed_a_connection(in_memory_db, sample_urls):
+    local_cache = TinyLfuCache(max_size=100, ttl_seconds=60)
+    with patch("app.repository.get_settings") as mock_settings:
+        mock_settings.return_value.CACHE_ENABLED = False
+        writer = SqlAlchemyUrlRepository(
+            session_factory=in_memory_db, local_cache=local_cache
+        )
+        reader = SqlAlchemyUrlRepository(
+            session_factory=in_memory_db, local_cache=local_cache
+        )
+    requests = metrics.get("db.requests")
+    with_connection = metrics.get("db.requests_with_connection")
+
+    writer.create("test1234", HttpUrl(sample_urls[0]))
+    writer.close()
+    assert reader.get("test1234") is not None
+    reader.close()
+
+    assert metrics.get("db.requests") == requests + 2
+    assert metrics.get("db.requests_with_connection") == with_connection + 1
+    assert reader._session is None
+
+
+def test_should_require_a_session_or_session_factory():
+    with pytest.raises(ValueError):
+        SqlAlchemyUrlRepository()
+
+
+def test_should_drop_local_cache_entry_when_deleted(db_session, sample_urls):
+    with patch("app.repository.get_settings") as mock_settings:
+        mock_settings.return_value.CACHE_ENABLED = False
+        repository = SqlAlchemyUrlRepository(
+            db_session, local_cache=TinyLfuCache(max_size=100, ttl_seconds=60)
+        )
+    repository.create("test1234", HttpUrl(sample_urls[0]))
+
+    repository.delete("test1234")
+
+    assert repository.get("test1234") is None
+
+
+def test_should_cache_missing_code_until_it_is_created(db_session, sample_urls):
+    with patch("app.repository.get_settings") as mock_settings:
+        mock_settings.return_value.CACHE_ENABLED = False
+        repository = SqlAlchemyUrlRepository(
+            db_session,
+            local_cache=TinyLfuCache(
+                max_size=100, ttl_seconds=60, negative_ttl_seconds=30
+            ),
+        )
+    assert repository.get("test1234") is None
+
+    # A row appearing behind the repository's back stays hidden by the
+    # negative entry, while creating through the repository replaces it
+    db_session.add(Url(link=sample_urls[1], short_link="test1234"))
+    db_session.commit()
+    assert repository.get("test1234") is None
+    db_session.query(Url).delete()
+    db_session.commit()
+
+    repository.create("test1234", HttpUrl(sample_urls[0]))
+    result = repository.get("test1234")
+
+    assert result is not None
+    assert str(result.link).startswith(sample_urls[0])
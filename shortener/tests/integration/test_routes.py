@@ -6,8 +6,10 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.testclient import TestClient
 
 from app.exceptions import catch_all_exception_handler, internal_server_error_handler
+from app.metrics import metrics
 from app.routes.health import router as health_router
 from app.routes.urls import router as urls_router
+from main import lifespan
 
 
 def create_test_app() -> FastAPI:
@@ -16,6 +18,7 @@ def create_test_app() -> FastAPI:
         title="URL Shortener Service - Test",
         description="Test API for shortening URLs",
         version="0.1.0",
+        lifespan=lifespan,
     )
 
     # Register routers
@@ -45,7 +48,10 @@ def create_test_app() -> FastAPI:
 
 @pytest.fixture
 def client():
-    return TestClient(create_test_app())
+    # Entering the client runs the lifespan, so the async engine and Redis
+    # pools are bound to a single event loop and closed after each test
+    with TestClient(create_test_app()) as test_client:
+        yield test_client
 
 
 def test_should_create_short_url_when_valid_url_posted(client):
@@ -68,6 +74,42 @@ def test_should_reject_invalid_url_when_posted(client):
     assert response.status_code == 422
 
 
+def test_should_shorten_urls_in_bulk_in_input_order(client):
+    urls = [
+        "https://bulk.example.com/a",
+        "not-a-valid-url",
+        "https://bulk.example.com/b",
+        "https://bulk.example.com/a",
+    ]
+
+    response = client.post("/api/v1/batch", json={"urls": urls})
+
+    assert response.status_code == 201
+    results = response.json()["data"]
+    assert [result["url"] for result in results] == urls
+    assert [result["success"] for result in results] == [True, False, True, True]
+    assert results[1]["error"]
+    assert results[0]["data"]["short_link"] == results[3]["data"]["short_link"]
+    assert results[0]["data"]["short_link"] != results[2]["data"]["short_link"]
+
+
+def test_should_reuse_existing_short_link_in_bulk(client):
+    single = client.post("/api/v1/", json={"url": "https://bulk.example.com/c"})
+
+    response = client.post(
+        "/api/v1/batch", json={"urls": ["https://bulk.example.com/c"]}
+    )
+
+    short_link = response.json()["data"][0]["data"]["short_link"]
+    assert short_link == single.json()["data"]["short_link"]
+
+
+def test_should_reject_empty_bulk_request(client):
+    response = client.post("/api/v1/batch", json={"urls": []})
+
+    assert response.status_code == 422
+
+
 def test_should_redirect_when_valid_short_code_requested(client):
     create_response = client.post("/api/v1/", json={"url": "https://www.example.com"})
     short_link = create_response.json()["data"]["short_link"]
@@ -107,6 +149,70 @@ def test_should_list_all_urls_when_requested(client):
     assert len(data["data"]) >= 2
 
 
+def test_should_page_urls_with_cursor_when_limit_given(client):
+    for index in range(3):
+        client.post("/api/v1/", json={"url": f"https://page.example.com/{index}"})
+
+    first = client.get("/api/v1/", params={"limit": 2, "include_total": True})
+
+    assert first.status_code == 200
+    body = first.json()
+    assert len(body["data"]) == 2
+    assert body["total_estimate"] >= 3
+    assert body["next_cursor"]
+
+    second = client.get("/api/v1/", params={"limit": 2, "cursor": body["next_cursor"]})
+    assert second.status_code == 200
+    seen = {url["short_link"] for url in body["data"]}
+    assert not seen & {url["short_link"] for url in second.json()["data"]}
+
+
+def test_should_reject_invalid_cursor_or_limit(client):
+    assert client.get("/api/v1/", params={"cursor": "not-a-cursor"}).status_code == 400
+    assert client.get("/api/v1/", params={"limit": 0}).status_code == 422
+
+
+def test_should_stream_export_as_csv(client):
+    created = client.post("/api/v1/", json={"url": "https://export.example.com/"})
+    short_link = created.json()["data"]["short_link"]
+
+    response = client.get("/api/v1/export", params={"format": "csv"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    lines = response.text.splitlines()
+    assert lines[0] == "short_link,link,created_at"
+    assert any(line.startswith(f"{short_link},") for line in lines[1:])
+
+
+def test_should_search_urls_by_domain(client):
+    created = client.post("/api/v1/", json={"url": "https://search.example.net/a"})
+    short_link = created.json()["data"]["short_link"]
+
+    page = client.get("/api/v1/search", params={"domain": "Search.Example.NET"})
+    count = client.get(
+        "/api/v1/search", params={"domain": "search.example.net", "count_only": True}
+    )
+
+    assert page.status_code == 200
+    assert short_link in {url["short_link"] for url in page.json()["data"]}
+    assert count.status_code == 200
+    assert count.json()["count"] >= 1
+    assert "data" not in count.json()
+
+
+def test_should_search_urls_by_unicode_domain(client):
+    created = client.post("/api/v1/", json={"url": "https://bücher.example/a"})
+    short_link = created.json()["data"]["short_link"]
+
+    page = client.get("/api/v1/search", params={"domain": "Bücher.example."})
+    invalid = client.get("/api/v1/search", params={"domain": "bü cher.example"})
+
+    assert page.status_code == 200
+    assert [url["short_link"] for url in page.json()["data"]] == [short_link]
+    assert invalid.status_code == 400
+
+
 def test_should_delete_url_when_valid_short_code_provided(client):
     create_response = client.post("/api/v1/", json={"url": "https://www.example.com"})
     short_link = create_response.json()["data"]["short_link"]
@@ -164,3 +270,22 @@ def test_should_handle_multiple_identical_urls(client):
     # Both responses should return the same short link for the same URL
     assert data1["data"]["short_link"] == data2["data"]["short_link"]
     assert str(data1["data"]["link"]) == str(data2["data"]["link"])
+
+
+def test_should_unregister_cache_collectors_on_shutdown():
+    with TestClient(create_test_app()) as test_client:
+        test_client.get("/api/v1/missing1")
+        assert "local_cache" in metrics.snapshot()
+
+    snapshot = metrics.snapshot()
+    assert "local_cache" not in snapshot
+    assert "redis_pool" not in snapshot
+
+
+def test_should_return_metrics_when_requested(client):
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["service"] == "shortener"
+    assert "counters" in data
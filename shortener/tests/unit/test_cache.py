@@ -0,0 +1,386 @@
+import asyncio
+import fnmatch
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+from pydantic import HttpUrl
+
+from app.metrics import metrics
+from app.models import UrlModel
+from app.repository import (
+    NEGATIVE_BUDGET_KEY,
+    NOT_FOUND,
+    AsyncSingleFlight,
+    CachedLink,
+    InstrumentedConnectionPool,
+    RedisCache,
+    SingleFlight,
+    SqlAlchemyUrlRepository,
+    TinyLfuCache,
+    _decode_cached_entry,
+    _decode_cached_url,
+    _encode_cached_url,
+    _lock_key,
+    _should_refresh_early,
+)
+
+
+def _cached_link(short_link: str) -> CachedLink:
+    return CachedLink(f"https://example.com/{short_link}")
+
+
+@pytest.fixture
+def shared_cache():
+    RedisCache.close_instance()
+    cache = RedisCache.get_instance()
+    yield cache
+    RedisCache.close_instance()
+
+
+def test_should_share_single_cache_instance_across_repositories(
+    shared_cache, db_session
+):
+    with patch("app.repository.get_settings") as mock_settings:
+        mock_settings.return_value.CACHE_ENABLED = True
+        mock_settings.return_value.LOCAL_CACHE_ENABLED = False
+        first = SqlAlchemyUrlRepository(db_session)
+        second = SqlAlchemyUrlRepository(db_session)
+
+    assert first._cache is shared_cache
+    assert second._cache is shared_cache
+
+
+def test_should_create_new_instance_after_close(shared_cache):
+    RedisCache.close_instance()
+
+    assert RedisCache.get_instance() is not shared_cache
+
+
+def test_should_report_pool_stats_when_idle(shared_cache):
+    stats = shared_cache.pool_stats()
+
+    assert stats["in_use"] == 0
+    assert stats["idle"] == 0
+    assert stats["waits"] == 0
+    assert stats["max_connections"] > 0
+
+
+def test_should_expose_pool_stats_through_metrics_registry(shared_cache):
+    snapshot = metrics.snapshot()
+
+    assert "redis_pool" in snapshot
+    assert snapshot["redis_pool"]["max_connections"] > 0
+
+
+def test_should_remove_pool_stats_from_metrics_when_closed(shared_cache):
+    RedisCache.close_instance()
+
+    assert "redis_pool" not in metrics.snapshot()
+
+
+def test_should_keep_locks_and_budget_outside_cache_keyspace():
+    assert not fnmatch.fnmatchcase(_lock_key("abc12345"), "url:*")
+    assert not fnmatch.fnmatchcase(NEGATIVE_BUDGET_KEY, "url:*")
+
+
+def test_should_scan_cache_keys_when_clearing_and_sizing(shared_cache):
+    client = Mock()
+    client.scan_iter.side_effect = lambda **_: iter([b"url:a", b"url:b"])
+
+    with patch.object(shared_cache, "_client", client):
+        assert shared_cache.size() == 2
+        shared_cache.clear()
+
+    client.keys.assert_not_called()
+    client.delete.assert_called_once_with(b"url:a", b"url:b")
+    assert client.scan_iter.call_args.kwargs["match"] == "url:*"
+
+
+def test_should_count_waits_when_pool_exhausted():
+    pool = InstrumentedConnectionPool(max_connections=1, timeout=0.01)
+    pool.pool.get_nowait()  # simulate the only connection being checked out
+
+    with pytest.raises(Exception):  # noqa: B017
+        pool.get_connection("GET")
+
+    stats = pool.stats()
+    assert stats["in_use"] == 1
+    assert stats["waits"] == 1
+
+
+def test_should_return_cached_value_from_local_cache():
+    cache = TinyLfuCache(max_size=100, ttl_seconds=60)
+    cache.put("abc12345", _cached_link("abc12345"))
+
+    result = cache.get("abc12345")
+
+    assert result is not None
+    assert result.link == "https://example.com/abc12345"
+
+
+def test_should_miss_local_cache_when_entry_expired():
+    cache = TinyLfuCache(max_size=100, ttl_seconds=0)
+    cache.put("abc12345", _cached_link("abc12345"))
+
+    assert cache.get("abc12345") is None
+
+
+def test_should_remove_entry_from_local_cache_when_invalidated():
+    cache = TinyLfuCache(max_size=100, ttl_seconds=60)
+    cache.put("abc12345", _cached_link("abc12345"))
+
+    cache.invalidate("abc12345")
+
+    assert cache.get("abc12345") is None
+
+
+def test_should_never_exceed_local_cache_max_size():
+    cache = TinyLfuCache(max_size=50, ttl_seconds=60)
+
+    for i in range(500):
+        cache.put(f"key{i:05d}", _cached_link(f"key{i:05d}"))
+
+    assert cache.size() <= 50
+
+
+def test_should_keep_popular_entries_when_scanned_with_one_off_keys():
+    cache = TinyLfuCache(max_size=100, ttl_seconds=60)
+    hot_keys = [f"hot{i:05d}" for i in range(20)]
+    for key in hot_keys:
+        cache.put(key, _cached_link(key))
+    for _ in range(10):
+        for key in hot_keys:
+            cache.get(key)
+
+    for i in range(2000):
+        key = f"scan{i:04d}"
+        if cache.get(key) is None:
+            cache.put(key, _cached_link(key))
+        # popular links keep receiving traffic while the scan runs
+        cache.get(hot_keys[i % len(hot_keys)])
+
+    retained = [key for key in hot_keys if cache.get(key) is not None]
+    assert len(retained) == len(hot_keys)
+
+
+def test_should_count_local_cache_hits_and_misses():
+    cache = TinyLfuCache(max_size=100, ttl_seconds=60)
+    cache.put("abc12345", _cached_link("abc12345"))
+    hits = metrics.get("cache.local.hits")
+    misses = metrics.get("cache.local.misses")
+
+    cache.get("abc12345")
+    cache.get("missing1")
+
+    assert metrics.get("cache.local.hits") == hits + 1
+    assert metrics.get("cache.local.misses") == misses + 1
+
+
+def test_should_return_negative_marker_when_code_cached_as_missing():
+    cache = TinyLfuCache(max_size=100, ttl_seconds=60, negative_ttl_seconds=5)
+
+    cache.put_negative("missing1")
+
+    assert cache.get("missing1") is NOT_FOUND
+
+
+def test_should_skip_negative_entries_when_disabled():
+    cache = TinyLfuCache(max_size=100, ttl_seconds=60, negative_ttl_seconds=0)
+
+    cache.put_negative("missing1")
+
+    assert cache.get("missing1") is None
+
+
+def test_should_replace_negative_entry_when_url_cached():
+    cache = TinyLfuCache(max_size=100, ttl_seconds=60, negative_ttl_seconds=5)
+    cache.put_negative("abc12345")
+
+    cache.put("abc12345", _cached_link("abc12345"))
+
+    result = cache.get("abc12345")
+    assert result is not NOT_FOUND
+    assert result is not None
+
+
+def test_should_round_trip_refresh_metadata_through_encoding():
+    raw = _encode_cached_url(_cached_link("abc12345"), delta=0.05, ttl_seconds=300)
+
+    value, delta, expiry = _decode_cached_entry(raw)
+
+    assert value == CachedLink("https://example.com/abc12345")
+    assert delta == 0.05
+    assert expiry == pytest.approx(time.time() + 300, abs=5)
+
+
+def test_should_decode_json_entry_written_by_older_release():
+    raw = UrlModel(
+        link=HttpUrl("https://example.com/abc12345"),
+        short_link="abc12345",
+        created_at=None,
+    ).model_dump_json()
+
+    value, delta, _ = _decode_cached_entry(raw)
+
+    assert value == CachedLink("https://example.com/abc12345")
+    assert delta == 0.0
+
+
+def test_should_keep_link_containing_spaces_and_created_at_intact():
+    link = CachedLink("https://example.com/a b?q=1 2", "2025-01-01T00:00:00")
+
+    value, _, _ = _decode_cached_entry(_encode_cached_url(link, 0.0, 10))
+
+    assert value == link
+
+
+def test_should_build_url_model_from_cached_link():
+    model = CachedLink("https://example.com/", "2025-01-01T00:00:00").to_model(
+        "abc12345"
+    )
+
+    assert model.short_link == "abc12345"
+    assert str(model.link) == "https://example.com/"
+    assert model.created_at is not None
+
+
+def test_should_refresh_early_once_entry_expired():
+    assert _should_refresh_early(delta=0.01, expiry=time.time() - 1, beta=1.0)
+
+
+def test_should_not_refresh_early_when_expiry_far_away():
+    assert not _should_refresh_early(delta=0.01, expiry=time.time() + 300, beta=1.0)
+
+
+def test_should_not_refresh_early_without_recompute_time():
+    assert not _should_refresh_early(delta=0.0, expiry=time.time() - 1, beta=1.0)
+
+
+def test_should_refresh_early_more_often_as_expiry_nears():
+    def refresh_rate(seconds_left: float) -> int:
+        expiry = time.time() + seconds_left
+        return sum(_should_refresh_early(1.0, expiry, 1.0) for _ in range(1000))
+
+    assert refresh_rate(0.1) > refresh_rate(2.0) > refresh_rate(10.0)
+
+
+def test_should_store_raw_link_at_end_of_encoded_entry():
+    raw = _encode_cached_url(_cached_link("abc12345"), delta=0.0, ttl_seconds=10)
+
+    assert raw.endswith(" - https://example.com/abc12345")
+
+
+def test_should_decode_empty_redis_value_as_negative_entry():
+    assert _decode_cached_url("") is NOT_FOUND
+    assert _decode_cached_url(b"") is NOT_FOUND
+
+
+def test_should_run_one_load_for_concurrent_callers_of_same_key():
+    single_flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+    collapsed = metrics.get("singleflight.collapsed")
+
+    def loader():
+        calls.append(1)
+        release.wait(5)
+        return "loaded"
+
+    results = []
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(single_flight.do("abc12345", loader))
+        )
+        for _ in range(10)
+    ]
+    for thread in threads:
+        thread.start()
+    # hold the load open until every other caller is waiting on it
+    while metrics.get("singleflight.collapsed") < collapsed + 9:
+        threading.Event().wait(0.01)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert results == ["loaded"] * 10
+
+
+def test_should_share_loader_error_with_waiting_callers():
+    single_flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def loader():
+        started.set()
+        release.wait(5)
+        raise ValueError("database unavailable")
+
+    errors = []
+
+    def call():
+        try:
+            single_flight.do("abc12345", loader)
+        except ValueError as e:
+            errors.append(e)
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait(5)
+    waiter = threading.Thread(target=call)
+    waiter.start()
+    threading.Event().wait(0.05)
+    release.set()
+    leader.join(5)
+    waiter.join(5)
+
+    assert len(errors) == 2
+
+
+def test_should_load_again_after_previous_flight_completed():
+    single_flight = SingleFlight()
+    calls = []
+
+    single_flight.do("abc12345", lambda: calls.append(1))
+    single_flight.do("abc12345", lambda: calls.append(1))
+
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_should_run_one_async_load_for_concurrent_callers_of_same_key():
+    single_flight = AsyncSingleFlight()
+    calls = []
+    collapsed = metrics.get("singleflight.collapsed")
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "loaded"
+
+    results = await asyncio.gather(
+        *(single_flight.do("abc12345", loader) for _ in range(10))
+    )
+
+    assert len(calls) == 1
+    assert results == ["loaded"] * 10
+    assert metrics.get("singleflight.collapsed") == collapsed + 9
+
+
+@pytest.mark.asyncio
+async def test_should_finish_async_load_for_waiters_when_leader_cancelled():
+    single_flight = AsyncSingleFlight()
+
+    async def loader():
+        await asyncio.sleep(0.01)
+        return "loaded"
+
+    leader = asyncio.ensure_future(single_flight.do("abc12345", loader))
+    await asyncio.sleep(0)
+    waiter = asyncio.ensure_future(single_flight.do("abc12345", loader))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await waiter == "loaded"
@@ -0,0 +1,60 @@
+import pytest
+
+from app.canonical import canonicalize_url, link_host, normalize_host, url_hash
+
+
+def test_should_lowercase_scheme_and_host():
+    assert canonicalize_url("HTTPS://Example.COM/Path") == "https://example.com/Path"
+
+
+def test_should_drop_default_port():
+    assert canonicalize_url("https://example.com:443/a") == "https://example.com/a"
+    assert canonicalize_url("http://example.com:80/a") == "http://example.com/a"
+
+
+def test_should_keep_non_default_port():
+    assert (
+        canonicalize_url("https://example.com:8443/a") == "https://example.com:8443/a"
+    )
+
+
+def test_should_add_root_path_when_empty():
+    assert canonicalize_url("https://example.com") == "https://example.com/"
+
+
+def test_should_uppercase_percent_escapes():
+    assert canonicalize_url("https://example.com/a%2fb?q=%3d") == (
+        "https://example.com/a%2Fb?q=%3D"
+    )
+
+
+def test_should_keep_query_order_and_fragment():
+    url = "https://example.com/?b=2&a=1#Section"
+
+    assert canonicalize_url(url) == url
+
+
+def test_should_hash_equivalent_urls_to_same_value():
+    assert url_hash("HTTPS://Example.com:443") == url_hash("https://example.com/")
+    assert len(url_hash("https://example.com/")) == 64
+
+
+def test_should_hash_different_urls_to_different_values():
+    assert url_hash("https://example.com/a") != url_hash("https://example.com/b")
+
+
+def test_should_extract_lowercased_host_without_port_or_userinfo():
+    assert link_host("https://user:pw@Docs.Example.COM.:8443/a") == "docs.example.com"
+    assert link_host("not a url") is None
+
+
+def test_should_normalize_domains_like_stored_hosts():
+    assert normalize_host(" Docs.Example.COM. ") == "docs.example.com"
+    # UTS #46 keeps the sharp s, where Python's idna codec maps it to "ss"
+    assert normalize_host("Straße.example") == "xn--strae-oqa.example"
+    assert normalize_host("bücher.example") == link_host("https://bücher.example/")
+
+
+def test_should_reject_invalid_domain():
+    with pytest.raises(ValueError):
+        normalize_host("bü cher.example")
@@ -0,0 +1,100 @@
+import threading
+from unittest.mock import Mock, patch
+
+import grpc
+import pytest
+
+from app.grpc.buffer import ClickBuffer
+from app.grpc.client import GrpcAnalyticsClient
+from app.metrics import metrics
+
+
+class UnavailableError(grpc.RpcError):
+    def code(self):
+        return grpc.StatusCode.UNAVAILABLE
+
+    def details(self):
+        return "connection refused"
+
+
+class ResourceExhaustedError(grpc.RpcError):
+    def code(self):
+        return grpc.StatusCode.RESOURCE_EXHAUSTED
+
+    def details(self):
+        return "Concurrent RPC limit exceeded!"
+
+
+def test_should_flush_full_batches_from_background_thread():
+    sent: list[list[int]] = []
+    flushed = threading.Event()
+
+    def send(batch):
+        sent.append(batch)
+        flushed.set()
+        return True
+
+    buffer = ClickBuffer(send, batch_size=3, flush_interval=60, max_size=100)
+    for click in range(3):
+        buffer.add(click)
+
+    assert flushed.wait(5)
+    buffer.close()
+    assert sent == [[0, 1, 2]]
+
+
+def test_should_send_remaining_clicks_on_close():
+    send = Mock(return_value=True)
+    buffer = ClickBuffer(send, batch_size=2, flush_interval=60, max_size=100)
+    buffer.add("a")
+
+    buffer.close()
+
+    send.assert_called_once_with(["a"])
+    assert buffer.add("b") is False
+
+
+def test_should_keep_batch_when_send_fails_and_drop_oldest_past_max_size():
+    buffer = ClickBuffer(
+        Mock(return_value=False), batch_size=10, flush_interval=60, max_size=3
+    )
+    dropped = metrics.get("analytics.clicks_dropped")
+    with patch.object(buffer, "_start"):
+        for click in range(5):
+            buffer.add(click)
+
+    assert buffer.flush() is False
+    assert list(buffer._pending) == [2, 3, 4]
+    assert metrics.get("analytics.clicks_dropped") == dropped + 2
+
+
+def test_should_send_buffered_clicks_with_client_timestamps():
+    client = GrpcAnalyticsClient("localhost:1")
+    client._stub = Mock()
+    client._stub.RecordClicks.return_value.recorded = 2
+
+    with patch.object(client._buffer, "_start"):
+        assert client.record_click("abcd1234", ip="10.0.0.1")
+        assert client.record_click("abcd1234", ip="10.0.0.2")
+    client.flush()
+
+    [request] = client._stub.RecordClicks.call_args.args
+    assert [click.click.ip for click in request.clicks] == ["10.0.0.1", "10.0.0.2"]
+    assert all(click.click.HasField("created_at") for click in request.clicks)
+    client.close()
+
+
+@pytest.mark.parametrize("error", [UnavailableError, ResourceExhaustedError])
+def test_should_keep_clicks_while_analytics_is_unavailable(error):
+    client = GrpcAnalyticsClient("localhost:1")
+    client._stub = Mock()
+    client._stub.RecordClicks.side_effect = error()
+
+    with patch.object(client._buffer, "_start"):
+        client.record_click("abcd1234", ip="10.0.0.1")
+    client.flush()
+
+    assert len(client._buffer) == 1
+    client._buffer._stopped.set()
+    client._buffer._pending.clear()
+    client.close()
@@ -0,0 +1,93 @@
+from unittest.mock import Mock
+
+import pytest
+
+from app.codes import (
+    CODE_BITS,
+    DatabaseIdBlockAllocator,
+    FeistelPermutation,
+    InMemoryIdBlockAllocator,
+    ShortCodeGenerator,
+    encode_code,
+)
+from app.constants import SHORT_URL_LENGTH
+
+
+def test_should_permute_every_value_to_a_distinct_value():
+    permutation = FeistelPermutation(b"secret", bits=12)
+
+    outputs = {permutation.permute(value) for value in range(1 << 12)}
+
+    assert outputs == set(range(1 << 12))
+
+
+def test_should_invert_permutation():
+    permutation = FeistelPermutation(b"secret")
+
+    for value in (0, 1, 999, (1 << CODE_BITS) - 1):
+        assert permutation.invert(permutation.permute(value)) == value
+
+
+def test_should_permute_differently_with_different_keys():
+    first = FeistelPermutation(b"first")
+    second = FeistelPermutation(b"second")
+
+    assert [first.permute(v) for v in range(10)] != [
+        second.permute(v) for v in range(10)
+    ]
+
+
+def test_should_encode_code_as_fixed_width_base64url():
+    for value in (0, 12345, (1 << CODE_BITS) - 1):
+        code = encode_code(value)
+        assert len(code) == SHORT_URL_LENGTH
+        assert "=" not in code and "+" not in code and "/" not in code
+
+
+def test_should_generate_unique_codes_across_blocks():
+    generator = ShortCodeGenerator(InMemoryIdBlockAllocator(), b"secret", block_size=10)
+
+    codes = [generator.next_code() for _ in range(95)]
+
+    assert len(set(codes)) == 95
+    assert all(len(code) == SHORT_URL_LENGTH for code in codes)
+
+
+def test_should_not_reuse_ids_between_generators_sharing_allocator():
+    allocator = InMemoryIdBlockAllocator()
+    first = ShortCodeGenerator(allocator, b"secret", block_size=5)
+    second = ShortCodeGenerator(allocator, b"secret", block_size=5)
+
+    codes = [first.next_code() for _ in range(12)]
+    codes += [second.next_code() for _ in range(12)]
+
+    assert len(set(codes)) == 24
+
+
+def test_should_lease_one_block_per_block_size_codes():
+    allocator = Mock()
+    allocator.next_block.side_effect = [1, 2]
+    generator = ShortCodeGenerator(allocator, b"secret", block_size=10)
+
+    for _ in range(11):
+        generator.next_code()
+
+    assert allocator.next_block.call_count == 2
+
+
+def test_should_reject_block_beyond_code_space():
+    allocator = Mock()
+    allocator.next_block.return_value = 1 << CODE_BITS
+    generator = ShortCodeGenerator(allocator, b"secret", block_size=10)
+
+    with pytest.raises(ValueError):
+        generator.next_code()
+
+
+def test_should_allocate_increasing_blocks_from_database(in_memory_db):
+    allocator = DatabaseIdBlockAllocator(in_memory_db)
+
+    first = allocator.next_block()
+    second = allocator.next_block()
+
+    assert second > first
@@ -0,0 +1,20 @@
+from datetime import UTC, datetime
+
+import pytest
+
+from app.pagination import PageCursor
+
+
+def test_should_round_trip_cursor_through_opaque_token():
+    cursor = PageCursor(datetime(2026, 1, 1, 12, 30, 15, 250, tzinfo=UTC), 42)
+
+    token = cursor.encode()
+
+    assert "=" not in token
+    assert PageCursor.decode(token) == cursor
+
+
+@pytest.mark.parametrize("token", ["", "not-a-cursor", "WzEsMiwzXQ"])
+def test_should_reject_malformed_cursor(token):
+    with pytest.raises(ValueError):
+        PageCursor.decode(token)
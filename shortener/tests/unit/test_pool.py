@@ -0,0 +1,81 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.config import Settings
+from app.db.pool import (
+    InstrumentedAsyncQueuePool,
+    InstrumentedQueuePool,
+    engine_options,
+    pool_stats,
+)
+from app.metrics import metrics
+
+
+def _settings(**overrides):
+    return Settings(DATABASE_URL="sqlite://", **overrides)
+
+
+def test_should_build_pool_options_from_settings():
+    options = engine_options(
+        _settings(DB_POOL_SIZE=3, DB_MAX_OVERFLOW=0, DB_POOL_TIMEOUT_SECONDS=2.5),
+        "postgresql+psycopg2://db/urls",
+        "primary",
+    )
+
+    assert options["poolclass"] is InstrumentedQueuePool
+    assert options["pool_size"] == 3
+    assert options["max_overflow"] == 0
+    assert options["pool_timeout"] == 2.5
+    assert options["pool_logging_name"] == "primary"
+    assert "connect_args" not in options
+
+
+def test_should_disable_prepared_statements_for_asyncpg_behind_pgbouncer():
+    options = engine_options(
+        _settings(DB_PGBOUNCER_MODE=True),
+        "postgresql+asyncpg://pgbouncer/urls",
+        "primary",
+        is_async=True,
+    )
+
+    assert options["poolclass"] is InstrumentedAsyncQueuePool
+    connect_args = options["connect_args"]
+    assert connect_args["statement_cache_size"] == 0
+    assert connect_args["prepared_statement_cache_size"] == 0
+    assert connect_args["prepared_statement_name_func"]() != (
+        connect_args["prepared_statement_name_func"]()
+    )
+
+
+def test_should_leave_in_memory_sqlite_on_its_default_pool():
+    options = engine_options(_settings(), "sqlite://", "memory")
+
+    assert "poolclass" not in options
+    assert "pool_size" not in options
+
+
+def test_should_record_checkout_waits_and_timeouts(tmp_path):
+    url = f"sqlite:///{tmp_path / 'pool.db'}"
+    engine = create_engine(
+        url,
+        **engine_options(
+            _settings(DB_POOL_SIZE=1, DB_MAX_OVERFLOW=0, DB_POOL_TIMEOUT_SECONDS=0.05),
+            url,
+            "pooltest",
+        ),
+    )
+    baseline = metrics.get("db.pooltest.checkouts")
+
+    try:
+        with engine.connect():
+            with pytest.raises(PoolTimeoutError):
+                engine.connect()
+            stats = pool_stats(engine.pool)
+            assert stats["checked_out"] == 1
+    finally:
+        engine.dispose()
+
+    assert metrics.get("db.pooltest.checkouts") == baseline + 2
+    assert metrics.get("db.pooltest.checkout_timeouts") >= 1
+    assert metrics.get("db.pooltest.checkout_wait_seconds") >= 0.05
@@ -0,0 +1,52 @@
+from unittest.mock import patch
+
+from app.db.replicas import RecentWrites, ReplicaSet
+
+
+def test_should_rotate_between_healthy_replicas():
+    replicas = ReplicaSet(["a", "b"], 30.0, RecentWrites(5.0))
+
+    picks = [replicas.choose() for _ in range(4)]
+
+    assert picks == [(0, "a"), (1, "b"), (0, "a"), (1, "b")]
+
+
+def test_should_skip_failed_replica_until_retry_window_passes():
+    replicas = ReplicaSet(["a", "b"], 30.0, RecentWrites(5.0))
+    replicas.mark_failed(0, RuntimeError("down"))
+
+    assert {replicas.choose() for _ in range(3)} == {(1, "b")}
+
+    replicas.mark_failed(1, RuntimeError("down"))
+    assert replicas.choose() is None
+
+    with patch("app.db.replicas.time.monotonic", return_value=10**9):
+        assert replicas.choose() is not None
+
+
+def test_should_send_recently_written_keys_to_primary():
+    replicas = ReplicaSet(["a"], 30.0, RecentWrites(5.0))
+    replicas.note_write("abcd1234")
+
+    assert replicas.choose("abcd1234") is None
+    assert replicas.choose("other123") == (0, "a")
+
+
+def test_should_forget_writes_after_lag_guard():
+    recent = RecentWrites(5.0)
+    with patch("app.db.replicas.time.monotonic", return_value=100.0):
+        recent.add("abcd1234")
+
+    with patch("app.db.replicas.time.monotonic", return_value=106.0):
+        assert "abcd1234" not in recent
+        recent.add("other123")
+
+    assert "abcd1234" not in recent._expiries
+
+
+def test_should_route_everything_to_primary_without_replicas():
+    replicas = ReplicaSet([], 30.0, RecentWrites(5.0))
+    replicas.note_write("abcd1234")
+
+    assert replicas.choose() is None
+    assert "abcd1234" not in replicas.recent_writes
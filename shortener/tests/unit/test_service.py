@@ -1,8 +1,12 @@
-from unittest.mock import Mock, patch
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 from pydantic import HttpUrl
+from sqlalchemy.exc import IntegrityError
 
+from app.canonical import url_hash
+from app.codes import InMemoryIdBlockAllocator, ShortCodeGenerator
 from app.models import UrlModel
 from app.service import UrlShortenerService
 
@@ -137,3 +141,128 @@ def test_should_generate_8_character_short_url(mock_generate, service, sample_ur
 
     assert len(result.short_link) == 8
     mock_generate.assert_called_once_with(url)
+
+
+@pytest.mark.asyncio
+async def test_should_return_url_and_record_click_when_resolved_asynchronously(
+    async_service, async_analytics_client
+):
+    expected = UrlModel(
+        link=HttpUrl("https://example.com"), short_link="test1234", created_at=None
+    )
+    async_service.repository = Mock()
+    async_service.repository.get = AsyncMock(return_value=expected)
+
+    result = await async_service.get_url("test1234", "192.168.1.1", "SF", "US")
+    await asyncio.sleep(0)  # let the background analytics task run
+
+    assert result == expected
+    async_analytics_client.record_click_async.assert_awaited_once_with(
+        short_link="test1234", ip="192.168.1.1", city="SF", country="US"
+    )
+
+
+@pytest.mark.asyncio
+async def test_should_return_url_when_async_analytics_fails(
+    async_service, async_analytics_client
+):
+    async_analytics_client.record_click_async.side_effect = Exception("down")
+
+    result = await async_service.get_url("missing1")
+    await asyncio.sleep(0)
+
+    assert result is None
+
+
+@pytest.mark.asyncio
+async def test_should_return_stored_link_and_record_click_on_fast_path(
+    async_service, async_analytics_client
+):
+    async_service.repository = Mock()
+    async_service.repository.get_link = AsyncMock(return_value="https://example.com/")
+
+    result = await async_service.get_link("test1234", "192.168.1.1", "SF", "US")
+    await asyncio.sleep(0)
+
+    assert result == "https://example.com/"
+    async_analytics_client.record_click_async.assert_awaited_once_with(
+        short_link="test1234", ip="192.168.1.1", city="SF", country="US"
+    )
+
+
+def test_should_create_with_generated_code_without_checking_availability(
+    mock_analytics_client, sample_urls
+):
+    repository = Mock()
+    repository.find_by_url.return_value = None
+    repository.create.side_effect = lambda shortened_url, url: UrlModel(
+        link=url, short_link=shortened_url
+    )
+    generator = ShortCodeGenerator(InMemoryIdBlockAllocator(), b"secret")
+    service = UrlShortenerService(repository, mock_analytics_client, generator)
+
+    result = service.shorten_url(HttpUrl(sample_urls[0]))
+
+    assert len(result.short_link) == 8
+    repository.get.assert_not_called()
+
+
+def test_should_try_next_generated_code_when_taken(mock_analytics_client, sample_urls):
+    repository = Mock()
+    repository.find_by_url.return_value = None
+    repository.create.side_effect = [
+        IntegrityError("taken", params=None, orig=Exception()),
+        UrlModel(link=HttpUrl(sample_urls[0]), short_link="code0002"),
+    ]
+    generator = ShortCodeGenerator(InMemoryIdBlockAllocator(), b"secret")
+    service = UrlShortenerService(repository, mock_analytics_client, generator)
+
+    result = service.shorten_url(HttpUrl(sample_urls[0]))
+
+    assert result.short_link == "code0002"
+    first_code = repository.create.call_args_list[0].kwargs["shortened_url"]
+    second_code = repository.create.call_args_list[1].kwargs["shortened_url"]
+    assert first_code != second_code
+
+
+def test_should_fall_back_to_random_codes_when_generator_unavailable(
+    service, mock_analytics_client, sample_urls
+):
+    generator = Mock()
+    generator.next_code.side_effect = ConnectionError("redis down")
+    service.code_generator = generator
+
+    result = service.shorten_url(HttpUrl(sample_urls[0]))
+
+    assert result is not None
+    assert len(result.short_link) == 8
+
+
+def test_should_shorten_many_urls_in_input_order(service, sample_urls):
+    urls = [HttpUrl(sample_urls[0]), HttpUrl(sample_urls[1]), HttpUrl(sample_urls[0])]
+
+    results = service.shorten_urls(urls)
+
+    assert [str(result.link) for result in results] == [str(url) for url in urls]
+    assert results[0].short_link == results[2].short_link
+
+
+def test_should_retry_only_urls_whose_codes_were_taken(
+    mock_analytics_client, sample_urls
+):
+    urls = [HttpUrl(sample_urls[0]), HttpUrl(sample_urls[1])]
+    repository = Mock()
+    repository.find_by_urls.return_value = {}
+    first, second = (
+        UrlModel(link=url, short_link=f"code000{i}") for i, url in enumerate(urls)
+    )
+    repository.create_many.side_effect = [
+        {url_hash(str(urls[0])): first},
+        {url_hash(str(urls[1])): second},
+    ]
+    service = UrlShortenerService(repository, mock_analytics_client)
+
+    results = service.shorten_urls(urls)
+
+    assert results == [first, second]
+    assert len(repository.create_many.call_args_list[1].args[0]) == 1